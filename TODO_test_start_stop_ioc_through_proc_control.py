@@ -4,17 +4,19 @@ System tests for starting or stopping iocs through Proc server
 
 import os
 import unittest
-import xml.etree.ElementTree as ET
 from time import time
 from typing import List
 
 from hamcrest import assert_that, less_than
 from six.moves import range
 
+from utilities.ioc_catalogue import load_ioc_catalogue
 from utilities.utilities import (
     as_seconds,
+    bulk_retry_in_recsim,
     bulk_start_ioc,
     bulk_stop_ioc,
+    forget_instrument_set,
     g,
     load_config_if_not_already_loaded,
     start_ioc,
@@ -70,6 +72,7 @@ class TestProcControl(unittest.TestCase):
 
     def setUp(self):
         g.set_instrument(None)
+        forget_instrument_set()
 
         # all tests that interact with anything but genie should try to load a config to ensure that the configurations
         # in the tests are not broken, e.g. by a schema update
@@ -165,9 +168,12 @@ class TestProcControl(unittest.TestCase):
             failed_to_stop = bulk_stop_ioc(
                 [ioc for ioc in chunk if ioc not in failed_to_start and ioc not in not_in_proc_serv]
             )
-            for ioc in failed_to_start + failed_to_stop:
-                if not self._retry_in_recsim(ioc):
-                    error_iocs.append(ioc)
+            passed_in_recsim, still_failing = bulk_retry_in_recsim(
+                failed_to_start + failed_to_stop, GLOBALS_FILENAME
+            )
+            if passed_in_recsim:
+                print(f"IOCs which only started and stopped in recsim: {passed_in_recsim}")
+            error_iocs.extend(still_failing)
             count = time() - start_time
             print(f"Check from {chunk[0]} to {chunk[-1]} ({len(chunk)} iocs), in {count} seconds.")
 
@@ -184,57 +190,17 @@ class TestProcControl(unittest.TestCase):
         Gets all IOCs, checks the list is sensible, removes those that should be skipped.
         :return: The list of IOCs to test, sorted alphanumerically.
         """
-        iocs_to_test = []
-        tree = ET.parse(
-            os.path.join("C:\\", "Instrument", "Apps", "EPICS", "iocstartup", "config.xml")
-        )
-        root = tree.getroot()
-
-        # IOCs are listed in the above XML file under two different schemas, we need both
-        schemas = (
-            "{http://epics.isis.rl.ac.uk/schema/ioc_config/1.0}",
-            "{http://epics.isis.rl.ac.uk/schema/ioc_configs/1.0}",
-        )
-
-        for schema in schemas:
-            iocs_to_test.extend(
-                [ioc_config.attrib["name"] for ioc_config in root.iter(f"{schema}ioc_config")]
-            )
+        catalogue = load_ioc_catalogue()
 
         # Check parsed IOCs are a sensible length check there's at least one known ioc in the list
-        if not len(iocs_to_test) > 100:
+        if not len(catalogue) > 100:
             if not any(
-                item in iocs_to_test
-                for item in ["SIMPLE", "AMINT2L_01", "EUROTHRM_01", "INSTETC_01"]
+                item in catalogue for item in ["SIMPLE", "AMINT2L_01", "EUROTHRM_01", "INSTETC_01"]
             ):
                 # Fairly long test so error out early if IOCs aren't in a sensible state
                 raise ValueError("List of IOCs not in a sensible state. Have you run IOC startups?")
         # Check IOC 1 and IOC2, but not other IOCs as they should follow the same format as IOC 2.
-        iocs_to_test = [
-            ioc
-            for ioc in iocs_to_test
-            if self._skip_high_ioc_nums(ioc) and not self._ignore_ioc(ioc)
-        ]
-        iocs_to_test.sort()
-        return iocs_to_test
-
-    @staticmethod
-    def _ignore_ioc(ioc: str):
-        """
-        Helper method to check if a given IOC should be skipped
-        :param ioc: The IOC to check
-        :return: true if the IOC should be skipped otherwise false
-        """
-        return any(ioc.startswith(ioc_name) for ioc_name in IOCS_TO_IGNORE_START_STOP)
-
-    @staticmethod
-    def _skip_high_ioc_nums(ioc: str):
-        """
-        Helper method to check if an IOC is of number greater than 1 or 2 to allow skipping of higher duplicates.
-        :param ioc: The IOC to check.
-        :return: True if the IOC is 2 or 2, otherwise False.
-        """
-        return "_01" in ioc or "_02" in ioc
+        return catalogue.with_instances([1, 2], exclude_prefixes=IOCS_TO_IGNORE_START_STOP)
 
     @staticmethod
     def _chunk_iocs(ioc_list: List[str], chunk_size: int):
@@ -246,24 +212,3 @@ class TestProcControl(unittest.TestCase):
         """
         for i in range(0, len(ioc_list), chunk_size):
             yield ioc_list[i : i + chunk_size]
-
-    @staticmethod
-    def _retry_in_recsim(ioc: str):
-        """
-        Helper method to retry starting and stopping an IOC in rec sim
-        :param ioc: The IOC to test.
-        :return: True if the retry succeeded, else false.
-        """
-        succeeded = True
-        # open with w flag and overwrite - we don't need to
-        with open(GLOBALS_FILENAME, "w", encoding="ascii") as globals_file:
-            globals_file.write(f"{ioc}__RECSIM=1")
-            globals_file.flush()
-            try:
-                start_ioc(ioc_name=ioc)
-                stop_ioc(ioc_name=ioc)
-            except IOError:
-                succeeded = False
-            finally:
-                globals_file.truncate(0)
-        return succeeded
@@ -0,0 +1,81 @@
+"""
+Benchmarks of block logging latency.
+
+Sets a block many times during a run, and reports the distribution of the time for each value to
+be archived by the block archive engine and then to appear in the selog of the run. The slowest
+of each are kept as baselines so that slower logging shows up as a regression.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_block_logging
+"""
+
+import unittest
+
+from utilities.archiver import ArchiveEngineClient
+from utilities.benchmarking import compare_with_baseline, format_histogram, summarise
+from utilities.block_logging import measure_block_logging
+from utilities.utilities import (
+    ensure_instrument_set,
+    g,
+    load_config_if_not_already_loaded,
+    set_genie_python_raises_exceptions,
+    setup_simulated_wiring_tables,
+)
+
+# Number of block values timed through the logging pipeline
+SAMPLES = 20
+
+# Seconds each value may take to reach each stage of the pipeline
+TIMEOUT = 60
+
+# Archived block in rcptt_simple which is set
+BLOCK = "FLOAT_BLOCK"
+
+SETUP_TIMEOUT = 300
+
+
+class TestBlockLoggingLatency(unittest.TestCase):
+    """
+    Measures how long block values take to be archived and logged to the run.
+    """
+
+    def setUp(self) -> None:
+        ensure_instrument_set()
+        load_config_if_not_already_loaded("rcptt_simple")
+        setup_simulated_wiring_tables()
+        set_genie_python_raises_exceptions(True)
+
+    def tearDown(self) -> None:
+        if g.get_runstate() != "SETUP":
+            g.abort()
+            g.waitfor_runstate("SETUP", maxwaitsecs=SETUP_TIMEOUT)
+        set_genie_python_raises_exceptions(False)
+
+    def test_block_logging_latency(self) -> None:
+        g.begin()
+        with ArchiveEngineClient() as block_archive:
+            samples = [
+                # Start well away from the values other tests leave the block at, as values which
+                # do not change are not archived again
+                measure_block_logging(block_archive, BLOCK, 100.0 + value, TIMEOUT)
+                for value in range(SAMPLES)
+            ]
+        g.end()
+        g.waitfor_runstate("SETUP", maxwaitsecs=SETUP_TIMEOUT)
+
+        for stage in ("archived", "selog"):
+            latencies = [getattr(sample, stage) for sample in samples]
+            self.assertNotIn(None, latencies, f"Not all values reached the {stage} stage")
+            print(f"Seconds from cset to {stage}: {summarise(latencies)}")
+            print(format_histogram(latencies))
+
+        results = {
+            "archived_max": max(sample.archived for sample in samples),
+            "selog_max": max(sample.selog for sample in samples),
+        }
+        regressions = compare_with_baseline("block_logging_latency", results)
+        self.assertEqual(regressions, [], "Block logging latency regressed")
+
+
+if __name__ == "__main__":
+    unittest.main()
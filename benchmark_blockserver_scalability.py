@@ -0,0 +1,153 @@
+"""
+Scalability benchmarks of the blockserver with synthetic configurations of 1k to 20k blocks.
+
+For each size a configuration is generated with many groups and many components with macros, and
+the time to load it, to write the gateway pvlist and for the block archive engine to pick up its
+blocks are measured, along with the size of the GET_CURR_CONFIG_DETAILS payload. Each is fitted
+with a linear model in the number of blocks, so the block count at which a load would exceed the
+timeout the tests wait for can be estimated.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_blockserver_scalability
+"""
+
+import json
+import os
+import unittest
+from time import perf_counter, time
+
+from parameterized import parameterized
+
+from utilities.archiver import ArchiveEngineClient
+from utilities.benchmarking import compare_with_baseline, fit_linear_model, predict_linear_model
+from utilities.ioc_catalogue import load_ioc_catalogue
+from utilities.payloads import decode_payload
+from utilities.synthetic_configs import (
+    SyntheticConfig,
+    remove_synthetic_config,
+    write_synthetic_config,
+)
+from utilities.utilities import (
+    PATH_TO_ICPCONFIGROOT,
+    WAIT_FOR_SERVER_TIMEOUT,
+    ensure_instrument_set,
+    g,
+    load_config_if_not_already_loaded,
+    parameterized_list,
+)
+
+BLOCK_COUNTS = [1000, 2000, 5000, 10000, 20000]
+
+# Seconds to wait for a synthetic configuration to load, and to be archived
+LOAD_TIMEOUT = 1800
+
+PVLIST_FILE = os.path.join(r"C:\Instrument", "Settings", "gwblock.pvlist")
+
+EMPTY_CONFIG = "empty_for_system_tests"
+
+MODEL_FEATURES = ["blocks"]
+
+# Block counts to predict the costs of, beyond those measured
+PREDICTED_BLOCK_COUNTS = [50000, 100000]
+
+
+def synthetic_config(blocks: int) -> SyntheticConfig:
+    return SyntheticConfig(name=f"synthetic_{blocks}_blocks", blocks=blocks)
+
+
+class TestBlockserverScalability(unittest.TestCase):
+    """
+    Measures how the cost of loading a configuration grows with its number of blocks.
+    """
+
+    # Number of blocks mapped to the results for that size
+    samples: dict[int, dict[str, float]] = {}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        ensure_instrument_set()
+        catalogue = load_ioc_catalogue()
+        for blocks in BLOCK_COUNTS:
+            write_synthetic_config(PATH_TO_ICPCONFIGROOT, synthetic_config(blocks), catalogue)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        load_config_if_not_already_loaded(EMPTY_CONFIG, timeout=LOAD_TIMEOUT)
+        for blocks in BLOCK_COUNTS:
+            remove_synthetic_config(PATH_TO_ICPCONFIGROOT, synthetic_config(blocks))
+        if len(cls.samples) >= 2:
+            cls._report_scaling()
+
+    def setUp(self) -> None:
+        self.block_archive = ArchiveEngineClient()
+        # Start from an empty config so each load is of a whole synthetic config
+        load_config_if_not_already_loaded(EMPTY_CONFIG, timeout=LOAD_TIMEOUT)
+
+    def tearDown(self) -> None:
+        self.block_archive.close()
+
+    @classmethod
+    def _report_scaling(cls) -> None:
+        metrics = next(iter(cls.samples.values())).keys()
+        for metric in metrics:
+            model = fit_linear_model(
+                [({"blocks": blocks}, results[metric]) for blocks, results in cls.samples.items()],
+                MODEL_FEATURES,
+            )
+            predictions = ", ".join(
+                f"{blocks} blocks: {predict_linear_model(model, {'blocks': blocks}):.4g}"
+                for blocks in PREDICTED_BLOCK_COUNTS
+            )
+            print(
+                f"{metric} = {model['fixed']:.4g} + {model['blocks']:.4g} per block "
+                f"(predicted {predictions})"
+            )
+            if metric == "load_time" and model["blocks"] > 0:
+                limit = (WAIT_FOR_SERVER_TIMEOUT - model["fixed"]) / model["blocks"]
+                print(
+                    f"Loads are predicted to exceed the {WAIT_FOR_SERVER_TIMEOUT}s the tests wait "
+                    f"for at about {limit:.0f} blocks"
+                )
+
+    @staticmethod
+    def _get_config_details() -> tuple[dict, int, int]:
+        """
+        Returns: the current config details, the size in bytes of the GET_CURR_CONFIG_DETAILS
+            PV as sent (compressed and hexed), and the size of the JSON it decodes to
+        """
+        payload = g.get_pv("CS:BLOCKSERVER:GET_CURR_CONFIG_DETAILS", is_local=True)
+        details = decode_payload(payload)
+        return json.loads(details), len(payload), len(details)
+
+    @parameterized.expand(parameterized_list(BLOCK_COUNTS))
+    def test_GIVEN_synthetic_config_WHEN_loaded_THEN_costs_within_baseline(self, _, blocks):
+        config = synthetic_config(blocks)
+
+        load_start_wall_clock = time()
+        load_start = perf_counter()
+        load_config_if_not_already_loaded(config.name, timeout=LOAD_TIMEOUT)
+        load_time = perf_counter() - load_start
+
+        self.block_archive.wait_for_channels(lambda names: len(names) >= blocks, LOAD_TIMEOUT)
+        archiver_time = perf_counter() - load_start
+
+        details, payload_bytes, details_bytes = self._get_config_details()
+        self.assertEqual(len(details["blocks"]), blocks)
+
+        results = {
+            "load_time": load_time,
+            "pvlist_time": os.path.getmtime(PVLIST_FILE) - load_start_wall_clock,
+            "pvlist_bytes": float(os.path.getsize(PVLIST_FILE)),
+            "archiver_time": archiver_time,
+            "config_details_payload_bytes": float(payload_bytes),
+            "config_details_json_bytes": float(details_bytes),
+        }
+        print(f"{blocks} blocks: {results}")
+        TestBlockserverScalability.samples[blocks] = results
+
+        regressions = compare_with_baseline(f"blockserver_scalability_{blocks}_blocks", results)
+        self.assertEqual(regressions, [], f"Loading a config of {blocks} blocks regressed")
+
+
+if __name__ == "__main__":
+    unittest.main()
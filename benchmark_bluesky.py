@@ -0,0 +1,266 @@
+"""
+Scan throughput benchmarks for the bluesky integration.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_bluesky
+"""
+
+import os
+import unittest
+from pathlib import Path
+from typing import Any, Callable, Generator
+
+import bluesky.plan_stubs as bps
+import bluesky.plans as bp
+import matplotlib
+from bluesky.callbacks import LiveTable
+from bluesky.preprocessors import subs_decorator
+from bluesky.run_engine import RunEngine
+from ibex_bluesky_core.callbacks import ISISCallbacks
+from ibex_bluesky_core.devices.block import block_r, block_rw_rbv
+from ibex_bluesky_core.devices.simpledae import (
+    GoodFramesNormalizer,
+    GoodFramesWaiter,
+    PeriodGoodFramesNormalizer,
+    PeriodGoodFramesWaiter,
+    PeriodPerPointController,
+    RunPerPointController,
+    SimpleDae,
+)
+from ibex_bluesky_core.fitting import Linear
+from ibex_bluesky_core.run_engine import get_run_engine
+from ibex_bluesky_core.utils import get_pv_prefix
+from ophyd_async.plan_stubs import ensure_connected
+from parameterized import parameterized
+
+from utilities.benchmarking import compare_with_baseline
+from utilities.bluesky_profiling import CallbackProfiler, ScanTimer
+from utilities.utilities import (
+    ensure_instrument_set,
+    load_config_if_not_already_loaded,
+    parameterized_list,
+    set_genie_python_raises_exceptions,
+    setup_simulated_wiring_tables,
+)
+
+matplotlib.use("qtagg")
+RE: RunEngine = get_run_engine()
+
+BLOCK_SCAN_SIZES = [10, 100, 1000, 10000]
+
+# Callbacks such as live fits do more work as a scan gets longer, so are not run at the largest size
+CALLBACK_SCAN_SIZES = [10, 100, 1000]
+
+# Each point of a DAE scan takes at least as long as counting its frames, so keep these small
+DAE_SCAN_SIZES = [10, 100]
+
+# Largest fraction of the time per point of a DAE scan that callbacks may take
+MAX_DAE_SCAN_CALLBACK_SHARE = 0.2
+
+DEFAULT_FRAMES = 100
+DEFAULT_DETECTOR_SPECTRA = range(1, 10)
+
+OUTPUT_FOLDER = os.path.join("C:\\", "instrument", "var", "logs", "bluesky", "benchmarks")
+
+
+def run_per_point_dae(
+    frames: int = DEFAULT_FRAMES, detector_spectra: range = DEFAULT_DETECTOR_SPECTRA
+) -> SimpleDae:
+    """
+    Args:
+        frames: number of good frames to count at each point
+        detector_spectra: spectra to sum in the reducer
+
+    Returns: a DAE which does a run for each point of a scan
+    """
+    prefix = get_pv_prefix()
+    return SimpleDae(
+        prefix=prefix,
+        controller=RunPerPointController(save_run=True),
+        waiter=GoodFramesWaiter(frames),
+        reducer=GoodFramesNormalizer(prefix=prefix, detector_spectra=list(detector_spectra)),
+    )
+
+
+def period_per_point_dae(
+    frames: int = DEFAULT_FRAMES, detector_spectra: range = DEFAULT_DETECTOR_SPECTRA
+) -> SimpleDae:
+    """
+    Args:
+        frames: number of good frames to count at each point
+        detector_spectra: spectra to sum in the reducer
+
+    Returns: a DAE which counts into a new period for each point of a scan
+    """
+    prefix = get_pv_prefix()
+    return SimpleDae(
+        prefix=prefix,
+        controller=PeriodPerPointController(save_run=True),
+        waiter=PeriodGoodFramesWaiter(frames),
+        reducer=PeriodGoodFramesNormalizer(prefix=prefix, detector_spectra=list(detector_spectra)),
+    )
+
+
+def standard_callbacks(x: str, y: str, yerr: str | None = None) -> ISISCallbacks:
+    """
+    Args:
+        x: name of the signal to plot on the x axis
+        y: name of the signal to plot on the y axis
+        yerr: name of the signal holding errors on y, if any
+
+    Returns: ISISCallbacks with a live fit, file output, fit logging and PNG output, as a
+        typical user scan would have
+    """
+    return ISISCallbacks(
+        x=x,
+        y=y,
+        yerr=yerr,
+        fit=Linear().fit(),
+        human_readable_file_output_dir=Path(OUTPUT_FOLDER) / "output_files",
+        live_fit_logger_output_dir=Path(OUTPUT_FOLDER) / "fitting",
+        plot_png_output_dir=Path(OUTPUT_FOLDER) / "pngs",
+    )
+
+
+def time_scan(
+    plan: Callable[[], Generator[Any, Any, Any]],
+    num_points: int,
+    callbacks: list[Callable[[str, dict], Any]] | None = None,
+) -> dict[str, float]:
+    """
+    Run a plan through the RunEngine and time it.
+
+    Args:
+        plan: function returning the plan to run
+        num_points: number of points the plan scans over
+        callbacks: callbacks to subscribe for the duration of the plan
+
+    Returns: seconds per point for the whole scan and for each part of it, and points per second
+    """
+    timer = ScanTimer()
+    timed_callbacks = [timer.timed_callback(callback) for callback in callbacks or []]
+
+    with timer.timing(RE):
+        RE(subs_decorator(timed_callbacks)(plan)())
+
+    results = {
+        f"{category}_seconds_per_point": total / num_points
+        for category, total in timer.totals.items()
+    }
+    results["seconds_per_point"] = timer.total() / num_points
+    print(
+        f"{num_points} points in {timer.total():.3f}s "
+        f"({num_points / timer.total():.1f} points per second): {timer.totals}"
+    )
+    return results
+
+
+class TestBlueskyScanThroughput(unittest.TestCase):
+    """
+    Measures points per second of RunEngine scans and checks for regressions against a baseline.
+    """
+
+    def setUp(self) -> None:
+        ensure_instrument_set()
+        load_config_if_not_already_loaded("bluesky_sys_test")
+        setup_simulated_wiring_tables()
+        set_genie_python_raises_exceptions(True)
+
+    def tearDown(self) -> None:
+        set_genie_python_raises_exceptions(False)
+
+    def _assert_no_regression(self, baseline_name: str, results: dict[str, float]) -> None:
+        regressions = compare_with_baseline(baseline_name, results)
+        self.assertEqual(regressions, [], f"Scan throughput regressed for {baseline_name}")
+
+    @staticmethod
+    def _block_scan(num_points: int) -> Callable[[], Generator[Any, Any, Any]]:
+        def _plan():
+            p3 = block_r(float, "p3")
+            p5 = block_rw_rbv(float, "p5")
+            yield from ensure_connected(p3, p5)
+            yield from bp.scan([p3], p5, -10, 10, num=num_points)
+
+        return _plan
+
+    @parameterized.expand(parameterized_list(BLOCK_SCAN_SIZES))
+    def test_block_scan_throughput(self, _, num_points: int) -> None:
+        results = time_scan(self._block_scan(num_points), num_points)
+        self._assert_no_regression(f"bluesky_block_scan_{num_points}", results)
+
+    @parameterized.expand(parameterized_list(CALLBACK_SCAN_SIZES))
+    def test_block_scan_with_livetable_throughput(self, _, num_points: int) -> None:
+        livetable_lines = []
+        results = time_scan(
+            self._block_scan(num_points),
+            num_points,
+            [LiveTable(["p3", "p5"], out=livetable_lines.append)],
+        )
+        self._assert_no_regression(f"bluesky_block_scan_livetable_{num_points}", results)
+
+    @parameterized.expand(parameterized_list(CALLBACK_SCAN_SIZES))
+    def test_block_scan_with_standard_callbacks_throughput(self, _, num_points: int) -> None:
+        icc = standard_callbacks(x="p5", y="p3")
+        results = time_scan(self._block_scan(num_points), num_points, icc.subs)
+        self._assert_no_regression(f"bluesky_block_scan_isiscallbacks_{num_points}", results)
+
+    @parameterized.expand(parameterized_list(CALLBACK_SCAN_SIZES))
+    def test_block_scan_standard_callbacks_profile(self, _, num_points: int) -> None:
+        # Block scans are so quick that callbacks are expected to dominate the time per point,
+        # so this only reports where the time and memory goes.
+        icc = standard_callbacks(x="p5", y="p3")
+        profiler = CallbackProfiler()
+
+        with profiler.profiling():
+            RE(subs_decorator(profiler.wrap_all(icc.subs))(self._block_scan(num_points))())
+
+        print(profiler.report())
+
+    @parameterized.expand(parameterized_list(DAE_SCAN_SIZES))
+    def test_run_per_point_dae_scan_standard_callbacks_overhead(self, _, num_points: int) -> None:
+        dae = run_per_point_dae()
+        icc = standard_callbacks(
+            x="p3", y=dae.reducer.intensity.name, yerr=dae.reducer.intensity_stddev.name
+        )
+        profiler = CallbackProfiler()
+
+        @subs_decorator(profiler.wrap_all(icc.subs))
+        def _plan():
+            p3 = block_rw_rbv(float, "p3")
+            yield from ensure_connected(dae, p3)
+            yield from bps.mv(dae.number_of_periods, 1)
+            yield from bp.scan([dae], p3, 0, 10, num=num_points)
+
+        with profiler.profiling():
+            RE(_plan())
+
+        print(profiler.report())
+        profiler.assert_callback_share_below(MAX_DAE_SCAN_CALLBACK_SHARE)
+
+    @parameterized.expand(parameterized_list(DAE_SCAN_SIZES))
+    def test_run_per_point_dae_scan_throughput(self, _, num_points: int) -> None:
+        def _plan():
+            dae = run_per_point_dae()
+            p3 = block_rw_rbv(float, "p3")
+            yield from ensure_connected(dae, p3)
+            yield from bps.mv(dae.number_of_periods, 1)
+            yield from bp.scan([dae], p3, 0, 10, num=num_points)
+
+        results = time_scan(_plan, num_points)
+        self._assert_no_regression(f"bluesky_run_per_point_scan_{num_points}", results)
+
+    @parameterized.expand(parameterized_list(DAE_SCAN_SIZES))
+    def test_period_per_point_dae_scan_throughput(self, _, num_points: int) -> None:
+        def _plan():
+            dae = period_per_point_dae()
+            p3 = block_rw_rbv(float, "p3")
+            yield from ensure_connected(dae, p3)
+            yield from bps.mv(dae.number_of_periods, num_points)
+            yield from bp.scan([dae], p3, 0, 10, num=num_points)
+
+        results = time_scan(_plan, num_points)
+        self._assert_no_regression(f"bluesky_period_per_point_scan_{num_points}", results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Cost model of run-per-point and period-per-point DAE scans.
+
+Measures the fixed cost per point of each controller, and how the time per point scales with the
+number of frames counted and the number of spectra reduced, then fits a cost model of
+    seconds per point = fixed + per_frame * frames + per_spectrum * spectra
+for each controller and reports which is quicker for typical scans. The measured time per point of
+each scan is kept as a baseline so that slower scans show up as a regression.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_dae_scan_cost
+"""
+
+import unittest
+from typing import Callable
+
+import bluesky.plan_stubs as bps
+import bluesky.plans as bp
+from ibex_bluesky_core.devices.block import block_rw_rbv
+from ibex_bluesky_core.devices.simpledae import SimpleDae
+from ophyd_async.plan_stubs import ensure_connected
+
+from benchmark_bluesky import period_per_point_dae, run_per_point_dae, time_scan
+from utilities.benchmarking import (
+    compare_with_baseline,
+    fit_linear_model,
+    predict_linear_model,
+    summarise,
+)
+from utilities.utilities import (
+    ensure_instrument_set,
+    g,
+    get_execution_time,
+    load_config_if_not_already_loaded,
+    set_genie_python_raises_exceptions,
+    setup_simulated_wiring_tables,
+)
+
+# Number of times each fixed cost is measured
+FIXED_COST_CYCLES = 5
+
+# Number of points in each scan used to measure scaling
+POINTS_PER_SCAN = 3
+
+DEFAULT_FRAMES = 100
+DEFAULT_SPECTRA = 8
+FRAMES_TO_MEASURE = [50, 100, 200, 400]
+SPECTRA_TO_MEASURE = [1, 8, 32, 64]
+
+MODEL_FEATURES = ["frames", "spectra"]
+
+# Scans to recommend a controller for, as (frames per point, spectra)
+TYPICAL_SCANS = [(50, 1), (100, 8), (1000, 8), (100, 64), (5000, 64)]
+
+SETUP_TIMEOUT = 300
+
+
+class TestDaeScanCostModel(unittest.TestCase):
+    """
+    Benchmarks the cost per point of DAE backed bluesky scans.
+    """
+
+    models: dict[str, dict[str, float]] = {}
+
+    def setUp(self) -> None:
+        ensure_instrument_set()
+        load_config_if_not_already_loaded("bluesky_sys_test")
+        setup_simulated_wiring_tables()
+        set_genie_python_raises_exceptions(True)
+
+    def tearDown(self) -> None:
+        if g.get_runstate() != "SETUP":
+            g.abort()
+            g.waitfor_runstate("SETUP", maxwaitsecs=SETUP_TIMEOUT)
+        set_genie_python_raises_exceptions(False)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        if len(cls.models) < 2:
+            return
+        print("Predicted seconds per point (frames, spectra): run per point / period per point")
+        for frames, spectra in TYPICAL_SCANS:
+            inputs = {"frames": frames, "spectra": spectra}
+            run_cost = predict_linear_model(cls.models["run_per_point"], inputs)
+            period_cost = predict_linear_model(cls.models["period_per_point"], inputs)
+            quicker = "run per point" if run_cost < period_cost else "period per point"
+            print(f"({frames}, {spectra}): {run_cost:.3f}s / {period_cost:.3f}s - use {quicker}")
+
+    def _assert_no_regression(self, baseline_name: str, results: dict[str, float]) -> None:
+        regressions = compare_with_baseline(baseline_name, results)
+        self.assertEqual(regressions, [], f"DAE scan cost regressed for {baseline_name}")
+
+    @staticmethod
+    def _end_and_wait() -> None:
+        g.end()
+        g.waitfor_runstate("SETUP", maxwaitsecs=SETUP_TIMEOUT)
+
+    @staticmethod
+    def _abort_and_wait() -> None:
+        g.abort()
+        g.waitfor_runstate("SETUP", maxwaitsecs=SETUP_TIMEOUT)
+
+    def test_run_per_point_fixed_costs(self) -> None:
+        begin_times, end_times, abort_times = [], [], []
+        for _ in range(FIXED_COST_CYCLES):
+            begin_times.append(get_execution_time(g.begin))
+            end_times.append(get_execution_time(self._end_and_wait))
+            g.begin()
+            abort_times.append(get_execution_time(self._abort_and_wait))
+
+        end_time = summarise(end_times)["median"]
+        results = {
+            "begin": summarise(begin_times)["median"],
+            "end": end_time,
+            # A run per point scan saves each run, aborting does the same without the NeXus write
+            "nexus_write": max(0.0, end_time - summarise(abort_times)["median"]),
+        }
+        print(f"Run per point fixed costs: {results}")
+        self._assert_no_regression("dae_run_per_point_fixed_costs", results)
+
+    def test_period_per_point_fixed_costs(self) -> None:
+        number_of_periods = FIXED_COST_CYCLES + 1
+        g.change_number_soft_periods(number_of_periods)
+        g.begin(paused=True)
+        period_change_times, resume_times, pause_times = [], [], []
+        for period in range(2, number_of_periods + 1):
+            period_change_times.append(get_execution_time(lambda: g.change_period(period)))
+            resume_times.append(get_execution_time(g.resume))
+            pause_times.append(get_execution_time(g.pause))
+
+        results = {
+            "period_change": summarise(period_change_times)["median"],
+            "resume": summarise(resume_times)["median"],
+            "pause": summarise(pause_times)["median"],
+            "end": get_execution_time(self._end_and_wait),
+        }
+        print(f"Period per point fixed costs: {results}")
+        self._assert_no_regression("dae_period_per_point_fixed_costs", results)
+
+    def _measure_scaling(
+        self, make_dae: Callable[[int, range], SimpleDae], number_of_periods: int
+    ) -> list[tuple[dict[str, float], float]]:
+        """
+        Time scans over a range of frame counts and numbers of spectra.
+
+        Args:
+            make_dae: creates the DAE to scan with from the frames and spectra to use
+            number_of_periods: number of periods to set on the DAE before scanning
+
+        Returns: (frames and spectra, seconds per point) for each scan
+        """
+        cases = [(frames, DEFAULT_SPECTRA) for frames in FRAMES_TO_MEASURE] + [
+            (DEFAULT_FRAMES, spectra) for spectra in SPECTRA_TO_MEASURE
+        ]
+        samples = []
+        for frames, spectra in cases:
+            dae = make_dae(frames, range(1, spectra + 1))
+
+            def _plan():
+                p3 = block_rw_rbv(float, "p3")
+                yield from ensure_connected(dae, p3)
+                yield from bps.mv(dae.number_of_periods, number_of_periods)
+                yield from bp.scan([dae], p3, 0, 10, num=POINTS_PER_SCAN)
+
+            seconds_per_point = time_scan(_plan, POINTS_PER_SCAN)["seconds_per_point"]
+            samples.append(({"frames": frames, "spectra": spectra}, seconds_per_point))
+        return samples
+
+    def _fit_and_check(self, name: str, samples: list[tuple[dict[str, float], float]]) -> None:
+        model = fit_linear_model(samples, MODEL_FEATURES)
+        print(
+            f"{name} cost model: {model['fixed']:.4f}s + {model['frames']:.6f}s/frame "
+            f"+ {model['spectra']:.6f}s/spectrum per point"
+        )
+        TestDaeScanCostModel.models[name] = model
+
+        # The fitted coefficients are too noisy to compare with a baseline, and can be zero or
+        # negative, so the measured time per point of each scan is compared instead
+        results = {
+            f"frames_{inputs['frames']}_spectra_{inputs['spectra']}": seconds_per_point
+            for inputs, seconds_per_point in samples
+        }
+        self._assert_no_regression(f"dae_{name}_seconds_per_point", results)
+
+    def test_run_per_point_cost_model(self) -> None:
+        samples = self._measure_scaling(run_per_point_dae, 1)
+        self._fit_and_check("run_per_point", samples)
+
+    def test_period_per_point_cost_model(self) -> None:
+        samples = self._measure_scaling(period_per_point_dae, POINTS_PER_SCAN)
+        self._fit_and_check("period_per_point", samples)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Benchmarks of encoding and decoding blockserver payloads, e.g. for SET_CURR_CONFIG_DETAILS and
+GET_CURR_CONFIG_DETAILS, from 1 KB to 50 MB of JSON.
+
+Compares genie_python's compress_and_hex and dehex_and_decompress, with the JSON handled
+separately as the tests used to do, against the JSON payload functions in utilities.payloads.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_payloads
+"""
+
+import json
+import unittest
+from typing import Any, Callable
+
+from parameterized import parameterized
+
+from utilities.benchmarking import compare_with_baseline, summarise
+from utilities.payloads import decode_json_payload, encode_json_payload
+from utilities.utilities import (
+    compress_and_hex,
+    ensure_instrument_set,
+    g,
+    get_execution_time,
+    load_config_if_not_already_loaded,
+    parameterized_list,
+)
+
+try:
+    from source.utilities import dehex_and_decompress
+except ImportError:
+    from genie_python.utilities import dehex_and_decompress
+
+# Sizes of JSON payload to measure, in bytes
+PAYLOAD_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000, 50_000_000]
+
+# Number of times each encode and decode is timed
+REPEATS = 5
+
+# A config with a typical number of blocks and IOCs
+REALISTIC_CONFIG = "memory_usage"
+
+
+def synthetic_config_details(size: int) -> dict[str, Any]:
+    """
+    Args:
+        size: approximate size in bytes of the JSON wanted
+
+    Returns: config details in the form the blockserver sends them, with enough blocks to be
+        about the size
+    """
+
+    def block(number: int) -> dict[str, Any]:
+        return {
+            "name": f"SYN_B{number}",
+            "pv": f"TE:NDW1234:SYN_01:VALUE{number}",
+            "local": True,
+            "visible": True,
+            "component": None,
+            "runcontrol": False,
+            "lowlimit": 0.0,
+            "highlimit": 0.0,
+            "suspend_on_invalid": False,
+            "log_periodic": True,
+            "log_rate": 30,
+            "log_deadband": 0.0,
+        }
+
+    details = {"name": f"synthetic_{size}", "description": "Synthetic config", "blocks": []}
+    block_size = len(json.dumps(block(0))) + 2
+    details["blocks"] = [block(number) for number in range(max(1, size // block_size))]
+    return details
+
+
+class TestPayloadCost(unittest.TestCase):
+    """
+    Measures the time to encode and decode blockserver payloads, and their encoded sizes.
+    """
+
+    def _assert_no_regression(self, baseline_name: str, results: dict[str, float]) -> None:
+        regressions = compare_with_baseline(baseline_name, results)
+        self.assertEqual(regressions, [], f"Payload encoding regressed for {baseline_name}")
+
+    @staticmethod
+    def _median_time(function: Callable[[], Any]) -> float:
+        return summarise(get_execution_time(function) for _ in range(REPEATS))["median"]
+
+    def _measure(self, details: dict[str, Any]) -> dict[str, float]:
+        """
+        Args:
+            details: the config details to encode and decode
+
+        Returns: median times of each encode and decode, and the sizes of the payload
+        """
+        payload = encode_json_payload(details)
+        as_str = payload.decode("ascii")
+        as_memoryview = memoryview(payload)
+
+        genie_payload = compress_and_hex(json.dumps(details))
+        self.assertEqual(json.loads(dehex_and_decompress(genie_payload)), details)
+        self.assertEqual(decode_json_payload(as_str), details)
+        self.assertEqual(decode_json_payload(as_memoryview), details)
+
+        return {
+            "json_bytes": float(len(json.dumps(details))),
+            "payload_bytes": float(len(payload)),
+            "genie_encode": self._median_time(lambda: compress_and_hex(json.dumps(details))),
+            "json_payload_encode": self._median_time(lambda: encode_json_payload(details)),
+            "genie_decode": self._median_time(lambda: json.loads(dehex_and_decompress(as_str))),
+            "json_payload_decode_str": self._median_time(lambda: decode_json_payload(as_str)),
+            "json_payload_decode_memoryview": self._median_time(
+                lambda: decode_json_payload(as_memoryview)
+            ),
+        }
+
+    @parameterized.expand(parameterized_list(PAYLOAD_SIZES))
+    def test_synthetic_payload_cost(self, _, size: int) -> None:
+        results = self._measure(synthetic_config_details(size))
+        print(f"{size} byte payload: {results}")
+
+        self._assert_no_regression(f"payload_{size}_bytes", results)
+
+    def test_realistic_payload_cost(self) -> None:
+        ensure_instrument_set()
+        load_config_if_not_already_loaded(REALISTIC_CONFIG)
+        payload = g.get_pv("CS:BLOCKSERVER:GET_CURR_CONFIG_DETAILS", is_local=True)
+
+        results = self._measure(decode_json_payload(payload))
+        print(f"{REALISTIC_CONFIG} config details payload: {results}")
+
+        self._assert_no_regression(f"payload_{REALISTIC_CONFIG}", results)
+
+
+if __name__ == "__main__":
+    unittest.main()
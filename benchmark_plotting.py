@@ -0,0 +1,259 @@
+"""
+Throughput and memory benchmarks of the websocket plotting backend used by the IBEX GUI.
+
+A local websocket client connects to figures in the same way as the GUI does, so that the time
+from updating a plot to the client receiving the new frame can be measured.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_plotting
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import unittest
+from time import perf_counter, process_time, sleep
+from typing import Any, Callable
+
+import numpy as np
+import psutil
+from parameterized import parameterized
+from tornado.websocket import WebSocketClientConnection, websocket_connect
+
+from utilities.benchmarking import compare_with_baseline, summarise
+from utilities.live_plotting import MAX_FIGURES, LiveSpectrumPlot
+from utilities.utilities import (
+    ensure_instrument_set,
+    g,
+    get_execution_time,
+    load_config_if_not_already_loaded,
+    parameterized_list,
+)
+
+WEB_PORT = 8988
+
+# Number of updates streamed to the client in each throughput benchmark
+UPDATES = 50
+
+# Seconds to wait for the client to receive a frame after an update
+FRAME_TIMEOUT = 10
+
+# Number of points in the synthetic spectra used to measure frame encoding
+SPECTRUM_SIZES = [1000, 10000, 100000, 1000000]
+
+# Number of figures created (and, beyond MAX_FIGURES, closed) when checking memory
+FIGURE_CYCLES = 100
+
+# Figures created before the memory baseline is taken, so that caches are already warm
+WARM_UP_FIGURES = 20
+
+# Number of 1 Hz refreshes of a live spectrum over which CPU use is measured
+LIVE_REFRESHES = 30
+LIVE_REFRESH_INTERVAL = 1.0
+
+# Largest fraction of the CPU used refreshing a g.plot_spectrum plot that a LiveSpectrumPlot may use
+MAX_LIVE_PLOT_CPU_FRACTION = 0.25
+
+# Largest increase in memory allowed while figures are created and closed
+MAX_MEMORY_GROWTH_BYTES = 50 * 1024 * 1024
+
+
+class PlotWebSocketClient:
+    """
+    Connects to a figure over websocket, as the IBEX GUI does, and records each frame it is sent.
+    """
+
+    def __init__(self, fignum: int) -> None:
+        """
+        Args:
+            fignum: number of the figure to connect to
+        """
+        self.url = f"ws://127.0.0.1:{WEB_PORT}/{fignum}/ws"
+        self.frames: queue.Queue[tuple[float, int]] = queue.Queue()
+        self._loop = asyncio.new_event_loop()
+        self._connection: WebSocketClientConnection | None = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self) -> "PlotWebSocketClient":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._connect(), self._loop).result(FRAME_TIMEOUT)
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        if self._connection is not None:
+            self._loop.call_soon_threadsafe(self._connection.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(FRAME_TIMEOUT)
+
+    async def _connect(self) -> None:
+        self._connection = await websocket_connect(self.url)
+        await self._connection.write_message(json.dumps({"type": "supports_binary", "value": True}))
+        asyncio.ensure_future(self._receive(self._connection))
+
+    async def _receive(self, connection: WebSocketClientConnection) -> None:
+        while (message := await connection.read_message()) is not None:
+            # Text messages are events such as cursor changes; only binary messages are frames
+            if isinstance(message, bytes):
+                self.frames.put((perf_counter(), len(message)))
+
+    def clear(self) -> None:
+        """
+        Discard frames received so far.
+        """
+        while not self.frames.empty():
+            self.frames.get_nowait()
+
+    def wait_for_frame(self) -> tuple[float, int]:
+        """
+        Returns: the time the next frame was received, and its size in bytes
+        """
+        return self.frames.get(timeout=FRAME_TIMEOUT)
+
+
+class TestPlottingBackendThroughput(unittest.TestCase):
+    """
+    Measures frame encode time, bytes per update and client visible update latency of the
+    websocket plotting backend, and checks memory stays bounded as figures come and go.
+    """
+
+    PYPLOT = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # As in test_plotting, the backend must be chosen before pyplot is first imported
+        ensure_instrument_set(os.getenv("MYPVPREFIX"))
+        load_config_if_not_already_loaded("empty_for_system_tests")
+
+        import matplotlib
+
+        matplotlib.use("module://genie_python.matplotlib_backend.ibex_websocket_backend")
+        import matplotlib.pyplot as pyplot
+
+        TestPlottingBackendThroughput.PYPLOT = pyplot
+
+    def setUp(self) -> None:
+        self.PYPLOT.close("all")
+        g.begin()
+
+    def tearDown(self) -> None:
+        g.end()
+
+    def _assert_no_regression(self, baseline_name: str, results: dict[str, float]) -> None:
+        regressions = compare_with_baseline(baseline_name, results)
+        self.assertEqual(regressions, [], f"Plotting backend regressed for {baseline_name}")
+
+    def _stream_updates(self, plot: Any, update: Callable[[], Any]) -> dict[str, float]:
+        """
+        Apply an update to a plot repeatedly and time how long the client takes to see each one.
+
+        Args:
+            plot: the spectra plot to update
+            update: function applying one update to the plot
+
+        Returns: median and 95th percentile latency, and mean bytes per update
+        """
+        latencies, sizes = [], []
+        with PlotWebSocketClient(plot.fig.number) as client:
+            for _ in range(UPDATES):
+                client.clear()
+                start = perf_counter()
+                update()
+                received, size = client.wait_for_frame()
+                latencies.append(received - start)
+                sizes.append(size)
+
+        latency = summarise(latencies)
+        return {
+            "latency_median": latency["median"],
+            "latency_p95": latency["p95"],
+            "bytes_per_update": summarise(sizes)["mean"],
+        }
+
+    def test_plot_spectrum_refresh_throughput(self) -> None:
+        plot = g.plot_spectrum(1)
+        results = self._stream_updates(plot, plot.refresh)
+        print(f"plot_spectrum refresh: {results}")
+        self._assert_no_regression("plotting_refresh", results)
+
+    def test_add_spectrum_throughput(self) -> None:
+        plot = g.plot_spectrum(1)
+        results = self._stream_updates(plot, lambda: plot.add_spectrum(2))
+        print(f"add_spectrum: {results}")
+        self._assert_no_regression("plotting_add_spectrum", results)
+
+    @parameterized.expand(parameterized_list(SPECTRUM_SIZES))
+    def test_frame_encode_time(self, _, points: int) -> None:
+        figure = self.PYPLOT.figure()
+        counts = np.random.default_rng(points)
+        (line,) = figure.gca().plot(np.arange(points, dtype=float), counts.poisson(100, points))
+
+        render_times, encode_times, sizes = [], [], []
+        for _ in range(UPDATES):
+            # New counts for every frame, as in a run; redrawing the same data would send an empty
+            # diff after the first frame, which takes next to no time to encode
+            line.set_ydata(counts.poisson(100, points))
+            render_times.append(get_execution_time(figure.canvas.draw))
+            start = perf_counter()
+            frame = figure.canvas.get_diff_image()
+            encode_times.append(perf_counter() - start)
+            sizes.append(len(frame))
+
+        results = {
+            "render_median": summarise(render_times)["median"],
+            "encode_median": summarise(encode_times)["median"],
+            "bytes_per_frame": summarise(sizes)["mean"],
+        }
+        print(f"{points} point spectrum: {results}")
+        self._assert_no_regression(f"plotting_frame_encode_{points}", results)
+
+    def _refresh_cpu_time(self, refresh: Callable[[], Any]) -> float:
+        """
+        Refresh a plot at 1 Hz, with the maximum number of figures open, as a user watching a
+        live spectrum during a run would.
+
+        Args:
+            refresh: function refreshing the plot
+
+        Returns: CPU seconds used by this process per refresh
+        """
+        start = process_time()
+        for _ in range(LIVE_REFRESHES):
+            refresh()
+            sleep(LIVE_REFRESH_INTERVAL)
+        return (process_time() - start) / LIVE_REFRESHES
+
+    def test_live_spectrum_plot_cpu_use(self) -> None:
+        for _ in range(MAX_FIGURES - 1):
+            g.plot_spectrum(2)
+        plot = g.plot_spectrum(1)
+        with PlotWebSocketClient(plot.fig.number):
+            refresh_cpu = self._refresh_cpu_time(plot.refresh)
+
+        live_plot = LiveSpectrumPlot(1)
+        with PlotWebSocketClient(live_plot.figure.number):
+            live_cpu = self._refresh_cpu_time(live_plot.update)
+
+        results = {"refresh_cpu_seconds": refresh_cpu, "live_update_cpu_seconds": live_cpu}
+        print(f"CPU per 1 Hz refresh: {results}")
+        self.assertLess(live_cpu, refresh_cpu * MAX_LIVE_PLOT_CPU_FRACTION)
+        self._assert_no_regression("plotting_live_spectrum_cpu", results)
+
+    def test_memory_is_bounded_when_creating_figures_beyond_max_figures(self) -> None:
+        process = psutil.Process()
+        for _ in range(WARM_UP_FIGURES):
+            g.plot_spectrum(1)
+        memory_before = process.memory_info().rss
+
+        for _ in range(FIGURE_CYCLES):
+            g.plot_spectrum(1)
+        memory_growth = process.memory_info().rss - memory_before
+
+        print(f"Memory grew by {memory_growth / 1024 / 1024:.1f} MB over {FIGURE_CYCLES} figures")
+        self.assertEqual(MAX_FIGURES, len(self.PYPLOT.get_fignums()))
+        self.assertLess(memory_growth, MAX_MEMORY_GROWTH_BYTES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Benchmarks of procServ control throughput and latency.
+
+Starts and then stops 1, 10 and 100 IOCs at once through their CS:PS:<ioc>:START and STOP PVs,
+and measures how many commands are accepted per second and the time from each command to
+procServ reporting the new status and to the IOC's heartbeat appearing or disappearing.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_proc_control
+"""
+
+import unittest
+
+from parameterized import parameterized
+
+from TODO_test_start_stop_ioc_through_proc_control import IOCS_TO_IGNORE_START_STOP
+from utilities.benchmarking import compare_with_baseline
+from utilities.ioc_catalogue import load_ioc_catalogue
+from utilities.proc_control import send_concurrent_commands, summarise_commands
+from utilities.utilities import (
+    bulk_stop_ioc,
+    ensure_instrument_set,
+    load_config_if_not_already_loaded,
+    parameterized_list,
+    set_genie_python_raises_exceptions,
+)
+
+IOC_COUNTS = [1, 10, 100]
+
+# Seconds to wait for each stage of a command
+COMMAND_TIMEOUT = 120
+
+
+def iocs_to_benchmark(count: int) -> list[str]:
+    """
+    Args:
+        count: number of IOCs wanted
+
+    Returns: SIMPLE, followed by the first instance of other IOCs which can be started and stopped
+        freely, up to the number wanted
+    """
+    others = load_ioc_catalogue().first_instances(1, exclude_prefixes=IOCS_TO_IGNORE_START_STOP)
+    iocs = ["SIMPLE"] + others
+    if len(iocs) < count:
+        raise ValueError(f"Only {len(iocs)} IOCs can be benchmarked, {count} were wanted")
+    return iocs[:count]
+
+
+class TestProcControlThroughput(unittest.TestCase):
+    """
+    Measures procServ command throughput and latency for increasing numbers of IOCs.
+    """
+
+    def setUp(self) -> None:
+        ensure_instrument_set()
+        load_config_if_not_already_loaded("empty_for_system_tests")
+        set_genie_python_raises_exceptions(True)
+
+    def tearDown(self) -> None:
+        set_genie_python_raises_exceptions(False)
+
+    @parameterized.expand(parameterized_list(IOC_COUNTS))
+    def test_proc_control_throughput(self, _, count: int) -> None:
+        iocs = iocs_to_benchmark(count)
+        self.assertEqual(bulk_stop_ioc(iocs), [], "IOCs must be stopped before starting them")
+
+        results = {}
+        try:
+            for command in ("START", "STOP"):
+                samples, commands_per_second = send_concurrent_commands(
+                    iocs, command, COMMAND_TIMEOUT
+                )
+                incomplete = [sample.ioc for sample in samples if not sample.completed]
+                if incomplete:
+                    print(f"{command} did not complete for {incomplete}")
+                results.update(summarise_commands(samples, commands_per_second))
+        finally:
+            bulk_stop_ioc(iocs)
+
+        print(f"procServ control of {count} IOCs: {results}")
+        regressions = compare_with_baseline(f"proc_control_{count}_iocs", results)
+        self.assertEqual(regressions, [], f"procServ control of {count} IOCs regressed")
+
+
+if __name__ == "__main__":
+    unittest.main()
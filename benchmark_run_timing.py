@@ -0,0 +1,65 @@
+"""
+Benchmarks of DAE run transition latency.
+
+Begins, pauses, resumes and ends many runs, and reports the distribution of the time for each of
+g.begin, g.pause, g.resume and g.end to return and for the DAE to reach the new run state. The
+latencies are kept as baselines so that slower run control shows up as a regression.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_run_timing
+"""
+
+import unittest
+
+from utilities.benchmarking import compare_with_baseline, format_histogram
+from utilities.run_timing import RUN_CYCLE, measure_run_cycles, summarise_transitions
+from utilities.utilities import (
+    ensure_instrument_set,
+    g,
+    load_config_if_not_already_loaded,
+    set_genie_python_raises_exceptions,
+    setup_simulated_wiring_tables,
+)
+
+# Number of runs begun, paused, resumed and ended
+RUN_CYCLES = 20
+
+# Seconds spent in each run state before the next transition
+DWELL = 1.0
+
+SETUP_TIMEOUT = 300
+
+
+class TestRunTransitionLatency(unittest.TestCase):
+    """
+    Measures the latency of each DAE run transition over many runs.
+    """
+
+    def setUp(self) -> None:
+        ensure_instrument_set()
+        load_config_if_not_already_loaded("empty_for_system_tests")
+        setup_simulated_wiring_tables()
+        set_genie_python_raises_exceptions(True)
+
+    def tearDown(self) -> None:
+        if g.get_runstate() != "SETUP":
+            g.abort()
+            g.waitfor_runstate("SETUP", maxwaitsecs=SETUP_TIMEOUT)
+        set_genie_python_raises_exceptions(False)
+
+    def test_run_transition_latency(self) -> None:
+        timings = measure_run_cycles(RUN_CYCLES, DWELL)
+
+        for command in RUN_CYCLE:
+            of_command = [timing for timing in timings if timing.command == command]
+            print(f"{command} seconds until the run state was reached:")
+            print(format_histogram(timing.state_latency for timing in of_command))
+
+        results = summarise_transitions(timings)
+        print(f"Run transitions over {RUN_CYCLES} runs: {results}")
+        regressions = compare_with_baseline("dae_run_transitions", results)
+        self.assertEqual(regressions, [], "DAE run transitions regressed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Benchmarks of g.set_instrument, which most test classes call in setUp.
+
+Times set_instrument as a whole, with and without the instrument init, and ensure_instrument_set
+when the instrument is unchanged. Resolving the PV prefix and creating the channel access context
+happen inside set_instrument and can not be called on their own, so they are timed by their
+cumulative time in a profile of set_instrument. The full profile is also printed, to show what
+else takes the time.
+
+These are not run as part of the normal system tests; run them with
+run_tests.bat -t benchmark_set_instrument
+"""
+
+import cProfile
+import io
+import pstats
+import unittest
+from typing import Any, Callable
+
+from utilities.benchmarking import compare_with_baseline, summarise
+from utilities.utilities import (
+    ensure_instrument_set,
+    forget_instrument_set,
+    g,
+    get_execution_time,
+)
+
+# Number of times each step is timed
+REPEATS = 10
+
+# Number of functions to print from the profile of set_instrument
+PROFILE_LINES = 20
+
+# Stages of set_instrument timed from its profile, and the name of the function doing each
+PROFILED_STAGES = {
+    "pv_prefix_resolution": "_get_machine_details_from_identifier",
+    "ca_context_creation": "create_context",
+}
+
+
+def _cumulative_time(stats: pstats.Stats, function_name: str) -> float | None:
+    """
+    Args:
+        stats: a profile
+        function_name: name of the function to find in the profile
+
+    Returns: total cumulative time of the functions of that name; None if none were called
+    """
+    times = [
+        cumulative
+        for (_, _, name), (_, _, _, cumulative, _) in stats.stats.items()
+        if name == function_name
+    ]
+    return sum(times) if times else None
+
+
+class TestSetInstrumentCost(unittest.TestCase):
+    """
+    Measures the cost of setting the instrument, and checks for regressions against a baseline.
+    """
+
+    def _assert_no_regression(self, baseline_name: str, results: dict[str, float]) -> None:
+        regressions = compare_with_baseline(baseline_name, results)
+        self.assertEqual(regressions, [], f"Setting the instrument regressed for {baseline_name}")
+
+    @staticmethod
+    def _median_time(function: Callable[[], Any]) -> float:
+        return summarise(get_execution_time(function) for _ in range(REPEATS))["median"]
+
+    def tearDown(self) -> None:
+        # The benchmarks set the instrument directly, behind ensure_instrument_set's back
+        forget_instrument_set()
+
+    def test_set_instrument_cost_breakdown(self) -> None:
+        set_instrument = self._median_time(lambda: g.set_instrument(None))
+        without_init = self._median_time(
+            lambda: g.set_instrument(None, import_instrument_init=False)
+        )
+        forget_instrument_set()
+        ensure_instrument_set()
+
+        results = {
+            "set_instrument": set_instrument,
+            "set_instrument_without_init": without_init,
+            "instrument_init": max(0.0, set_instrument - without_init),
+            "ensure_instrument_set_unchanged": self._median_time(ensure_instrument_set),
+        }
+        print(f"set_instrument cost breakdown (median seconds): {results}")
+        self._assert_no_regression("set_instrument_cost_breakdown", results)
+
+    def test_set_instrument_profile(self) -> None:
+        stage_times: dict[str, list[float]] = {stage: [] for stage in PROFILED_STAGES}
+        for _ in range(REPEATS):
+            profile = cProfile.Profile()
+            profile.runcall(g.set_instrument, None)
+            stats = pstats.Stats(profile)
+            for stage, function_name in PROFILED_STAGES.items():
+                stage_time = _cumulative_time(stats, function_name)
+                self.assertIsNotNone(
+                    stage_time, f"{function_name} not in the profile of set_instrument"
+                )
+                stage_times[stage].append(stage_time)
+
+        output = io.StringIO()
+        stats.stream = output
+        stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+        print(output.getvalue())
+
+        results = {stage: summarise(times)["median"] for stage, times in stage_times.items()}
+        print(f"set_instrument profiled stages (median cumulative seconds): {results}")
+        self._assert_no_regression("set_instrument_profiled_stages", results)
+
+    def test_unchanged_instrument_is_not_set_again(self) -> None:
+        ensure_instrument_set()
+        set_time = get_execution_time(lambda: g.set_instrument(None))
+        forget_instrument_set()
+        ensure_instrument_set()
+        cached_time = self._median_time(ensure_instrument_set)
+
+        print(f"set_instrument took {set_time:.3f}s, unchanged instrument {cached_time:.6f}s")
+        self.assertLess(cached_time, set_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
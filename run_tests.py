@@ -25,10 +25,25 @@ import time
 import unittest
 
 import xmlrunner
-from genie_python import genie as g
 from genie_python.genie_toggle_settings import exceptions_raised
 
 from utilities import utilities
+from utilities.config_validation import validate_configs
+from utilities.failure_manifest import (
+    FAILURE_MANIFEST_NAME,
+    group_by_config,
+    read_failure_manifest,
+    write_failure_manifest,
+)
+from utilities.parallel_runner import RecordingTestResult, run_in_parallel
+from utilities.retry_log import (
+    RETRY_LOG_ENV,
+    RETRY_LOG_NAME,
+    format_retry_summary,
+    read_retry_log,
+    retry_log_path,
+    summarise_retries,
+)
 
 SCRIPT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__)))
 DEFAULT_DIRECTORY = os.path.join(SCRIPT_DIRECTORY, "test-reports")
@@ -36,18 +51,6 @@ CONFIGS_DIRECTORY = os.path.join(SCRIPT_DIRECTORY, "configs")
 
 NUM_RETRY_DELETION = 5
 
-# default icp config path
-default_configs_path = os.path.join(
-    "C:\\",
-    "Instrument",
-    "Settings",
-    "config",
-    os.environ.get("COMPUTERNAME", "NAME"),
-    "configurations",
-)
-# path to ICP CONFIG ROOT
-PATH_TO_ICPCONFIGROOT = os.environ.get("ICPCONFIGROOT", default_configs_path)
-
 if __name__ == "__main__":
     # get output directory from command line arguments
     parser = argparse.ArgumentParser()
@@ -57,7 +60,8 @@ if __name__ == "__main__":
         default=DEFAULT_DIRECTORY,
         help="The directory to save the test reports",
     )
-    parser.add_argument(
+    tests_to_run = parser.add_mutually_exclusive_group()
+    tests_to_run.add_argument(
         "-t",
         "--tests",
         default=None,
@@ -67,19 +71,59 @@ if __name__ == "__main__":
                                     Module.class runs the the test class in Module.
                                     Module.class.method runs a specific test.""",
     )
+    tests_to_run.add_argument(
+        "--rerun-failed",
+        action="store_true",
+        help="""Run only the tests which failed in the last run with the same output directory,
+                grouped by the config they need.""",
+    )
     parser.add_argument(
         "-f",
         "--failfast",
         action="store_true",
         help="""Determines if the rest of tests are skipped after the first failure""",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="""Number of worker processes to run tests in. Tests which declare resource locks
+                that do not conflict are run at the same time; others still run one at a time.""",
+    )
 
     arguments = parser.parse_args()
     xml_dir = arguments.output_dir
     failfast_switch = arguments.failfast
+    failure_manifest = os.path.join(xml_dir, FAILURE_MANIFEST_NAME)
+    # Set for the worker processes too, so every retry is logged alongside the reports
+    os.environ.setdefault(RETRY_LOG_ENV, os.path.join(xml_dir, RETRY_LOG_NAME))
+
+    # Fail now on a broken config, rather than when a test times out trying to load it
+    config_index = validate_configs(CONFIGS_DIRECTORY)
+    if config_index.problems:
+        print("Configs are not valid, so they have not been deployed:")
+        print(config_index.describe_problems())
+        sys.exit(1)
 
     # Load tests from test suites
-    if arguments.tests is not None:
+    if arguments.rerun_failed:
+        failed_tests = read_failure_manifest(failure_manifest)
+        if not failed_tests:
+            print(f"No failed tests to rerun in {failure_manifest}")
+            sys.exit(0)
+        failed_tests_by_config = group_by_config(failed_tests)
+        print(
+            f"Rerunning {len(failed_tests)} failed tests, which took "
+            f"{sum(failed_test.duration for failed_test in failed_tests):.0f}s last run:"
+        )
+        for config, test_ids in failed_tests_by_config.items():
+            print(f"    {config or 'unknown config'}: {', '.join(test_ids)}")
+        test_suite = unittest.TestSuite(
+            unittest.TestLoader().loadTestsFromNames(test_ids)
+            for test_ids in failed_tests_by_config.values()
+        )
+    elif arguments.tests is not None:
         test_suite = unittest.TestLoader().loadTestsFromNames(arguments.tests)
     else:
         test_suite = unittest.TestLoader().discover(SCRIPT_DIRECTORY, pattern="test_*.py")
@@ -91,7 +135,7 @@ if __name__ == "__main__":
     ]
 
     for config_dir in config_dirs:
-        dest = os.path.join(PATH_TO_ICPCONFIGROOT, config_dir)
+        dest = os.path.join(utilities.PATH_TO_ICPCONFIGROOT, config_dir)
         src = os.path.join(CONFIGS_DIRECTORY, config_dir)
 
         for file_or_dir in os.listdir(src):
@@ -118,20 +162,33 @@ if __name__ == "__main__":
             else:
                 shutil.copy(file_or_dir_src, dest)
 
-    g.set_instrument(None)
+    utilities.ensure_instrument_set()
     exceptions_raised(True)
     utilities.load_config_if_not_already_loaded("empty_for_system_tests")
     utilities.wait_for_iocs_to_be_up(["ISISDAE_01"], 300)
 
     print("\n\n------ BEGINNING genie_python SYSTEM TESTS ------")
+    tests_started = time.time()
     ret_vals = list()
-    ret_vals.append(
-        xmlrunner.XMLTestRunner(
-            output=xml_dir, stream=sys.stdout, failfast=failfast_switch, verbosity=3
+    if arguments.jobs > 1:
+        successful, failed_tests = run_in_parallel(
+            test_suite, arguments.jobs, xml_dir, sys.stdout, failfast_switch
         )
-        .run(test_suite)
-        .wasSuccessful()
-    )
+    else:
+        result = xmlrunner.XMLTestRunner(
+            output=xml_dir,
+            stream=sys.stdout,
+            failfast=failfast_switch,
+            verbosity=3,
+            resultclass=RecordingTestResult,
+        ).run(test_suite)
+        successful, failed_tests = result.wasSuccessful(), result.failed_tests
+    ret_vals.append(successful)
+    write_failure_manifest(failure_manifest, failed_tests)
+    if failed_tests:
+        print(f"{len(failed_tests)} failed tests recorded; rerun them with --rerun-failed")
+    print(f"Retries this run (logged in {retry_log_path()}):")
+    print(format_retry_summary(summarise_retries(read_retry_log(retry_log_path(), tests_started))))
     print("------ UNIT TESTS COMPLETE ------\n\n")
 
     # Return failure exit code if a test failed
@@ -0,0 +1,96 @@
+import threading
+import unittest
+
+from utilities.archive_engine_stub import StubArchiveEngine
+from utilities.archiver import ArchiveEngineClient
+
+GROUP = "BLOCKS"
+
+
+class TestArchiveEngineClient(unittest.TestCase):
+    """
+    Tests of the archive engine client against a stub archive engine, so these do not need an
+    instrument.
+    """
+
+    def setUp(self) -> None:
+        self.engine = StubArchiveEngine()
+        self.engine.set_channels(GROUP, ["PREFIX:CS:SB:B", "PREFIX:CS:SB:A"])
+        self.engine.__enter__()
+        self.client = ArchiveEngineClient(self.engine.url, GROUP)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.engine.__exit__()
+
+    def test_WHEN_get_channel_names_THEN_names_returned_in_engine_order(self):
+        self.assertEqual(self.client.get_channel_names(), ["PREFIX:CS:SB:B", "PREFIX:CS:SB:A"])
+
+    def test_GIVEN_group_unchanged_WHEN_polled_again_THEN_not_modified_and_same_channels_returned(
+        self,
+    ):
+        first = self.client.get_channels()
+        second = self.client.get_channels()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.engine.not_modified_responses, 1)
+
+    def test_GIVEN_group_unchanged_WHEN_unconditional_request_THEN_channels_sent_again(self):
+        self.client.get_channels()
+        self.client.get_channels(conditional=False)
+
+        self.assertEqual(self.engine.requests, 2)
+        self.assertEqual(self.engine.not_modified_responses, 0)
+
+    def test_WHEN_polled_many_times_THEN_one_connection_is_used(self):
+        for _ in range(10):
+            self.client.get_channels()
+
+        self.assertEqual(self.engine.requests, 10)
+        self.assertEqual(len(self.engine.connections), 1)
+
+    def test_GIVEN_first_poll_THEN_all_channels_added(self):
+        changes = self.client.poll()
+
+        self.assertEqual(changes.added, {"PREFIX:CS:SB:A", "PREFIX:CS:SB:B"})
+        self.assertEqual(changes.removed, set())
+
+    def test_GIVEN_channels_changed_WHEN_polled_THEN_changes_reported(self):
+        self.client.poll()
+        self.engine.set_channels(GROUP, ["PREFIX:CS:SB:A", "PREFIX:CS:SB:C"])
+
+        changes = self.client.poll()
+
+        self.assertEqual(changes.added, {"PREFIX:CS:SB:C"})
+        self.assertEqual(changes.removed, {"PREFIX:CS:SB:B"})
+
+    def test_GIVEN_channels_unchanged_WHEN_polled_THEN_no_changes(self):
+        self.client.poll()
+
+        self.assertFalse(self.client.poll())
+
+    def test_GIVEN_channels_change_later_WHEN_waiting_for_them_THEN_returns_once_applied(self):
+        expected = ["PREFIX:CS:SB:C"]
+        timer = threading.Timer(0.5, self.engine.set_channels, args=(GROUP, expected))
+        timer.start()
+        try:
+            names = self.client.wait_for_channels(expected, timeout=10, poll_interval=0.05)
+        finally:
+            timer.cancel()
+
+        self.assertEqual(names, expected)
+
+    def test_GIVEN_predicate_WHEN_waiting_for_channels_THEN_returns_when_predicate_true(self):
+        names = self.client.wait_for_channels(
+            lambda names: len(names) == 2 and names[1].endswith("A"), timeout=1
+        )
+
+        self.assertEqual(names, ["PREFIX:CS:SB:B", "PREFIX:CS:SB:A"])
+
+    def test_GIVEN_channels_never_change_WHEN_waiting_for_them_THEN_assertion_error(self):
+        with self.assertRaises(AssertionError):
+            self.client.wait_for_channels(["PREFIX:CS:SB:C"], timeout=0.2, poll_interval=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
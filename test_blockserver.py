@@ -4,17 +4,22 @@ import socket
 import time
 import unittest
 
-import requests
 from genie_python import genie as g
 from genie_python.utilities import compress_and_hex
 from hamcrest import *
 from parameterized import parameterized
 
 from utilities import utilities
+from utilities.archiver import ArchiveEngineClient
+from utilities.gateway_files import PVLIST_KEY_TOKENS, RC_SETTINGS_KEY_TOKENS, compare_rule_files
+from utilities.ioc_lifecycle import IocLifecycleTracker
 from utilities.utilities import assert_with_timeout, parameterized_list
 
 SECONDS_TO_WAIT_FOR_IOC_STARTS = 120
 
+# Seconds to wait for the block archive engine to apply the channels of a new config
+SECONDS_TO_WAIT_FOR_ARCHIVER = 90
+
 
 def wait_for_server():
     status_was_busy = False
@@ -33,7 +38,7 @@ class TestBlockserver(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        g.set_instrument(None, import_instrument_init=False)
+        utilities.ensure_instrument_set(import_instrument_init=False)
         self.pvlist_file = os.path.join(r"C:\Instrument", "Settings", "gwblock.pvlist")
         self.rc_settings_file = os.path.join(
             r"C:\Instrument",
@@ -46,7 +51,10 @@ class TestBlockserver(unittest.TestCase):
         self.config_dir = os.path.join(
             os.path.dirname(os.path.realpath(__file__)), "configs", "configurations"
         )
-        self.block_archive_blocks_url = "http://localhost:4813/group?name=BLOCKS&format=json"
+        self.block_archive = ArchiveEngineClient()
+
+    def tearDown(self) -> None:
+        self.block_archive.close()
 
     def test_GIVEN_config_changes_THEN_dae_and_instetc_come_back_with_autorestart_reapplied(self):
         g.reload_current_config()
@@ -65,56 +73,27 @@ class TestBlockserver(unittest.TestCase):
     def test_GIVEN_config_changes_by_block_THEN_iocs_do_not_restart_except_for_caenv895(self):
         utilities.load_config_if_not_already_loaded("test_blockserver")
 
-        utilities.wait_for_iocs_to_be_up(["SIMPLE", "CAENV895_01"], SECONDS_TO_WAIT_FOR_IOC_STARTS)
-
-        time.sleep(60)  # Time for IOCs to fully boot etc
-
-        # Get the start time of the two IOCs
-        simple_start_time_pv = "CS:IOC:SIMPLE:DEVIOS:STARTTOD"
-        caen_start_time_pv = "CS:IOC:CAENV895_01:DEVIOS:STARTTOD"
-        start_times = utilities.wait_for_string_pvs_to_not_be_empty(
-            [simple_start_time_pv, caen_start_time_pv],
-            SECONDS_TO_WAIT_FOR_IOC_STARTS,
-            is_local=True,
-        )
-        simple_start_time_before = start_times[simple_start_time_pv]
-        caen_start_time_before = start_times[caen_start_time_pv]
-
-        details = utilities.get_config_details()
-        details["desc"] = "some_edited_description"
-        g.set_pv(
-            "CS:BLOCKSERVER:SET_CURR_CONFIG_DETAILS",
-            compress_and_hex(json.dumps(details)),
-            is_local=True,
-        )
-
-        err = None
-        for _ in range(SECONDS_TO_WAIT_FOR_IOC_STARTS):
-            try:
-                # Get new start times
-                start_times = utilities.wait_for_string_pvs_to_not_be_empty(
-                    [simple_start_time_pv, caen_start_time_pv],
-                    SECONDS_TO_WAIT_FOR_IOC_STARTS,
-                    is_local=True,
-                )
-                simple_start_time_after = start_times[simple_start_time_pv]
-                caen_start_time_after = start_times[caen_start_time_pv]
-                self.assertEqual(
-                    simple_start_time_before,
-                    simple_start_time_after,
-                    "SIMPLE ioc should not have restarted",
-                )
-                self.assertNotEqual(
-                    caen_start_time_before,
-                    caen_start_time_after,
-                    "CAENV895 ioc should have restarted",
-                )
-                break
-            except (Exception, AssertionError) as e:
-                err = e
-                time.sleep(1)
-        else:
-            raise err
+        with IocLifecycleTracker(["SIMPLE", "CAENV895_01"]) as tracker:
+            tracker.wait_for_iocs_up(SECONDS_TO_WAIT_FOR_IOC_STARTS)
+            before = tracker.mark()
+
+            details = utilities.get_config_details()
+            details["desc"] = "some_edited_description"
+            g.set_pv(
+                "CS:BLOCKSERVER:SET_CURR_CONFIG_DETAILS",
+                compress_and_hex(json.dumps(details)),
+                is_local=True,
+            )
+
+            self.assertIsNotNone(
+                tracker.wait_for_restart("CAENV895_01", before, SECONDS_TO_WAIT_FOR_IOC_STARTS),
+                "CAENV895 ioc should have restarted",
+            )
+            tracker.wait_for_iocs_up(SECONDS_TO_WAIT_FOR_IOC_STARTS)
+            self.assertFalse(
+                tracker.restarted_between("SIMPLE", before, tracker.mark()),
+                "SIMPLE ioc should not have restarted",
+            )
 
     @parameterized.expand(
         parameterized_list(
@@ -133,25 +112,16 @@ class TestBlockserver(unittest.TestCase):
     ):
         utilities.load_config_if_not_already_loaded(old_config)
 
-        utilities.wait_for_iocs_to_be_up(["SIMPLE"], SECONDS_TO_WAIT_FOR_IOC_STARTS)
-        time.sleep(30)  # Time for IOCs to fully boot etc
-
-        simple_start_time_pv = "CS:IOC:SIMPLE:DEVIOS:STARTTOD"
-        simple_start_time = utilities.wait_for_string_pvs_to_not_be_empty(
-            [simple_start_time_pv], SECONDS_TO_WAIT_FOR_IOC_STARTS, is_local=True
-        )[simple_start_time_pv]
-
-        # Load a config containing a different IOC, but still containing SIMPLE (with the same settings as before)
-        utilities.load_config_if_not_already_loaded(new_config)
-        utilities.wait_for_iocs_to_be_up(["SIMPLE"], SECONDS_TO_WAIT_FOR_IOC_STARTS)
-        time.sleep(30)  # Time for IOCs to fully boot etc
+        with IocLifecycleTracker(["SIMPLE"]) as tracker:
+            tracker.wait_for_iocs_up(SECONDS_TO_WAIT_FOR_IOC_STARTS)
+            before = tracker.mark()
 
-        new_simple_start_time = utilities.wait_for_string_pvs_to_not_be_empty(
-            [simple_start_time_pv], SECONDS_TO_WAIT_FOR_IOC_STARTS, is_local=True
-        )[simple_start_time_pv]
+            # Load a config containing a different IOC, but still containing SIMPLE
+            utilities.load_config_if_not_already_loaded(new_config)
+            tracker.wait_for_iocs_up(SECONDS_TO_WAIT_FOR_IOC_STARTS)
 
-        # Assert that SIMPLE start time has not changed, i.e. SIMPLE didn't restart as a result of the config change.
-        self.assertEqual(simple_start_time, new_simple_start_time)
+            # SIMPLE has the same settings as before, so should not restart
+            self.assertFalse(tracker.restarted_between("SIMPLE", before, tracker.mark()))
 
     @parameterized.expand(
         parameterized_list(
@@ -168,25 +138,18 @@ class TestBlockserver(unittest.TestCase):
     ):
         utilities.load_config_if_not_already_loaded(old_config)
 
-        utilities.wait_for_iocs_to_be_up(["SIMPLE"], SECONDS_TO_WAIT_FOR_IOC_STARTS)
-        time.sleep(30)  # Time for IOCs to fully boot etc
-
-        simple_start_time_pv = "CS:IOC:SIMPLE:DEVIOS:STARTTOD"
-        simple_start_time = utilities.wait_for_string_pvs_to_not_be_empty(
-            [simple_start_time_pv], SECONDS_TO_WAIT_FOR_IOC_STARTS, is_local=True
-        )[simple_start_time_pv]
-
-        # Load a config containing a different IOC, but still containing SIMPLE (with the same settings as before)
-        utilities.load_config_if_not_already_loaded(new_config)
-        utilities.wait_for_iocs_to_be_up(["SIMPLE"], SECONDS_TO_WAIT_FOR_IOC_STARTS)
-        time.sleep(30)  # Time for IOCs to fully boot etc
+        with IocLifecycleTracker(["SIMPLE"]) as tracker:
+            tracker.wait_for_iocs_up(SECONDS_TO_WAIT_FOR_IOC_STARTS)
+            before = tracker.mark()
 
-        new_simple_start_time = utilities.wait_for_string_pvs_to_not_be_empty(
-            [simple_start_time_pv], SECONDS_TO_WAIT_FOR_IOC_STARTS, is_local=True
-        )[simple_start_time_pv]
+            # Load a config containing a different IOC, but still containing SIMPLE
+            utilities.load_config_if_not_already_loaded(new_config)
+            tracker.wait_for_iocs_up(SECONDS_TO_WAIT_FOR_IOC_STARTS)
 
-        # Assert that SIMPLE start time has changed, as the IOC has different settings in the new config
-        self.assertNotEqual(simple_start_time, new_simple_start_time)
+            # SIMPLE has different settings in the new config, so should restart
+            self.assertIsNotNone(
+                tracker.wait_for_restart("SIMPLE", before, SECONDS_TO_WAIT_FOR_IOC_STARTS)
+            )
 
     def test_GIVEN_manually_started_ioc_WHEN_changing_to_config_containing_ioc_but_without_autostart_THEN_ioc_stopped(
         self,
@@ -271,45 +234,39 @@ class TestBlockserver(unittest.TestCase):
         self,
     ):
         utilities.load_config_if_not_already_loaded("test_blockserver_with_gw_archiver")
-        time.sleep(30)
 
-        def assert_block_archive_blocks_group_has_one_channel():
-            response = requests.get(self.block_archive_blocks_url).json()
-
-            assert_that(len(response["Channels"]), is_(1))
-            assert_that(response["Channels"][0]["Channel"], is_("PREFIX:MYTESTBLOCK"))
-
-        utilities.retry_assert(5, assert_block_archive_blocks_group_has_one_channel, 3.0)
+        self.block_archive.wait_for_channels(["PREFIX:MYTESTBLOCK"], SECONDS_TO_WAIT_FOR_ARCHIVER)
 
     def test_GIVEN_config_claims_but_does_not_contain_gw_and_archiver_files_THEN_archiver_configuration_generated_by_blockserver(
         self,
     ):
         utilities.load_config_if_not_already_loaded("test_blockserver_without_gw_archiver")
-        time.sleep(30)
 
-        response = requests.get(self.block_archive_blocks_url).json()
+        channels = self.block_archive.wait_for_channels(
+            lambda names: len(names) == 2, SECONDS_TO_WAIT_FOR_ARCHIVER
+        )
 
-        assert_that(len(response["Channels"]), is_(2))
-        assert_that(response["Channels"][0]["Channel"], ends_with("TIZROUTOFRANGE"))
-        assert_that(response["Channels"][1]["Channel"], ends_with("TIZRWARNING"))
+        assert_that(channels[0], ends_with("TIZROUTOFRANGE"))
+        assert_that(channels[1], ends_with("TIZRWARNING"))
 
     def test_GIVEN_config_does_not_contain_gw_and_archiver_files_THEN_archiver_configuration_generated_by_blockserver(
         self,
     ):
         utilities.load_config_if_not_already_loaded("test_blockserver")
 
-        response = requests.get(self.block_archive_blocks_url).json()
+        channels = self.block_archive.wait_for_channels(
+            lambda names: len(names) == 1, SECONDS_TO_WAIT_FOR_ARCHIVER
+        )
 
-        assert_that(len(response["Channels"]), is_(1))
-        assert_that(response["Channels"][0]["Channel"], ends_with("a"))
+        assert_that(channels[0], ends_with("a"))
 
     def test_GIVEN_config_contains_gw_and_archiver_files_THEN_configuration_pvlist_used(self):
         config = "test_blockserver_with_gw_archiver"
         utilities.load_config_if_not_already_loaded(config)
 
         config_pvlist_file = os.path.join(self.config_dir, config, "gwblock.pvlist")
-        with open(self.pvlist_file, "r") as pvlist, open(config_pvlist_file, "r") as config_pvlist:
-            assert_that(pvlist.read(), is_(config_pvlist.read()))
+        diff = compare_rule_files(config_pvlist_file, self.pvlist_file, PVLIST_KEY_TOKENS)
+        assert_that(diff.describe(), is_("No differences"))
 
     def test_GIVEN_config_claims_but_does_not_contain_gw_and_archiver_files_THEN_pvlist_generated(
         self,
@@ -333,10 +290,10 @@ class TestBlockserver(unittest.TestCase):
         utilities.load_config_if_not_already_loaded(config)
 
         config_rc_settings_file = os.path.join(self.config_dir, config, "rc_settings.cmd")
-        with open(self.rc_settings_file, "r") as rc_settings, open(
-            config_rc_settings_file, "r"
-        ) as config_rc_settings:
-            assert_that(rc_settings.read(), is_(config_rc_settings.read()))
+        diff = compare_rule_files(
+            config_rc_settings_file, self.rc_settings_file, RC_SETTINGS_KEY_TOKENS
+        )
+        assert_that(diff.describe(), is_("No differences"))
 
     def test_GIVEN_config_claims_but_does_not_contain_rc_settings_THEN_rc_settings_generated(self):
         utilities.load_config_if_not_already_loaded("test_blockserver_without_gw_archiver")
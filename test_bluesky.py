@@ -29,6 +29,7 @@ from ibex_bluesky_core.utils import get_pv_prefix
 from ophyd_async.plan_stubs import ensure_connected
 
 from utilities.utilities import (
+    ensure_instrument_set,
     load_config_if_not_already_loaded,
     set_genie_python_raises_exceptions,
     setup_simulated_wiring_tables,
@@ -48,7 +49,7 @@ LOG_FILE_NAME = "bluesky.log"
 
 class TestBluesky(unittest.TestCase):
     def setUp(self) -> None:
-        g.set_instrument(None)
+        ensure_instrument_set()
         load_config_if_not_already_loaded("bluesky_sys_test")
         setup_simulated_wiring_tables()
         set_genie_python_raises_exceptions(True)
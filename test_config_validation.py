@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from utilities.config_validation import COMPONENTS_DIRECTORY, validate_configs
+from utilities.resource_locks import resource_locks
+from utilities.synthetic_configs import SyntheticConfig, write_synthetic_config
+
+CONFIGS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "configs")
+
+
+@resource_locks()
+class TestConfigValidation(unittest.TestCase):
+    """
+    Tests of the validation run on configs before they are deployed, which do not need an
+    instrument.
+    """
+
+    def setUp(self) -> None:
+        self.config_root = tempfile.mkdtemp()
+        self.config = SyntheticConfig(name="synthetic", blocks=100, groups=3, components=2)
+        self.directory = write_synthetic_config(self.config_root, self.config)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.config_root)
+
+    def _replace_in(self, path: str, old: str, new: str) -> None:
+        with open(path) as xml_file:
+            content = xml_file.read()
+        with open(path, "w") as xml_file:
+            xml_file.write(content.replace(old, new, 1))
+
+    def _problems(self) -> list[str]:
+        return [problem.message for problem in validate_configs(self.config_root).problems]
+
+    def test_GIVEN_configs_in_repository_THEN_they_are_valid(self):
+        index = validate_configs(CONFIGS_DIRECTORY)
+
+        self.assertEqual(index.problems, [], index.describe_problems())
+        self.assertIn("simple1", index.configurations)
+        self.assertIn(
+            "simple_comp_macros", index.component_references["component_with_simple_macros"]
+        )
+
+    def test_GIVEN_synthetic_config_THEN_it_is_valid_and_indexed(self):
+        index = validate_configs(self.config_root)
+
+        self.assertEqual(index.problems, [], index.describe_problems())
+        self.assertEqual(len(index.blocks), 100)
+        self.assertEqual(index.iocs["GALIL_01"], ["synthetic_comp_0"])
+        self.assertEqual(index.iocs["GALIL_02"], ["synthetic_comp_1"])
+        self.assertEqual(len(index.block_pvs[self.config.read_pv]), 100)
+
+    def test_GIVEN_missing_component_THEN_reported(self):
+        shutil.rmtree(os.path.join(self.config_root, COMPONENTS_DIRECTORY, "synthetic_comp_1"))
+
+        self.assertEqual(self._problems(), ["component synthetic_comp_1 does not exist"])
+
+    def test_GIVEN_block_in_config_and_component_THEN_reported(self):
+        self._replace_in(os.path.join(self.directory, "blocks.xml"), "SYN_B20<", "syn_c0_b0<")
+
+        self.assertIn("block SYN_C0_B0 is in synthetic and synthetic_comp_0", self._problems())
+
+    def test_GIVEN_group_with_unknown_block_THEN_reported(self):
+        self._replace_in(os.path.join(self.directory, "groups.xml"), '"SYN_B20"', '"MISSING"')
+
+        self.assertEqual(
+            self._problems(), ["group SYN_GROUP_0 contains block MISSING, which does not exist"]
+        )
+
+    def test_GIVEN_invalid_xml_THEN_reported(self):
+        self._replace_in(os.path.join(self.directory, "iocs.xml"), "/>", ">")
+
+        problems = self._problems()
+
+        self.assertEqual(len(problems), 1)
+        self.assertIn("is not valid XML", problems[0])
+
+    def test_GIVEN_missing_file_THEN_reported(self):
+        os.remove(os.path.join(self.directory, "meta.xml"))
+
+        self.assertEqual(self._problems(), ["file is missing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
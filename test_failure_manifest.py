@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.suite import _ErrorHolder
+
+from utilities.failure_manifest import (
+    ERROR,
+    FAILURE,
+    FailedTest,
+    failed_to_load,
+    group_by_config,
+    read_failure_manifest,
+    rerun_id,
+    write_failure_manifest,
+)
+from utilities.resource_locks import resource_locks
+
+FAILED_TESTS = [
+    FailedTest("test_blockserver.TestBlockserver.test_a", FAILURE, 12.5, "empty_for_system_tests"),
+    FailedTest("test_genie_python_using_simple.TestBlockUtils.test_b", ERROR, 3.0, "rcptt_simple"),
+    FailedTest("test_blockserver.TestBlockserver.test_c", FAILURE, 40.0, "empty_for_system_tests"),
+    FailedTest("test_genie_python_using_simple.SystemTestScriptChecker.test_d", ERROR, 1.0, None),
+]
+
+
+@resource_locks()
+class TestFailureManifest(unittest.TestCase):
+    """
+    Tests of the manifest of failed tests used by --rerun-failed, which do not need an instrument.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "reports", "failed_tests.json")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_WHEN_manifest_written_THEN_same_failed_tests_read(self) -> None:
+        write_failure_manifest(self.path, FAILED_TESTS)
+        self.assertEqual(read_failure_manifest(self.path), FAILED_TESTS)
+
+    def test_GIVEN_passing_run_WHEN_manifest_written_THEN_no_failed_tests_read(self) -> None:
+        write_failure_manifest(self.path, FAILED_TESTS)
+        write_failure_manifest(self.path, [])
+        self.assertEqual(read_failure_manifest(self.path), [])
+
+    def test_GIVEN_no_manifest_WHEN_read_THEN_no_failed_tests(self) -> None:
+        self.assertEqual(read_failure_manifest(self.path), [])
+
+    def test_WHEN_group_by_config_THEN_tests_grouped_in_order_configs_first_needed(self) -> None:
+        self.assertEqual(
+            group_by_config(FAILED_TESTS),
+            {
+                "empty_for_system_tests": [
+                    "test_blockserver.TestBlockserver.test_a",
+                    "test_blockserver.TestBlockserver.test_c",
+                ],
+                "rcptt_simple": ["test_genie_python_using_simple.TestBlockUtils.test_b"],
+                None: ["test_genie_python_using_simple.SystemTestScriptChecker.test_d"],
+            },
+        )
+
+    def test_GIVEN_class_failed_WHEN_group_by_config_THEN_its_tests_not_run_again(self) -> None:
+        failed_tests = FAILED_TESTS[:1] + [
+            FailedTest("test_blockserver.TestBlockserver", ERROR, 0.0, "empty_for_system_tests")
+        ]
+        self.assertEqual(
+            group_by_config(failed_tests),
+            {"empty_for_system_tests": ["test_blockserver.TestBlockserver"]},
+        )
+
+    def test_WHEN_rerun_id_of_test_THEN_its_dotted_name(self) -> None:
+        self.assertEqual(rerun_id(self), self.id())
+
+    def test_WHEN_rerun_id_of_failed_class_fixture_THEN_dotted_name_of_class(self) -> None:
+        holder = _ErrorHolder("setUpClass (test_blockserver.TestBlockserver)")
+        self.assertEqual(rerun_id(holder), "test_blockserver.TestBlockserver")
+
+    def test_WHEN_rerun_id_of_module_which_failed_to_import_THEN_name_of_module(self) -> None:
+        (failed,) = unittest.TestLoader().loadTestsFromName("test_no_such_module")
+        self.assertTrue(failed_to_load(failed))
+        self.assertEqual(rerun_id(failed), "test_no_such_module")
+
+    def test_WHEN_test_loaded_THEN_not_failed_to_load(self) -> None:
+        self.assertFalse(failed_to_load(self))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+
+from utilities.gateway_files import RC_SETTINGS_KEY_TOKENS, compare_rule_files, iter_rules
+from utilities.resource_locks import resource_locks
+
+PVLIST = """\
+##
+EVALUATION ORDER ALLOW, DENY
+
+## serve blockserver internal variables
+.*:CS:GATEWAY:BLOCKSERVER:.*    \t\t\t    ALLOW\tANYBODY\t    1
+.*:CS:SB:TIZRWARNING\\([.:].*\\)    ALIAS    .*:TIZR_01:TIZRWARNING\\1
+.*:CS:SB:TIZRWARNING    ALIAS    .*:TIZR_01:TIZRWARNING
+.*:CS:SB:TIZRWARNING\\(:[ADR]C:.*\\)    DENY
+"""
+
+# Rules in a large generated pvlist, which is several MB
+LARGE_PVLIST_BLOCKS = 50000
+
+
+@resource_locks()
+class TestGatewayFiles(unittest.TestCase):
+    """
+    Tests of the streaming comparison of gateway pvlist and rc_settings files, which do not need
+    an instrument.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as rule_file:
+            rule_file.write(content)
+        return path
+
+    def _write_large_pvlist(self, name: str, changed_block: int | None = None) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as rule_file:
+            rule_file.write("EVALUATION ORDER ALLOW, DENY\n")
+            for block in range(LARGE_PVLIST_BLOCKS):
+                target = "OTHER" if block == changed_block else "TARGET"
+                rule_file.write(f".*:CS:SB:BLOCK{block}    ALIAS    .*:IOC_01:{target}{block}\n")
+        return path
+
+    def test_WHEN_rules_read_THEN_comments_and_whitespace_normalised(self):
+        rules = list(iter_rules(self._write("gwblock.pvlist", PVLIST)))
+
+        self.assertEqual(
+            [rule.text for rule in rules[:2]],
+            ["EVALUATION ORDER ALLOW, DENY", ".*:CS:GATEWAY:BLOCKSERVER:.* ALLOW ANYBODY 1"],
+        )
+        self.assertEqual(rules[1].key, ".*:CS:GATEWAY:BLOCKSERVER:.*")
+        self.assertEqual(rules[1].line_number, 5)
+
+    def test_GIVEN_files_differ_only_in_comments_and_whitespace_THEN_no_differences(self):
+        expected = self._write("expected.pvlist", PVLIST)
+        actual = self._write(
+            "actual.pvlist",
+            "# generated\n" + PVLIST.replace("    ", " ").replace("##", "# other comment"),
+        )
+
+        diff = compare_rule_files(expected, actual)
+
+        self.assertFalse(diff, diff.describe())
+        self.assertEqual(diff.describe(), "No differences")
+
+    def test_GIVEN_rules_added_removed_and_changed_THEN_each_reported(self):
+        expected = self._write("expected.pvlist", PVLIST)
+        actual = self._write(
+            "actual.pvlist",
+            PVLIST.replace("ALLOW\tANYBODY\t    1", "ALLOW ANYBODY 2").replace(
+                ".*:CS:SB:TIZRWARNING    ALIAS    .*:TIZR_01:TIZRWARNING\n", ""
+            )
+            + ".*:CS:SB:NEW    ALIAS    .*:NEW_01:NEW\n",
+        )
+
+        diff = compare_rule_files(expected, actual)
+
+        self.assertEqual([rule.key for rule in diff.added], [".*:CS:SB:NEW"])
+        self.assertEqual([rule.key for rule in diff.removed], [".*:CS:SB:TIZRWARNING"])
+        self.assertEqual(
+            [(old.text, new.text) for old, new in diff.changed],
+            [
+                (
+                    ".*:CS:GATEWAY:BLOCKSERVER:.* ALLOW ANYBODY 1",
+                    ".*:CS:GATEWAY:BLOCKSERVER:.* ALLOW ANYBODY 2",
+                )
+            ],
+        )
+
+    def test_GIVEN_rule_moved_THEN_reported_as_moved(self):
+        expected = self._write("expected.pvlist", "A ALLOW\nB DENY\nC ALLOW\nD ALLOW\n")
+        actual = self._write("actual.pvlist", "A ALLOW\nC ALLOW\nD ALLOW\nB DENY\n")
+
+        diff = compare_rule_files(expected, actual)
+
+        self.assertEqual([(old.line_number, new.line_number) for old, new in diff.moved], [(2, 4)])
+        self.assertFalse(diff.added or diff.removed or diff.changed)
+        self.assertIn("Moved line 2: B DENY -> line 4: B DENY", diff.describe())
+
+    def test_GIVEN_rules_shifted_by_added_rule_THEN_not_reported_as_moved(self):
+        expected = self._write("expected.pvlist", "A ALLOW\nB DENY\nC ALLOW\n")
+        actual = self._write("actual.pvlist", "NEW ALLOW\nA ALLOW\nB DENY\nC ALLOW\n")
+
+        diff = compare_rule_files(expected, actual)
+
+        self.assertEqual([rule.key for rule in diff.added], ["NEW"])
+        self.assertFalse(diff.moved)
+
+    def test_GIVEN_rc_settings_WHEN_compared_THEN_rules_keyed_by_command_and_pv(self):
+        expected = self._write(
+            "expected.cmd",
+            "REM a comment\n"
+            'dbpf "$(MYPVPREFIX)CS:SB:A:RC:LOW" "1"\n'
+            'dbpf "$(MYPVPREFIX)CS:SB:A:RC:HIGH" "2"\n',
+        )
+        actual = self._write(
+            "actual.cmd",
+            'dbpf "$(MYPVPREFIX)CS:SB:A:RC:LOW" "1"\ndbpf "$(MYPVPREFIX)CS:SB:A:RC:HIGH" "3"\n',
+        )
+
+        diff = compare_rule_files(expected, actual, RC_SETTINGS_KEY_TOKENS)
+
+        self.assertEqual(len(diff.changed), 1)
+        self.assertFalse(diff.added or diff.removed)
+
+    def test_GIVEN_many_differences_WHEN_described_THEN_description_is_bounded(self):
+        expected = self._write("expected.pvlist", "")
+        actual = self._write("actual.pvlist", "".join(f"PV{i} ALLOW\n" for i in range(1000)))
+
+        description = compare_rule_files(expected, actual).describe(max_described=5)
+
+        self.assertEqual(len(description.splitlines()), 7)
+        self.assertIn("995 more added", description)
+
+    def test_GIVEN_large_files_with_one_change_WHEN_compared_THEN_memory_does_not_grow_with_size(
+        self,
+    ):
+        expected = self._write_large_pvlist("expected.pvlist")
+        actual = self._write_large_pvlist("actual.pvlist", changed_block=LARGE_PVLIST_BLOCKS // 2)
+
+        tracemalloc.start()
+        try:
+            diff = compare_rule_files(expected, actual)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(diff.changed), 1)
+        self.assertFalse(diff.moved)
+        self.assertLess(peak, os.path.getsize(expected) // 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
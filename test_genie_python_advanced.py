@@ -3,6 +3,7 @@ import unittest
 from parameterized import parameterized as param
 
 from utilities.utilities import (
+    ensure_instrument_set,
     g,
     load_config_if_not_already_loaded,
     set_genie_python_raises_exceptions,
@@ -13,7 +14,7 @@ ADV_CONFIG_NAME = "advanced"
 
 class TestAdvancedMotorControls(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
         load_config_if_not_already_loaded(ADV_CONFIG_NAME)
         set_genie_python_raises_exceptions(True)
 
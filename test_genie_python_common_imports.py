@@ -1,8 +1,9 @@
-import importlib
 import pkgutil
-import types
 import unittest
-import warnings
+
+from parameterized import parameterized
+
+from utilities.import_profiling import profile_import, sweep_imports
 
 IGNORED_MODULES = {
     "curses",  # Not supported on windows
@@ -24,49 +25,79 @@ IGNORED_MODULES = {
     "pip",
 }
 
+# Number of the slowest imports from the sweep of all modules to print
+SLOWEST_TO_REPORT = 10
+
+# Maximum number of seconds it may take to start python and import each of these modules. These
+# are what users wait for whenever a scripting console is opened.
+IMPORT_TIME_BUDGETS = {
+    "genie_python.genie": 10.0,
+    "genie_python.genie_startup": 20.0,
+    "matplotlib.pyplot": 5.0,
+    "bluesky": 5.0,
+    "ibex_bluesky_core": 15.0,
+}
+
 
 class TestGeniePythonImports(unittest.TestCase):
     """
     Tests that modules which users use can be imported.
     """
 
-    def _attempt_to_import_module_by_name(self, module_name: str) -> str | None:
+    @staticmethod
+    def _should_import(module_name: str) -> bool:
         """
-        Attempts to import a module by name.
-        :param module_name: the module name to import
-        :return: None if no error on import, String describing error if there was an error.
+        :param module_name: the module name to check
+        :return: True if the module should be imported by the sweep, False if it is ignored.
         """
-
-        if module_name in IGNORED_MODULES or module_name.startswith("_"):
-            return None
-
-        try:
-            mod = importlib.import_module(module_name)
-            self.assertIsInstance(mod, types.ModuleType)
-            del mod
-        except Exception as e:
-            return "Could not import module '{}'. Exception was: {}: {}.".format(
-                module_name, e.__class__.__name__, e
-            )
-        else:
-            return None
+        return module_name not in IGNORED_MODULES and not module_name.startswith("_")
 
     def test_WHEN_importing_all_installed_packages_THEN_no_error(self) -> None:
         """
         This tests that all of the modules we've installed are importable as modules.
-        """
 
-        # Ignore warnings. We get lots of these from various modules and it's too noisy for this
-        # test suite.
-        warnings.filterwarnings("ignore")
+        Modules are imported in batches, in parallel, each batch in a fresh interpreter, so that
+        side effects of importing one module (or crashing the interpreter) do not affect others.
+        """
+        modules = sorted(
+            pkg
+            for _, pkg, is_package in pkgutil.iter_modules()
+            if is_package and self._should_import(pkg)
+        )
+        results = sweep_imports(modules)
 
-        failures = []
-        for _, pkg, is_package in pkgutil.iter_modules():
-            if is_package:
-                res = self._attempt_to_import_module_by_name(pkg)
-                if res is not None:
-                    failures.append(res)
+        timed = [result for result in results if result.seconds is not None]
+        print("Slowest imports:")
+        for result in sorted(timed, key=lambda r: r.seconds, reverse=True)[:SLOWEST_TO_REPORT]:
+            memory = f"RSS {result.rss_bytes}"
+            if result.peak_rss_bytes is not None:
+                memory += f", peak {result.peak_rss_bytes}"
+            print(f"  {result.module}: {result.seconds:.3f}s, {memory}")
 
+        failures = [
+            "Could not import module '{}'. Exception was: {}.".format(result.module, result.error)
+            for result in results
+            if result.error is not None
+        ]
         self.assertEqual(
             len(failures), 0, "Could not import modules: \n{}".format("\n".join(failures))
         )
+
+
+class TestGeniePythonImportTimes(unittest.TestCase):
+    """
+    Tests that the modules users import when a scripting console starts import quickly enough.
+    """
+
+    @parameterized.expand(list(IMPORT_TIME_BUDGETS.items()))
+    def test_WHEN_importing_module_in_clean_interpreter_THEN_import_time_within_budget(
+        self, module_name: str, budget: float
+    ) -> None:
+        profile = profile_import(module_name)
+        print(profile.report())
+
+        self.assertLessEqual(
+            profile.total_seconds(),
+            budget,
+            f"Importing {module_name} is over budget.\n{profile.report()}",
+        )
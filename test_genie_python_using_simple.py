@@ -11,8 +11,10 @@ from genie_python.genie_script_checker import ScriptChecker
 from genie_python.testing_utils.script_checker import CreateTempScriptAndReturnErrors
 from hamcrest import assert_that, is_, is_in
 
+from utilities.resource_locks import resource_locks
 from utilities.utilities import (
     check_block_exists,
+    ensure_instrument_set,
     g,  # type: ignore
     load_config_if_not_already_loaded,
     retry_on_failure,
@@ -38,14 +40,16 @@ def delayed_set_pv(wait_before_set, wait_after_set, pv, value_to_set):
     time.sleep(wait_after_set)
 
 
+@resource_locks(config=SIMPLE_CONFIG_NAME)
 class TestBlockUtils(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
 
         # all tests that interact with anything but genie should try to load a config to ensure that the configurations
         # in the tests are not broken, e.g. by a schema update
         load_config_if_not_already_loaded(SIMPLE_CONFIG_NAME)
 
+    @resource_locks(blocks=["MBBI_BLOCK"], pvs=["SIMPLE:MBBI"])
     @retry_on_failure(3)
     def test_GIVE_config_with_mbbi_block_WHEN_set_and_get_block_value_THEN_value_is_set_and_read(
         self,
@@ -58,6 +62,7 @@ class TestBlockUtils(unittest.TestCase):
             g.waitfor_block(mbbi_block_name, value=expected_val, maxwait=TIMEOUT)
             assert_that(g.cget(mbbi_block_name)["value"], is_(expected_val))
 
+    @resource_locks(blocks=["MBBI_BLOCK"], pvs=["SIMPLE:MBBI"])
     @retry_on_failure(3)
     def test_GIVE_config_with_mbbi_block_WHEN_set_and_get_block_value_using_kwarg_syntax_THEN_value_is_set_and_read(
         self,
@@ -70,6 +75,7 @@ class TestBlockUtils(unittest.TestCase):
             g.waitfor_block(mbbi_block_name, value=expected_val, maxwait=TIMEOUT)
             assert_that(g.cget(mbbi_block_name)["value"], is_(expected_val))
 
+    @resource_locks(blocks=["BI_BLOCK"], pvs=["SIMPLE:BI"])
     @retry_on_failure(3)
     def test_GIVE_config_with_bi_block_WHEN_set_and_get_block_value_THEN_value_is_set_and_read(
         self,
@@ -82,6 +88,7 @@ class TestBlockUtils(unittest.TestCase):
             g.waitfor_block(bi_block_name, value=expected_val, maxwait=TIMEOUT)
             assert_that(g.cget(bi_block_name)["value"], is_(expected_val))
 
+    @resource_locks(blocks=["BI_BLOCK"], pvs=["SIMPLE:BI"])
     @retry_on_failure(3)
     def test_GIVE_config_with_bi_block_WHEN_set_and_get_block_value_using_kwarg_syntax_THEN_value_is_set_and_read(
         self,
@@ -94,6 +101,7 @@ class TestBlockUtils(unittest.TestCase):
             g.waitfor_block(bi_block_name, value=expected_val, maxwait=TIMEOUT)
             assert_that(g.cget(bi_block_name)["value"], is_(expected_val))
 
+    @resource_locks(pvs=["SIMPLE:MBBI"])
     @retry_on_failure(3)
     def test_GIVE_config_with_mbbi_pv_WHEN_set_and_get_pv_value_with_not_is_local_THEN_value_is_set_and_read(
         self,
@@ -104,6 +112,7 @@ class TestBlockUtils(unittest.TestCase):
             g.set_pv(mbbi_pv_name, expected_val, wait=True)
             assert_that(g.get_pv(mbbi_pv_name), is_(expected_val))
 
+    @resource_locks(pvs=["SIMPLE:BI"])
     @retry_on_failure(3)
     def test_GIVE_config_with_bi_pv_WHEN_set_and_get_pv_value_with_is_local_THEN_value_is_set_and_read(
         self,
@@ -114,6 +123,7 @@ class TestBlockUtils(unittest.TestCase):
             g.set_pv(bi_pv_name, expected_val, is_local=True, wait=True)
             assert_that(g.get_pv(bi_pv_name, is_local=True), is_(expected_val))
 
+    @resource_locks(pvs=["SIMPLE:BI"])
     @retry_on_failure(3)
     def test_GIVE_config_with_bi_pv_WHEN_set_pv_value_with_None_THEN_value_is_not_set(
         self,
@@ -126,7 +136,7 @@ class TestBlockUtils(unittest.TestCase):
 
 class TestWaitforPV(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
         load_config_if_not_already_loaded(SIMPLE_CONFIG_NAME)
         set_genie_python_raises_exceptions(True)
 
@@ -188,7 +198,7 @@ class TestWaitforPV(unittest.TestCase):
 
 class TestDispSetOnBlock(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
         load_config_if_not_already_loaded(SIMPLE_CONFIG_NAME)
         set_genie_python_raises_exceptions(True)
         self._pv_name = g.prefix_pv_name("SIMPLE:VALUE1:SP")
@@ -229,7 +239,7 @@ class TestDispSetOnBlock(unittest.TestCase):
 
 class TestWaitforBlock(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
         load_config_if_not_already_loaded(SIMPLE_CONFIG_NAME)
         self.pv_name = g.prefix_pv_name("SIMPLE:VALUE1:SP")
         self.block_name = "FLOAT_BLOCK"
@@ -445,7 +455,7 @@ class TestWaitforBlock(unittest.TestCase):
 
 class TestRunControl(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
         load_config_if_not_already_loaded(SIMPLE_CONFIG_NAME)
         self.block_name = "FLOAT_BLOCK"
         assert_that(check_block_exists(self.block_name), is_(True))
@@ -484,7 +494,7 @@ class TestRunControl(unittest.TestCase):
 
 class TestAlerts(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
         load_config_if_not_already_loaded(SIMPLE_CONFIG_NAME)
         self.block_name = "FLOAT_BLOCK"
         assert_that(check_block_exists(self.block_name), is_(True))
@@ -576,9 +586,10 @@ class TestAlerts(unittest.TestCase):
         self.assertEqual(g.get_runstate(), state)
 
 
+@resource_locks()
 class SystemTestScriptChecker(unittest.TestCase):
     def setUp(self):
-        g.set_instrument(None)
+        ensure_instrument_set()
 
     # Test that functions from C:\Instrument\scripts can be accessed and reports pyright reports error if used incorrectly
     # "" C:\Instrument\Settings\config\NDW2452\Python\inst ""
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from utilities.globals_file import recsim_macros, temporary_globals
+from utilities.resource_locks import resource_locks
+
+GLOBALS = "SIMPLE__SOME_MACRO=1\r\nOTHER_01__PORT=COM1"
+
+
+@resource_locks()
+class TestGlobalsFile(unittest.TestCase):
+    """
+    Tests of temporary edits to globals.txt, which do not need an instrument.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "globals.txt")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def _read(self) -> str:
+        with open(self.path, newline="") as globals_file:
+            return globals_file.read()
+
+    def _write(self, contents: str) -> None:
+        with open(self.path, "w", newline="") as globals_file:
+            globals_file.write(contents)
+
+    def test_WHEN_recsim_macros_THEN_one_line_per_ioc(self) -> None:
+        self.assertEqual(
+            recsim_macros(["EUROTHRM_01", "SIMPLE"]),
+            ["EUROTHRM_01__RECSIM=1", "SIMPLE__RECSIM=1"],
+        )
+
+    def test_GIVEN_globals_WHEN_in_temporary_globals_THEN_macros_added_after_existing_lines(
+        self,
+    ) -> None:
+        self._write(GLOBALS)
+        with temporary_globals(self.path, recsim_macros(["EUROTHRM_01", "EUROTHRM_02"])):
+            self.assertEqual(
+                self._read(), f"{GLOBALS}\nEUROTHRM_01__RECSIM=1\nEUROTHRM_02__RECSIM=1\n"
+            )
+
+    def test_GIVEN_globals_WHEN_temporary_globals_exits_THEN_original_restored_exactly(
+        self,
+    ) -> None:
+        self._write(GLOBALS)
+        with temporary_globals(self.path, recsim_macros(["SIMPLE"])):
+            pass
+        self.assertEqual(self._read(), GLOBALS)
+
+    def test_GIVEN_globals_WHEN_error_in_temporary_globals_THEN_original_restored(self) -> None:
+        self._write(GLOBALS)
+        with self.assertRaises(IOError):
+            with temporary_globals(self.path, recsim_macros(["SIMPLE"])):
+                raise IOError("IOC failed to start")
+        self.assertEqual(self._read(), GLOBALS)
+
+    def test_GIVEN_no_globals_WHEN_temporary_globals_exits_THEN_file_removed(self) -> None:
+        with temporary_globals(self.path, recsim_macros(["SIMPLE"])):
+            self.assertEqual(self._read(), "SIMPLE__RECSIM=1\n")
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_WHEN_temporary_globals_exits_THEN_no_temporary_files_left(self) -> None:
+        self._write(GLOBALS)
+        with temporary_globals(self.path, recsim_macros(["SIMPLE"])):
+            pass
+        self.assertEqual(os.listdir(self.directory), ["globals.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -40,7 +40,7 @@ def assert_tables(cls: unittest.TestCase, detector: str, wiring: str, spectra: s
 class TestInstrumentScriptsSans2d(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        g.set_instrument(None)
+        utilities.ensure_instrument_set()
         utilities.load_config_if_not_already_loaded("instrument_scripts_sans2d")
 
         from instrument.sans2d.sans import Sans2d
@@ -196,7 +196,7 @@ class TestInstrumentScriptsSans2d(unittest.TestCase):
 class TestInstrumentScriptsZOOM(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        g.set_instrument(None)
+        utilities.ensure_instrument_set()
         utilities.load_config_if_not_already_loaded("instrument_scripts_zoom")
 
         from instrument.zoom.sans import Zoom
@@ -298,7 +298,7 @@ class TestInstrumentScriptsZOOM(unittest.TestCase):
 class TestInstrumentScriptsLOQ(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        g.set_instrument(None)
+        utilities.ensure_instrument_set()
         utilities.load_config_if_not_already_loaded("instrument_scripts_loq")
 
         from instrument.loq.sans import LOQ
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from utilities.ioc_catalogue import IocCatalogue, IocEntry, load_ioc_catalogue
+from utilities.resource_locks import resource_locks
+
+CONFIGS_NAMESPACE = "http://epics.isis.rl.ac.uk/schema/ioc_configs/1.0"
+CONFIG_NAMESPACE = "http://epics.isis.rl.ac.uk/schema/ioc_config/1.0"
+
+# Number of families in the synthetic IOC startup config, each with IOCS_PER_FAMILY instances
+FAMILIES = 300
+IOCS_PER_FAMILY = 10
+
+
+def _ioc_config(name: str, namespace: str = "") -> str:
+    return f'<ioc_config{namespace} name="{name}"><config_part>{name}</config_part></ioc_config>\n'
+
+
+@resource_locks()
+class TestIocCatalogue(unittest.TestCase):
+    """
+    Tests of the catalogue of the IOC startup config, which do not need an instrument.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "config.xml")
+        iocs = [
+            _ioc_config(f"FAMILY{family}_{instance:02}")
+            for family in range(FAMILIES)
+            for instance in range(IOCS_PER_FAMILY, 0, -1)
+        ]
+        with open(self.path, "w") as config:
+            config.write(f'<?xml version="1.0" ?>\n<ioc_configs xmlns="{CONFIGS_NAMESPACE}">\n')
+            config.writelines(iocs)
+            config.write(_ioc_config("SIMPLE"))
+            config.write(_ioc_config("OTHER_01", f' xmlns="{CONFIG_NAMESPACE}"'))
+            config.write("</ioc_configs>\n")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_WHEN_name_parsed_THEN_family_and_instance_found(self):
+        self.assertEqual(IocEntry.from_name("EUROTHRM_02"), IocEntry("EUROTHRM_02", "EUROTHRM", 2))
+        self.assertEqual(IocEntry.from_name("SIMPLE"), IocEntry("SIMPLE", "SIMPLE", None))
+
+    def test_WHEN_loaded_THEN_iocs_from_both_schemas_indexed_by_family(self):
+        catalogue = load_ioc_catalogue(self.path)
+
+        self.assertEqual(len(catalogue), FAMILIES * IOCS_PER_FAMILY + 2)
+        self.assertIn("OTHER_01", catalogue)
+        self.assertEqual(
+            [entry.instance for entry in catalogue.families["FAMILY7"]],
+            list(range(1, IOCS_PER_FAMILY + 1)),
+        )
+
+    def test_WHEN_first_instances_selected_THEN_lowest_instances_of_each_family_returned(self):
+        iocs = load_ioc_catalogue(self.path).first_instances(2, exclude_prefixes=["FAMILY1"])
+
+        self.assertIn("FAMILY0_01", iocs)
+        self.assertIn("FAMILY0_02", iocs)
+        self.assertNotIn("FAMILY0_03", iocs)
+        self.assertNotIn("FAMILY10_01", iocs)
+        self.assertNotIn("SIMPLE", iocs)
+        self.assertEqual(iocs, sorted(iocs))
+
+    def test_GIVEN_unnumbered_included_WHEN_first_instances_selected_THEN_unnumbered_returned(self):
+        iocs = load_ioc_catalogue(self.path).first_instances(1, include_unnumbered=True)
+
+        self.assertIn("SIMPLE", iocs)
+
+    def test_WHEN_instances_selected_THEN_only_those_instance_numbers_returned(self):
+        catalogue = IocCatalogue.from_names(["GAP_01", "GAP_03", "FULL_01", "FULL_02", "SIMPLE"])
+
+        self.assertEqual(catalogue.with_instances([1, 2]), ["FULL_01", "FULL_02", "GAP_01"])
+        self.assertEqual(catalogue.with_instances([2], exclude_prefixes=["FULL"]), [])
+
+    def test_GIVEN_file_unchanged_WHEN_loaded_again_THEN_cached_catalogue_returned(self):
+        self.assertIs(load_ioc_catalogue(self.path), load_ioc_catalogue(self.path))
+
+    def test_GIVEN_file_modified_WHEN_loaded_again_THEN_catalogue_reread(self):
+        first = load_ioc_catalogue(self.path)
+        modified = os.stat(self.path).st_mtime_ns + 1_000_000_000
+        os.utime(self.path, ns=(modified, modified))
+
+        self.assertIsNot(load_ioc_catalogue(self.path), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
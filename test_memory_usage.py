@@ -6,6 +6,7 @@ from psutil import AccessDenied, NoSuchProcess, process_iter, virtual_memory
 
 from utilities.utilities import (
     BASE_MEMORY_USAGE,
+    ensure_instrument_set,
     g,
     load_config_if_not_already_loaded,
     setup_simulated_wiring_tables,
@@ -23,7 +24,7 @@ ASSUMED_NON_IBEX_USAGE = 2.0
 
 class TestMemoryUsage(unittest.TestCase):
     def setUp(self) -> None:
-        g.set_instrument(None)
+        ensure_instrument_set()
 
         setup_simulated_wiring_tables()
 
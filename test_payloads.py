@@ -0,0 +1,49 @@
+import binascii
+import json
+import unittest
+import zlib
+
+from parameterized import parameterized
+
+from utilities.payloads import decode_json_payload, decode_payload, encode_json_payload
+from utilities.resource_locks import resource_locks
+
+DETAILS = {"name": "simple1", "blocks": [{"name": "A", "pv": "TE:NDW1234:SIMPLE:VALUE1"}]}
+
+
+@resource_locks()
+class TestPayloads(unittest.TestCase):
+    """
+    Tests of blockserver payload encoding, which do not need an instrument.
+    """
+
+    def setUp(self) -> None:
+        # As genie_python's compress_and_hex encodes them
+        self.payload = binascii.hexlify(zlib.compress(bytes(json.dumps(DETAILS), "utf-8")))
+
+    @parameterized.expand(
+        [
+            ("str", lambda payload: payload.decode("ascii")),
+            ("bytes", lambda payload: payload),
+            ("bytearray", bytearray),
+            ("memoryview", memoryview),
+        ]
+    )
+    def test_GIVEN_payload_WHEN_decoded_THEN_json_returned(self, _, convert):
+        self.assertEqual(decode_json_payload(convert(self.payload)), DETAILS)
+
+    def test_WHEN_encoded_THEN_payload_decodes_as_genie_python_would(self):
+        payload = encode_json_payload(DETAILS)
+
+        decoded = zlib.decompress(binascii.unhexlify(payload)).decode("utf-8")
+        self.assertEqual(decoded, json.dumps(DETAILS))
+
+    def test_GIVEN_low_compression_level_WHEN_encoded_THEN_decodes_the_same(self):
+        self.assertEqual(decode_json_payload(encode_json_payload(DETAILS, level=1)), DETAILS)
+
+    def test_GIVEN_payload_WHEN_decoded_to_bytes_THEN_utf8_json_returned(self):
+        self.assertEqual(decode_payload(self.payload), json.dumps(DETAILS).encode("utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,9 +4,17 @@ import unittest
 import requests
 from six.moves import range
 
-from utilities.utilities import g, load_config_if_not_already_loaded, retry_on_failure
+from utilities.live_plotting import MAX_FIGURES, LiveSpectrumPlot
+from utilities.utilities import (
+    ensure_instrument_set,
+    g,
+    load_config_if_not_already_loaded,
+    retry_assert,
+    retry_on_failure,
+)
 
-MAX_FIGURES = 3
+# Number of times, a second apart, to check whether the counts of a live spectrum plot have changed
+LIVE_PLOT_UPDATE_RETRIES = 30
 
 
 class TestPlotting(unittest.TestCase):
@@ -28,7 +36,7 @@ class TestPlotting(unittest.TestCase):
         THE ORDER OF THESE ITEMS IS IMPORTANT! matplotlib.use must be before matplotlib.pyplot
         (not applicable here but more generally before matplotlib.backends too)
         """
-        g.set_instrument(os.getenv("MYPVPREFIX"))
+        ensure_instrument_set(os.getenv("MYPVPREFIX"))
 
         # all tests that interact with anything but genie should try to load a config to ensure that the configurations
         # in the tests are not broken, e.g. by a schema update
@@ -114,3 +122,43 @@ class TestPlotting(unittest.TestCase):
             self.assertEqual([1, 2, 3], p.get_fignums())
         finally:
             g.end()
+
+    @retry_on_failure(3)
+    def test_GIVEN_live_spectrum_plot_WHEN_updated_THEN_existing_lines_are_reused(self):
+        g.begin()
+        try:
+            plot = LiveSpectrumPlot(1).add_spectrum(2)
+            lines = list(plot.axes.lines)
+
+            # Wait for the counts to change, so that the update has new data to show
+            retry_assert(
+                LIVE_PLOT_UPDATE_RETRIES, lambda: self.assertTrue(plot.update(), "No new counts")
+            )
+
+            self.assertEqual(len(plot.axes.lines), len(lines))
+            for before, after in zip(lines, plot.axes.lines):
+                self.assertIs(before, after)
+            self.assert_webserver_up()
+        finally:
+            g.end()
+
+    @retry_on_failure(3)
+    def test_GIVEN_live_spectrum_plot_of_paused_run_WHEN_updated_THEN_not_redrawn(self):
+        g.begin(paused=True)
+        try:
+            plot = LiveSpectrumPlot(1)
+
+            self.assertFalse(plot.update())
+        finally:
+            g.end()
+
+    @retry_on_failure(3)
+    def test_WHEN_seven_live_spectrum_plots_added_THEN_max_figures_exist(self):
+        g.begin()
+        try:
+            for i in range(7):
+                LiveSpectrumPlot(1)
+
+            self.assertEqual(MAX_FIGURES, len(TestPlotting.PYPLOT.get_fignums()))
+        finally:
+            g.end()
@@ -0,0 +1,148 @@
+import unittest
+
+from utilities.resource_locks import (
+    EVERYTHING,
+    ScheduledUnit,
+    locks_of,
+    next_unit,
+    plan_units,
+    resource_locks,
+)
+
+
+def _example_tests() -> list[unittest.TestCase]:
+    """
+    Returns: tests of example classes, defined here so that they are not collected themselves
+    """
+
+    @resource_locks(config="rcptt_simple")
+    class BlockTests(unittest.TestCase):
+        @resource_locks(blocks=["MBBI_BLOCK"])
+        def test_mbbi(self) -> None:
+            pass
+
+        @resource_locks(blocks=["BI_BLOCK"])
+        def test_bi(self) -> None:
+            pass
+
+        def test_other(self) -> None:
+            pass
+
+    @resource_locks(config="rcptt_simple")
+    class FixtureTests(unittest.TestCase):
+        @classmethod
+        def setUpClass(cls) -> None:
+            pass
+
+        @resource_locks(dae=True)
+        def test_dae(self) -> None:
+            pass
+
+        def test_other(self) -> None:
+            pass
+
+    class UndeclaredTests(unittest.TestCase):
+        def test_anything(self) -> None:
+            pass
+
+    loader = unittest.TestLoader()
+    return [
+        test
+        for test_class in (BlockTests, FixtureTests, UndeclaredTests)
+        for test in loader.loadTestsFromTestCase(test_class)
+    ]
+
+
+def _unit(name: str, **locks) -> ScheduledUnit:
+    holder = resource_locks(**locks)(lambda: None)
+    return ScheduledUnit(name, (name,), holder.resource_locks)
+
+
+@resource_locks()
+class TestResourceLocks(unittest.TestCase):
+    """
+    Tests of declaring resource locks and scheduling tests by them, which do not need an
+    instrument.
+    """
+
+    def test_GIVEN_different_blocks_on_same_config_THEN_no_conflict(self) -> None:
+        first = _unit("first", config="rcptt_simple", blocks=["MBBI_BLOCK"])
+        second = _unit("second", config="rcptt_simple", blocks=["BI_BLOCK"])
+        self.assertFalse(first.locks.conflicts_with(second.locks))
+
+    def test_GIVEN_same_block_THEN_conflict(self) -> None:
+        first = _unit("first", config="rcptt_simple", blocks=["MBBI_BLOCK"])
+        second = _unit("second", blocks=["MBBI_BLOCK"])
+        self.assertTrue(first.locks.conflicts_with(second.locks))
+
+    def test_GIVEN_different_configs_THEN_conflict(self) -> None:
+        first = _unit("first", config="rcptt_simple")
+        second = _unit("second", config="empty_for_system_tests")
+        self.assertTrue(first.locks.conflicts_with(second.locks))
+
+    def test_GIVEN_config_change_THEN_conflicts_with_any_config_but_not_with_none(self) -> None:
+        changes = _unit("changes", changes_config=True)
+        self.assertTrue(changes.locks.conflicts_with(_unit("needs", config="rcptt_simple").locks))
+        self.assertFalse(changes.locks.conflicts_with(_unit("no_config").locks))
+
+    def test_GIVEN_both_use_dae_THEN_conflict(self) -> None:
+        first = _unit("first", dae=True)
+        second = _unit("second", dae=True)
+        self.assertTrue(first.locks.conflicts_with(second.locks))
+
+    def test_GIVEN_undeclared_THEN_conflicts_with_everything(self) -> None:
+        self.assertTrue(EVERYTHING.conflicts_with(_unit("nothing").locks))
+
+    def test_WHEN_locks_of_THEN_class_and_method_locks_combined(self) -> None:
+        tests = {f"{type(test).__name__}.{test._testMethodName}": test for test in _example_tests()}
+        locks = locks_of(tests["BlockTests.test_mbbi"])
+        self.assertEqual(locks.config, "rcptt_simple")
+        self.assertEqual(locks.exclusive, frozenset({"block:MBBI_BLOCK"}))
+        self.assertIs(locks_of(tests["UndeclaredTests.test_anything"]), EVERYTHING)
+
+    def test_WHEN_plan_units_THEN_methods_with_locks_split_unless_class_has_fixtures(self) -> None:
+        units = plan_units(_example_tests())
+        sizes = [len(unit.test_ids) for unit in units]
+        # test_bi and test_mbbi alone, test_other with the rest of its class, the fixture class
+        # and the undeclared class
+        self.assertEqual(sizes, [1, 1, 1, 2, 1])
+        self.assertEqual(units[3].locks.exclusive, frozenset({"dae"}))
+        self.assertIs(units[4].locks, EVERYTHING)
+
+    def test_GIVEN_conflicting_unit_running_WHEN_next_unit_THEN_later_non_conflicting_unit(
+        self,
+    ) -> None:
+        running = _unit("running", blocks=["MBBI_BLOCK"])
+        waiting = _unit("waiting", blocks=["MBBI_BLOCK"])
+        free = _unit("free", blocks=["BI_BLOCK"])
+        self.assertIs(next_unit([waiting, free], [running]), free)
+
+    def test_GIVEN_unit_waiting_WHEN_next_unit_THEN_not_overtaken_by_unit_it_conflicts_with(
+        self,
+    ) -> None:
+        running = _unit("running", blocks=["MBBI_BLOCK"])
+        waiting = _unit("waiting", blocks=["MBBI_BLOCK", "BI_BLOCK"])
+        overtaking = _unit("overtaking", blocks=["BI_BLOCK"])
+        self.assertIsNone(next_unit([waiting, overtaking], [running]))
+
+    def test_GIVEN_config_not_loaded_WHEN_next_unit_THEN_units_sharing_it_do_not_both_load_it(
+        self,
+    ) -> None:
+        running = _unit("running", config="rcptt_simple", blocks=["MBBI_BLOCK"])
+        waiting = _unit("waiting", config="rcptt_simple", blocks=["BI_BLOCK"])
+        self.assertIsNone(next_unit([waiting], [running], "empty_for_system_tests"))
+        self.assertIsNone(next_unit([waiting], [running], None))
+
+    def test_GIVEN_config_loaded_WHEN_next_unit_THEN_units_sharing_it_run_together(self) -> None:
+        running = _unit("running", config="rcptt_simple", blocks=["MBBI_BLOCK"])
+        waiting = _unit("waiting", config="rcptt_simple", blocks=["BI_BLOCK"])
+        self.assertIs(next_unit([waiting], [running], "rcptt_simple"), waiting)
+
+    def test_GIVEN_undeclared_unit_WHEN_next_unit_THEN_runs_alone(self) -> None:
+        undeclared = ScheduledUnit("undeclared", ("undeclared",), EVERYTHING)
+        self.assertIsNone(next_unit([undeclared], [_unit("running")]))
+        self.assertIs(next_unit([undeclared], []), undeclared)
+
+
+if __name__ == "__main__":
+    unittest.main()
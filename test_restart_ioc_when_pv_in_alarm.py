@@ -3,7 +3,7 @@ import unittest
 from general.utilities.restart_ioc_when_pv_in_alarm import restart_ioc_when_pv_in_alarm
 from genie_python.genie_startup import *
 
-from utilities.utilities import load_config_if_not_already_loaded
+from utilities.utilities import ensure_instrument_set, load_config_if_not_already_loaded
 
 BLOCK_NAME = "TEST_BLOCK"
 
@@ -14,7 +14,7 @@ class TestRestartIocWhenPvInAlarm(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        g.set_instrument(None, import_instrument_init=False)
+        ensure_instrument_set(import_instrument_init=False)
         load_config_if_not_already_loaded("test_restart_ioc_when_pv_in_alarm")
         self.thread = restart_ioc_when_pv_in_alarm(
             "TEST_BLOCK", ["SIMPLE"], ["GRUMPY"], wait_between_restarts=15
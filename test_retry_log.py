@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utilities.resource_locks import resource_locks
+from utilities.retry_log import (
+    RETRY_LOG_ENV,
+    RetryAttempt,
+    format_retry_summary,
+    new_call_id,
+    read_retry_log,
+    record_attempt,
+    summarise_retries,
+)
+
+
+def _call(name: str, outcomes: list[bool], duration: float = 1.0) -> list[RetryAttempt]:
+    """
+    Args:
+        name: name of the test retried
+        outcomes: whether each attempt passed
+        duration: seconds each attempt took
+
+    Returns: the attempts of one call
+    """
+    call_id = new_call_id()
+    return [
+        RetryAttempt(
+            name,
+            call_id,
+            attempt + 1,
+            3,
+            passed,
+            "" if passed else "AssertionError",
+            duration,
+        )
+        for attempt, passed in enumerate(outcomes)
+    ]
+
+
+@resource_locks()
+class TestRetryLog(unittest.TestCase):
+    """
+    Tests of the log of attempts made by retry_on_failure and retry_assert, which do not need an
+    instrument.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "reports", "retries.jsonl")
+        patcher = mock.patch.dict(os.environ, {RETRY_LOG_ENV: self.path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_WHEN_attempts_recorded_THEN_read_in_order_with_outcome_and_exception(self) -> None:
+        call_id = new_call_id()
+        record_attempt("test_a", call_id, 1, 3, AssertionError("no"), 2.0, 1.0)
+        record_attempt("test_a", call_id, 2, 3, None, 0.5)
+
+        attempts = read_retry_log(self.path)
+
+        self.assertEqual(
+            [(attempt.attempt, attempt.passed, attempt.exception_type) for attempt in attempts],
+            [(1, False, "AssertionError"), (2, True, "")],
+        )
+        self.assertEqual([attempt.delay for attempt in attempts], [1.0, 0.0])
+
+    def test_GIVEN_attempts_from_several_processes_WHEN_read_THEN_merged_in_order(self) -> None:
+        call_ids = [new_call_id(), new_call_id()]
+        finished_at = 1000.0
+        for attempt in (1, 2):
+            for pid, call_id in zip((100, 200), call_ids):
+                finished_at += 1
+                with (
+                    mock.patch("os.getpid", return_value=pid),
+                    mock.patch("time.time", return_value=finished_at),
+                ):
+                    record_attempt(f"test_{pid}", call_id, attempt, 3, None, 0.5)
+
+        attempts = read_retry_log(self.path)
+
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(self.path))),
+            ["retries.100.jsonl", "retries.200.jsonl"],
+        )
+        self.assertEqual(
+            [(attempt.name, attempt.attempt) for attempt in attempts],
+            [("test_100", 1), ("test_200", 1), ("test_100", 2), ("test_200", 2)],
+        )
+
+    def test_GIVEN_attempts_of_earlier_run_WHEN_read_since_THEN_left_out(self) -> None:
+        record_attempt("test_a", new_call_id(), 1, 3, None, 0.5)
+        since = read_retry_log(self.path)[0].finished_at + 1
+        self.assertEqual(read_retry_log(self.path, since), [])
+
+    def test_GIVEN_no_log_WHEN_read_THEN_no_attempts(self) -> None:
+        self.assertEqual(read_retry_log(self.path), [])
+
+    def test_WHEN_summarised_THEN_flaky_and_failed_calls_counted(self) -> None:
+        attempts = (
+            _call("test_a", [True]) + _call("test_a", [False, True]) + _call("test_a", [False] * 3)
+        )
+
+        (summary,) = summarise_retries(attempts)
+
+        self.assertEqual((summary.calls, summary.flaky_calls, summary.failed_calls), (3, 1, 1))
+        self.assertAlmostEqual(summary.flake_rate, 1 / 3)
+        # One retried attempt in the flaky call, and all but the last in the failed one
+        self.assertAlmostEqual(summary.retry_overhead, 3.0)
+
+    def test_WHEN_summarised_THEN_ranked_by_retry_overhead_then_flake_rate(self) -> None:
+        attempts = (
+            _call("rarely_flaky", [False, True])
+            + _call("rarely_flaky", [True])
+            + _call("always_flaky", [False, True])
+            + _call("slow_flaky", [False, True], duration=10.0)
+            + _call("never_flaky", [True])
+        )
+
+        names = [summary.name for summary in summarise_retries(attempts)]
+
+        self.assertEqual(names, ["slow_flaky", "always_flaky", "rarely_flaky", "never_flaky"])
+
+    def test_GIVEN_no_retries_WHEN_formatted_THEN_says_so(self) -> None:
+        summaries = summarise_retries(_call("test_a", [True]))
+        self.assertEqual(format_retry_summary(summaries), "No retries needed")
+
+    def test_GIVEN_retries_WHEN_formatted_THEN_only_retried_tests_listed(self) -> None:
+        summaries = summarise_retries(_call("test_a", [False, True]) + _call("test_b", [True]))
+        table = format_retry_summary(summaries)
+        self.assertIn("test_a", table)
+        self.assertIn("1/1", table)
+        self.assertNotIn("test_b", table)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,10 @@
 import argparse
 import os
 
-from configobj import ConfigObj
 from psutil import virtual_memory
 
+from utilities.icp_properties import IcpProperties, copy_if_different
+
 ICP_BINARIES = os.path.join(os.environ.get("EPICS_ROOT"), "ICP_Binaries")
 CONFIG_FILE = "isisicp.properties"
 CONFIG_BACKUP = "{}.backup".format(CONFIG_FILE)
@@ -17,24 +18,23 @@ def measure_memory_usage():
 
 
 def backup_isisicp_config():
-    config_backup = ConfigObj(icp_config_file_path)
-    config_backup.filename = icp_config_backup_file_path
-    config_backup.write()
+    copy_if_different(icp_config_file_path, icp_config_backup_file_path)
 
 
 def restore_isisicp_config():
-    config = ConfigObj(icp_config_backup_file_path)
-    config.filename = icp_config_file_path
-    config.write()
+    if copy_if_different(icp_config_backup_file_path, icp_config_file_path):
+        print(f"Restored {icp_config_file_path} from backup")
 
 
 def turn_on_datastreaming():
-    config = ConfigObj(icp_config_file_path)
-    config["isisicp.kafkastream"] = True
-    config["isisicp.kafkastream.topicprefix"] = "TEST"
-    config["isisicp.kafkastream.broker"] = "localhost:9092"
-    config["isisicp.incrementaleventnexus"] = True
-    config.write()
+    IcpProperties(icp_config_file_path).update(
+        {
+            "isisicp.kafkastream": True,
+            "isisicp.kafkastream.topicprefix": "TEST",
+            "isisicp.kafkastream.broker": "localhost:9092",
+            "isisicp.incrementaleventnexus": True,
+        }
+    )
 
 
 if __name__ == "__main__":
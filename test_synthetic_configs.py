@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from utilities.ioc_catalogue import IocCatalogue
+from utilities.resource_locks import resource_locks
+from utilities.synthetic_configs import (
+    COMPONENTS_DIRECTORY,
+    SCHEMA_URL,
+    SyntheticConfig,
+    remove_synthetic_config,
+    write_synthetic_config,
+)
+
+
+def _elements(path: str, schema: str, tag: str) -> list[ElementTree.Element]:
+    namespace = SCHEMA_URL.format(schema)
+    return ElementTree.parse(path).getroot().findall(f"{{{namespace}}}{tag}")
+
+
+@resource_locks()
+class TestSyntheticConfigs(unittest.TestCase):
+    """
+    Tests of the generator of large configurations for the blockserver scalability benchmarks,
+    which do not need an instrument.
+    """
+
+    def setUp(self) -> None:
+        self.config_root = tempfile.mkdtemp()
+        self.config = SyntheticConfig(
+            name="synthetic", blocks=1000, groups=7, components=5, ioc="SIMPLE"
+        )
+        self.directory = write_synthetic_config(self.config_root, self.config)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.config_root)
+
+    def _component_file(self, component: str, filename: str) -> str:
+        return os.path.join(self.config_root, COMPONENTS_DIRECTORY, component, filename)
+
+    def test_WHEN_written_THEN_blocks_split_between_config_and_components(self):
+        config_blocks = _elements(os.path.join(self.directory, "blocks.xml"), "blocks", "block")
+        component_blocks = [
+            block
+            for component in self.config.component_names
+            for block in _elements(self._component_file(component, "blocks.xml"), "blocks", "block")
+        ]
+
+        self.assertEqual(len(config_blocks), 950)
+        self.assertEqual(len(config_blocks) + len(component_blocks), 1000)
+        name_tag = f"{{{SCHEMA_URL.format('blocks')}}}name"
+        self.assertEqual(len({block.find(name_tag).text for block in config_blocks}), 950)
+
+    def test_WHEN_written_THEN_config_blocks_are_all_in_groups(self):
+        groups = _elements(os.path.join(self.directory, "groups.xml"), "groups", "group")
+
+        self.assertEqual(len(groups), 7)
+        self.assertEqual(sum(len(group) for group in groups), 950)
+
+    def test_WHEN_written_THEN_config_uses_components_with_ioc_macros(self):
+        components = _elements(
+            os.path.join(self.directory, "components.xml"), "components", "component"
+        )
+        iocs = [
+            _elements(self._component_file(component, "iocs.xml"), "iocs", "ioc")
+            for component in self.config.component_names
+        ]
+
+        self.assertEqual([c.get("name") for c in components], self.config.component_names)
+        self.assertEqual(
+            [[ioc.get("name") for ioc in component_iocs] for component_iocs in iocs],
+            [["SIMPLE_01"], ["SIMPLE_02"], ["SIMPLE_03"], ["SIMPLE_04"], ["SIMPLE_05"]],
+        )
+        self.assertEqual(len(iocs[1][0][0]), self.config.macros_per_ioc)
+
+    def test_GIVEN_component_iocs_not_in_catalogue_WHEN_written_THEN_error_and_nothing_written(
+        self,
+    ):
+        config = SyntheticConfig(name="too_many", blocks=10, components=3, ioc="SIMPLE")
+        catalogue = IocCatalogue.from_names(["SIMPLE_01", "SIMPLE_02"])
+
+        with self.assertRaisesRegex(ValueError, "SIMPLE_03"):
+            write_synthetic_config(self.config_root, config, catalogue)
+        self.assertFalse(os.path.exists(self._component_file("too_many_comp_0", "")))
+
+    def test_GIVEN_component_iocs_in_catalogue_WHEN_written_THEN_written(self):
+        catalogue = IocCatalogue.from_names(self.config.component_ioc(n) for n in range(5))
+
+        self.assertEqual(
+            write_synthetic_config(self.config_root, self.config, catalogue), self.directory
+        )
+
+    def test_WHEN_removed_THEN_config_and_components_deleted(self):
+        remove_synthetic_config(self.config_root, self.config)
+
+        self.assertFalse(os.path.exists(self.directory))
+        self.assertFalse(os.path.exists(self._component_file("synthetic_comp_0", "")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+A stand in for an archive engine's web server, for testing the archive engine client without
+an instrument.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+
+class StubArchiveEngine:
+    """
+    Serves /group?name=<group>&format=json for groups of channels which can be changed while it
+    runs. Responses carry an ETag, and conditional requests for unchanged groups get a 304.
+    """
+
+    def __init__(self) -> None:
+        self.groups: dict[str, list[dict[str, Any]]] = {}
+        self.versions: dict[str, int] = {}
+        self.requests = 0
+        self.not_modified_responses = 0
+        # Client address of each connection made to the server
+        self.connections: list[tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_channels(self, group: str, channels: list[str]) -> None:
+        """
+        Set the channels in a group, as if the engine had been given a new configuration.
+
+        Args:
+            group: name of the group
+            channels: names of the channels in the group
+        """
+        with self._lock:
+            self.groups[group] = [
+                {"Channel": name, "Connected": "true", "Last Archived Value": ""}
+                for name in channels
+            ]
+            self.versions[group] = self.versions.get(group, 0) + 1
+
+    def __enter__(self) -> "StubArchiveEngine":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep connections open between requests, as the real engine does
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with stub._lock:
+                    stub.connections.append(self.client_address)
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                group = parse_qs(url.query).get("name", [""])[0]
+                with stub._lock:
+                    stub.requests += 1
+                    if url.path != "/group" or group not in stub.groups:
+                        self._respond(404, b"")
+                        return
+                    etag = f'"{stub.versions[group]}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        stub.not_modified_responses += 1
+                        self._respond(304, b"", etag)
+                        return
+                    body = json.dumps({"Channels": stub.groups[group]}).encode()
+                self._respond(200, body, etag)
+
+            def _respond(self, status: int, body: bytes, etag: str | None = None) -> None:
+                self.send_response(status)
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                # Don't fill the test output with a line per request
+                pass
+
+        return Handler
@@ -0,0 +1,180 @@
+"""
+Client for the status pages of the archive engines, e.g. the block archive engine's BLOCKS group
+at http://localhost:4813/group?name=BLOCKS&format=json.
+
+The client keeps one HTTP session, so polling does not open a new connection each time, sends
+conditional requests where the engine supports them, and reports how the archived channels change
+between polls.
+"""
+
+from dataclasses import dataclass, field
+from time import perf_counter, sleep
+from typing import Any, Callable, Collection
+
+import requests
+
+BLOCK_ARCHIVE_URL = "http://localhost:4813"
+BLOCKS_GROUP = "BLOCKS"
+
+# Seconds to wait for the archive engine to respond to a request
+REQUEST_TIMEOUT = 5
+
+# Seconds between polls while waiting for channels
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+@dataclass
+class ChannelChanges:
+    """
+    How the channels of an archive engine group changed between two polls.
+    """
+
+    added: set[str] = field(default_factory=set)
+    removed: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+class ArchiveEngineClient:
+    """
+    Polls one group of an archive engine.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BLOCK_ARCHIVE_URL,
+        group: str = BLOCKS_GROUP,
+        session: requests.Session | None = None,
+    ) -> None:
+        """
+        Args:
+            base_url: URL of the archive engine's web server
+            group: name of the group to poll
+            session: HTTP session to use; a new one is created if None
+        """
+        self.url = f"{base_url}/group"
+        self.group = group
+        self.session = session or requests.Session()
+        self._channels: list[dict[str, Any]] = []
+        self._validators: dict[str, str] = {}
+        self._last_names: set[str] | None = None
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "ArchiveEngineClient":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def get_channels(self, conditional: bool = True) -> list[dict[str, Any]]:
+        """
+        Get the status of each channel in the group, e.g. its "Channel" name, whether it is
+        "Connected" and its "Last Archived Value".
+
+        If the request is conditional and the engine says the group has not changed since the
+        last request (HTTP 304) the channels from that request are returned. The engine may not
+        count a newly archived value as a change to the group, so callers which need the latest
+        values should not make a conditional request.
+
+        Args:
+            conditional: True to ask the engine to only send the channels if the group has changed
+
+        Returns: the channels, in the order the engine lists them
+        """
+        response = self.session.get(
+            self.url,
+            params={"name": self.group, "format": "json"},
+            headers=self._validators if conditional else {},
+            timeout=REQUEST_TIMEOUT,
+        )
+        if response.status_code == requests.codes.not_modified:
+            return self._channels
+        response.raise_for_status()
+
+        self._channels = response.json()["Channels"]
+        self._validators = {}
+        if "ETag" in response.headers:
+            self._validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            self._validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        return self._channels
+
+    def get_channel_names(self) -> list[str]:
+        """
+        Returns: names of the channels in the group, in the order the engine lists them
+        """
+        return [channel["Channel"] for channel in self.get_channels()]
+
+    def poll(self) -> ChannelChanges:
+        """
+        Get the channels in the group and compare them with the last poll.
+
+        Returns: the channels added and removed since the last poll; on the first poll every
+            channel counts as added
+        """
+        return self._diff(self.get_channel_names())
+
+    def _diff(self, names: list[str]) -> ChannelChanges:
+        """
+        Args:
+            names: channel names which have just been fetched
+
+        Returns: the channels added and removed since the last poll
+        """
+        current = set(names)
+        previous = self._last_names or set()
+        self._last_names = current
+        return ChannelChanges(added=current - previous, removed=previous - current)
+
+    def wait_for_channels(
+        self,
+        expected: Collection[str] | Callable[[list[str]], bool],
+        timeout: float,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> list[str]:
+        """
+        Poll the group until its channels are as expected, e.g. after a config change.
+
+        Args:
+            expected: the exact set of channel names expected, or a function which is given the
+                channel names and returns True once they are as expected
+            timeout: seconds to wait for
+            poll_interval: seconds between polls
+
+        Returns: the channel names, in the order the engine lists them
+
+        Raises:
+            AssertionError: if the channels were not as expected within the timeout
+        """
+        if callable(expected):
+            matches = expected
+        else:
+            expected_names = set(expected)
+
+            def matches(names: list[str]) -> bool:
+                return set(names) == expected_names
+
+        start = perf_counter()
+        names: list[str] = []
+        while True:
+            try:
+                names = self.get_channel_names()
+                changes = self._diff(names)
+                if changes:
+                    print(
+                        f"Archive engine group {self.group} added {sorted(changes.added)}, "
+                        f"removed {sorted(changes.removed)}"
+                    )
+                if matches(names):
+                    return names
+            except requests.RequestException as e:
+                print(f"Could not read archive engine group {self.group}: {e}")
+            if perf_counter() - start > timeout:
+                raise AssertionError(
+                    f"Archive engine group {self.group} did not have the expected channels "
+                    f"within {timeout}s, it has {names}"
+                )
+            sleep(poll_interval)
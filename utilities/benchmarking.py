@@ -0,0 +1,218 @@
+"""
+Utilities for benchmarks run against an IBEX instance.
+
+Benchmark results are flat dictionaries of metric name to value (lower is better), which are
+stored as JSON baselines so that later runs can be compared against them.
+"""
+
+import json
+import os
+import platform
+import statistics
+from datetime import datetime
+from typing import Iterable, Sequence
+
+import numpy as np
+
+# The environment variable used to override where baselines are stored
+BASELINE_DIRECTORY_ENV = "SYSTEM_TESTS_BASELINE_DIR"
+
+# The environment variable which, if set, causes baselines to be overwritten by new results
+UPDATE_BASELINES_ENV = "SYSTEM_TESTS_UPDATE_BASELINES"
+
+DEFAULT_BASELINE_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmark-baselines"
+)
+
+# Fraction by which a metric may exceed its baseline before it is counted as a regression
+DEFAULT_RELATIVE_TOLERANCE = 0.5
+
+# Amount by which a metric may exceed its baseline regardless of the relative tolerance, so that
+# very small timings do not flag regressions because of noise
+DEFAULT_ABSOLUTE_TOLERANCE = 0.001
+
+
+def summarise(samples: Iterable[float]) -> dict[str, float]:
+    """
+    Summarise a set of samples, e.g. timings.
+
+    Args:
+        samples: the samples to summarise
+
+    Returns: dictionary of count, min, mean, median, 95th percentile and max
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        raise ValueError("Can not summarise an empty set of samples")
+
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max": ordered[-1],
+    }
+
+
+def format_histogram(samples: Iterable[float], bins: int = 10, width: int = 50) -> str:
+    """
+    Format samples as a text histogram suitable for printing in test output.
+
+    Args:
+        samples: the samples to histogram
+        bins: number of equal width bins between the smallest and largest sample
+        width: number of characters used for the largest bin
+
+    Returns: the histogram, one line per bin
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return "(no samples)"
+
+    low, high = ordered[0], ordered[-1]
+    bin_width = (high - low) / bins or 1.0
+    counts = [0] * bins
+    for sample in ordered:
+        counts[min(bins - 1, int((sample - low) / bin_width))] += 1
+
+    largest = max(counts)
+    lines = []
+    for index, count in enumerate(counts):
+        bin_start = low + index * bin_width
+        bar = "#" * int(round(width * count / largest))
+        lines.append(f"{bin_start:10.4f} - {bin_start + bin_width:10.4f} | {count:6d} | {bar}")
+    return "\n".join(lines)
+
+
+def _baseline_path(name: str) -> str:
+    """
+    Args:
+        name: name of the baseline
+
+    Returns: path of the file the baseline is stored in
+    """
+    directory = os.environ.get(BASELINE_DIRECTORY_ENV, DEFAULT_BASELINE_DIRECTORY)
+    return os.path.join(directory, f"{name}.json")
+
+
+def load_baseline(name: str) -> dict[str, float] | None:
+    """
+    Load a stored baseline.
+
+    Args:
+        name: name of the baseline
+
+    Returns: the baseline results; None if there is no stored baseline
+    """
+    path = _baseline_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as baseline_file:
+        return json.load(baseline_file)["results"]
+
+
+def save_baseline(name: str, results: dict[str, float]) -> None:
+    """
+    Store results as a baseline, replacing any existing baseline of the same name.
+
+    Args:
+        name: name of the baseline
+        results: metric names mapped to values
+    """
+    path = _baseline_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as baseline_file:
+        json.dump(
+            {
+                "recorded": datetime.now().isoformat(timespec="seconds"),
+                "machine": platform.node(),
+                "results": results,
+            },
+            baseline_file,
+            indent=4,
+            sort_keys=True,
+        )
+
+
+def compare_with_baseline(
+    name: str,
+    results: dict[str, float],
+    relative_tolerance: float = DEFAULT_RELATIVE_TOLERANCE,
+    absolute_tolerance: float = DEFAULT_ABSOLUTE_TOLERANCE,
+) -> list[str]:
+    """
+    Compare results with a stored baseline. If UPDATE_BASELINES_ENV is set the results are stored
+    as the new baseline instead. Having no baseline is reported as a regression, so that a missing
+    baseline fails the benchmark rather than passing by recording itself.
+
+    Metrics which are not in the baseline are ignored, so new metrics can be added to a benchmark
+    without invalidating its baseline.
+
+    Args:
+        name: name of the baseline
+        results: metric names mapped to values, where lower is better
+        relative_tolerance: fraction a metric may exceed its baseline by
+        absolute_tolerance: amount a metric may exceed its baseline by, in addition to the
+            relative tolerance
+
+    Returns: a description of each metric which has regressed, or of the baseline being
+        missing; empty if none have
+    """
+    if os.environ.get(UPDATE_BASELINES_ENV):
+        print(f"Saving new baseline for {name}")
+        save_baseline(name, results)
+        return []
+
+    baseline = load_baseline(name)
+    if baseline is None:
+        return [
+            f"There is no baseline for {name} in {_baseline_path(name)}; set "
+            f"{UPDATE_BASELINES_ENV}=1 to record these results as the baseline"
+        ]
+
+    regressions = []
+    for metric, value in sorted(results.items()):
+        if metric not in baseline:
+            continue
+        allowed = baseline[metric] * (1 + relative_tolerance) + absolute_tolerance
+        print(f"{name} {metric}: {value:.6g} (baseline {baseline[metric]:.6g})")
+        if value > allowed:
+            regressions.append(
+                f"{metric} is {value:.6g}, baseline is {baseline[metric]:.6g} "
+                f"(allowed up to {allowed:.6g})"
+            )
+    return regressions
+
+
+def fit_linear_model(
+    samples: Sequence[tuple[dict[str, float], float]], features: Sequence[str]
+) -> dict[str, float]:
+    """
+    Least squares fit of a model of the form y = fixed + sum(coefficient * feature).
+
+    Args:
+        samples: pairs of (feature name mapped to value, measured y)
+        features: names of the features in the model
+
+    Returns: "fixed" and each feature name mapped to its fitted coefficient
+    """
+    design = np.array([[1.0] + [inputs[feature] for feature in features] for inputs, _ in samples])
+    measured = np.array([y for _, y in samples])
+    coefficients, *_ = np.linalg.lstsq(design, measured, rcond=None)
+    return dict(zip(["fixed", *features], (float(c) for c in coefficients)))
+
+
+def predict_linear_model(model: dict[str, float], inputs: dict[str, float]) -> float:
+    """
+    Args:
+        model: a model returned by fit_linear_model
+        inputs: feature names mapped to values
+
+    Returns: the value predicted by the model
+    """
+    return model["fixed"] + sum(
+        coefficient * inputs[feature]
+        for feature, coefficient in model.items()
+        if feature != "fixed"
+    )
@@ -0,0 +1,156 @@
+"""
+Measurement of how long block values take to pass through the logging pipeline.
+
+A block value set with cset is picked up by the block archive engine, flushed to the archive
+database, and from there written by the ISIS ICP into the selog of the current run. This module
+times each of those stages so that tests can wait for them with measured bounds rather than
+fixed sleeps.
+"""
+
+import os
+import tempfile
+from dataclasses import dataclass
+from time import perf_counter, sleep
+from typing import Callable
+
+import h5py
+
+from utilities.archiver import ArchiveEngineClient
+from utilities.utilities import g
+
+# Field of an archive engine channel holding the value it last wrote to the database
+LAST_ARCHIVED_VALUE = "Last Archived Value"
+
+# Seconds between polls of the archive engine and of the run's selog
+ARCHIVE_POLL_INTERVAL = 0.2
+SELOG_POLL_INTERVAL = 1.0
+
+# Path of a block's value log in a NeXus file
+SELOG_VALUES_PATH = "/raw_data_1/selog/{block}/value_log/value"
+
+
+@dataclass
+class BlockLoggingSample:
+    """
+    How long one block value took to reach each stage of the logging pipeline, in seconds from
+    the cset returning. A stage is None if the value did not reach it in time.
+    """
+
+    value: float
+    archived: float | None = None
+    selog: float | None = None
+
+
+def _archived_value_matches(archived: str, value: float) -> bool:
+    """
+    Args:
+        archived: the last archived value as shown by the archive engine, which includes the
+            timestamp and alarm of the value as well as the value itself
+        value: the value expected
+
+    Returns: True if the archived value is the expected value
+    """
+    for token in str(archived).split():
+        try:
+            if float(token) == value:
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def is_value_archived(block_archive: ArchiveEngineClient, block: str, value: float) -> bool:
+    """
+    Args:
+        block_archive: client of the block archive engine
+        block: name of the block
+        value: the value expected
+
+    Returns: True if the block archive engine has archived the value as the latest for the block
+    """
+    pv = g.adv.get_pv_from_block(block)
+    # The cached channels of a 304 response could hold a stale last archived value
+    channels = block_archive.get_channels(conditional=False)
+    return any(
+        channel["Channel"] == pv and _archived_value_matches(channel[LAST_ARCHIVED_VALUE], value)
+        for channel in channels
+    )
+
+
+def is_value_in_selog(block: str, value: float) -> bool:
+    """
+    Snapshot the current run and check the latest value logged for the block.
+
+    Args:
+        block: name of the block
+        value: the value expected
+
+    Returns: True if the latest value in the block's selog is the value
+    """
+    handle, filename = tempfile.mkstemp(suffix=".nxs")
+    os.close(handle)
+    try:
+        g.snapshot_crpt(filename)
+        with h5py.File(filename, "r") as nexus_file:
+            path = SELOG_VALUES_PATH.format(block=block)
+            if path not in nexus_file or len(nexus_file[path]) == 0:
+                return False
+            return nexus_file[path][-1] == value
+    except OSError:
+        # The snapshot has not been written yet
+        return False
+    finally:
+        try:
+            os.remove(filename)
+        except OSError:
+            # e.g. on Windows, the snapshot is still held open by the ICP
+            pass
+
+
+def wait_until(condition: Callable[[], bool], timeout: float, poll_interval: float) -> float | None:
+    """
+    Args:
+        condition: function returning True once what is being waited for has happened
+        timeout: seconds to wait for
+        poll_interval: seconds between checks of the condition
+
+    Returns: seconds taken for the condition to become True; None if it did not within the timeout
+    """
+    start = perf_counter()
+    while perf_counter() - start < timeout:
+        if condition():
+            return perf_counter() - start
+        sleep(poll_interval)
+    return None
+
+
+def measure_block_logging(
+    block_archive: ArchiveEngineClient, block: str, value: float, timeout: float
+) -> BlockLoggingSample:
+    """
+    Set a block and time how long the value takes to be archived and then to appear in the
+    selog of the current run.
+
+    Args:
+        block_archive: client of the block archive engine
+        block: name of the block, which must be in the current config and archived
+        value: the value to set
+        timeout: seconds to wait for each stage
+
+    Returns: the time taken to reach each stage
+    """
+    sample = BlockLoggingSample(value)
+    g.cset(block, value, wait=True)
+    start = perf_counter()
+
+    archived = wait_until(
+        lambda: is_value_archived(block_archive, block, value), timeout, ARCHIVE_POLL_INTERVAL
+    )
+    if archived is None:
+        return sample
+    sample.archived = archived
+
+    selog = wait_until(lambda: is_value_in_selog(block, value), timeout, SELOG_POLL_INTERVAL)
+    if selog is not None:
+        sample.selog = perf_counter() - start
+    return sample
@@ -0,0 +1,295 @@
+"""
+Utilities for timing bluesky scans run through the RunEngine.
+"""
+
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+from bluesky.run_engine import RunEngine
+from bluesky.utils import Msg
+
+MOVE = "move"
+READ = "read"
+DAE_WAIT = "dae_wait"
+CALLBACKS = "callbacks"
+OTHER = "other"
+
+# Which category time spent processing each RunEngine message is attributed to.
+# "wait" messages are attributed to the category of the message which started the group
+# being waited for, i.e. a move or a DAE trigger.
+MESSAGE_CATEGORIES = {
+    "set": MOVE,
+    "trigger": DAE_WAIT,
+    "read": READ,
+    "create": READ,
+    "save": READ,
+    "drop": READ,
+}
+
+
+class ScanTimer:
+    """
+    Splits the time taken by RunEngine scans into moves, reads, DAE waits and callbacks.
+
+    Time is measured between consecutive messages processed by the RunEngine, and attributed to
+    the first of the pair. Callbacks are run while messages which emit documents are processed,
+    so the time spent in callbacks wrapped by timed_callback is taken off the message it was
+    spent in and counted separately.
+    """
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+        self._callback_time = 0.0
+        self._callback_time_at_last_message = 0.0
+        self._last_message_time: float | None = None
+        self._last_category = OTHER
+        self._group_categories: dict[Any, str] = {}
+
+    def _category(self, msg: Msg) -> str:
+        """
+        Args:
+            msg: the message being processed
+
+        Returns: the category time spent processing the message belongs to
+        """
+        group = msg.kwargs.get("group")
+        if msg.command == "wait":
+            return self._group_categories.pop(group, OTHER)
+
+        category = MESSAGE_CATEGORIES.get(msg.command, OTHER)
+        if group is not None and category in (MOVE, DAE_WAIT):
+            self._group_categories[group] = category
+        return category
+
+    def _close_interval(self) -> None:
+        """
+        Attribute the time since the last message to that message's category.
+        """
+        now = perf_counter()
+        if self._last_message_time is not None:
+            callback_time = self._callback_time - self._callback_time_at_last_message
+            elapsed = now - self._last_message_time - callback_time
+            self.totals[self._last_category] = self.totals.get(self._last_category, 0.0) + elapsed
+            self.totals[CALLBACKS] = self.totals.get(CALLBACKS, 0.0) + callback_time
+        self._callback_time_at_last_message = self._callback_time
+        self._last_message_time = now
+
+    def msg_hook(self, msg: Msg) -> None:
+        """
+        RunEngine message hook; called before each message is processed.
+
+        Args:
+            msg: the message about to be processed
+        """
+        self._close_interval()
+        self._last_category = self._category(msg)
+
+    def timed_callback(self, callback: Callable[[str, dict], Any]) -> Callable[[str, dict], Any]:
+        """
+        Wrap a callback so that time spent in it is counted as callback time.
+
+        Args:
+            callback: the callback to wrap
+
+        Returns: the wrapped callback, to subscribe in place of the original
+        """
+
+        def wrapper(name: str, doc: dict) -> Any:
+            start = perf_counter()
+            try:
+                return callback(name, doc)
+            finally:
+                self._callback_time += perf_counter() - start
+
+        return wrapper
+
+    @contextmanager
+    def timing(self, run_engine: RunEngine) -> Iterator["ScanTimer"]:
+        """
+        Context manager which times everything run through the RunEngine inside it.
+
+        Args:
+            run_engine: the RunEngine to time
+
+        Returns: this timer
+        """
+        previous_hook = run_engine.msg_hook
+        run_engine.msg_hook = self.msg_hook
+        try:
+            yield self
+        finally:
+            self._close_interval()
+            self._last_message_time = None
+            run_engine.msg_hook = previous_hook
+
+    def total(self) -> float:
+        """
+        Returns: total time in seconds spent across all categories
+        """
+        return sum(self.totals.values())
+
+
+@dataclass
+class DocumentProfile:
+    """
+    Time and memory spent by one callback handling one type of document.
+    """
+
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    allocated_bytes: int = 0
+    peak_bytes: int = 0
+
+
+class CallbackProfiler:
+    """
+    Measures the time each callback spends on each document type (start, descriptor, event,
+    stop, ...) and, optionally, the memory it allocates while doing so.
+    """
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        """
+        Args:
+            trace_memory: whether to measure memory allocated by callbacks using tracemalloc.
+                This slows down everything else running while profiling.
+        """
+        self.trace_memory = trace_memory
+        self.profiles: dict[str, dict[str, DocumentProfile]] = {}
+        self.elapsed = 0.0
+
+    def wrap(
+        self, callback: Callable[[str, dict], Any], name: str | None = None
+    ) -> Callable[[str, dict], Any]:
+        """
+        Wrap a callback so that it is profiled.
+
+        Args:
+            callback: the callback to wrap
+            name: name to report the callback under; defaults to the callback's class name
+
+        Returns: the wrapped callback, to subscribe in place of the original
+        """
+        base_name = name or type(callback).__name__
+        name, copies = base_name, 1
+        while name in self.profiles:
+            copies += 1
+            name = f"{base_name} ({copies})"
+        profiles = self.profiles[name] = {}
+
+        def wrapper(doc_name: str, doc: dict) -> Any:
+            profile = profiles.setdefault(doc_name, DocumentProfile())
+            tracing = self.trace_memory and tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.reset_peak()
+                memory_before, _ = tracemalloc.get_traced_memory()
+            start = perf_counter()
+            try:
+                return callback(doc_name, doc)
+            finally:
+                duration = perf_counter() - start
+                profile.count += 1
+                profile.total_time += duration
+                profile.max_time = max(profile.max_time, duration)
+                if tracing:
+                    memory_after, peak = tracemalloc.get_traced_memory()
+                    profile.allocated_bytes += memory_after - memory_before
+                    profile.peak_bytes = max(profile.peak_bytes, peak - memory_before)
+
+        return wrapper
+
+    def wrap_all(self, callbacks: list[Callable[[str, dict], Any]]) -> list[Callable]:
+        """
+        Args:
+            callbacks: callbacks to wrap, e.g. ISISCallbacks.subs
+
+        Returns: the wrapped callbacks
+        """
+        return [self.wrap(callback) for callback in callbacks]
+
+    @contextmanager
+    def profiling(self) -> Iterator["CallbackProfiler"]:
+        """
+        Context manager to run the scan being profiled in. Measures the total time of the scan
+        and, if trace_memory is set, traces memory allocations while it runs.
+
+        Returns: this profiler
+        """
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start = perf_counter()
+        try:
+            yield self
+        finally:
+            self.elapsed += perf_counter() - start
+            if started_tracing:
+                tracemalloc.stop()
+
+    @property
+    def points(self) -> int:
+        """
+        Returns: number of points (event documents) seen by the profiled callbacks
+        """
+        return max(
+            (profiles["event"].count for profiles in self.profiles.values() if "event" in profiles),
+            default=0,
+        )
+
+    def callback_time(self) -> float:
+        """
+        Returns: total time in seconds spent in all profiled callbacks
+        """
+        return sum(
+            profile.total_time
+            for profiles in self.profiles.values()
+            for profile in profiles.values()
+        )
+
+    def callback_share(self) -> float:
+        """
+        Returns: the fraction of the time per point that was spent in callbacks
+        """
+        if self.elapsed == 0:
+            return 0.0
+        return self.callback_time() / self.elapsed
+
+    def report(self) -> str:
+        """
+        Returns: a table of time and memory spent per callback and document type
+        """
+        lines = [
+            f"{self.points} points in {self.elapsed:.3f}s, "
+            f"{self.callback_time():.3f}s ({self.callback_share():.1%}) in callbacks",
+            f"{'callback':<30} {'document':<12} {'count':>7} {'total s':>9} {'mean ms':>9} "
+            f"{'max ms':>9} {'alloc kB':>9} {'peak kB':>9}",
+        ]
+        for name, profiles in self.profiles.items():
+            for doc_name, profile in profiles.items():
+                lines.append(
+                    f"{name:<30} {doc_name:<12} {profile.count:>7} {profile.total_time:>9.3f} "
+                    f"{1000 * profile.total_time / profile.count:>9.3f} "
+                    f"{1000 * profile.max_time:>9.3f} {profile.allocated_bytes / 1024:>9.1f} "
+                    f"{profile.peak_bytes / 1024:>9.1f}"
+                )
+        return "\n".join(lines)
+
+    def assert_callback_share_below(self, max_share: float) -> None:
+        """
+        Check that callbacks did not take more than a given share of the time per point.
+
+        Args:
+            max_share: the largest allowed fraction of the time per point spent in callbacks
+
+        Raises:
+            AssertionError: if callbacks took more than max_share of the time per point
+        """
+        share = self.callback_share()
+        if share > max_share:
+            raise AssertionError(
+                f"Callbacks took {share:.1%} of the time per point, more than the "
+                f"{max_share:.1%} allowed.\n{self.report()}"
+            )
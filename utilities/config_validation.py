@@ -0,0 +1,267 @@
+"""
+Validation of the configurations and components in configs/ before they are deployed.
+
+The blockserver only reports a broken configuration by failing to load it, which a test sees as a
+timeout. Parsing every configuration and component here first, and indexing their blocks, PVs,
+IOCs and component references, finds broken references and duplicates in milliseconds instead.
+
+This is a structural check only: files are checked for their presence, well formed XML and root
+elements, but are not validated against the blockserver's XML schemas.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+CONFIGURATIONS_DIRECTORY = "configurations"
+COMPONENTS_DIRECTORY = "components"
+
+SCHEMA_URL = "http://epics.isis.rl.ac.uk/schema/{}/1.0"
+
+# Files every configuration and component holds, mapped to the tag of their root element
+SET_FILES = {
+    "blocks.xml": "blocks",
+    "groups.xml": "groups",
+    "iocs.xml": "iocs",
+    "components.xml": "components",
+    "meta.xml": "meta",
+}
+
+# Names the blockserver accepts for blocks
+BLOCK_NAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+SIMULATION_LEVELS = {"none", "recsim", "devsim"}
+
+
+@dataclass(frozen=True)
+class ConfigProblem:
+    """
+    Something wrong with a configuration or component.
+    """
+
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+@dataclass
+class ConfigSet:
+    """
+    The contents of one configuration or component which the blockserver cross references.
+    """
+
+    name: str
+    is_component: bool
+    # Block name mapped to the PV it reads
+    blocks: dict[str, str] = field(default_factory=dict)
+    # Group name mapped to the names of the blocks in it
+    groups: dict[str, list[str]] = field(default_factory=dict)
+    iocs: list[str] = field(default_factory=list)
+    components: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ConfigIndex:
+    """
+    Every configuration and component in a config root, indexed by what they contain.
+    """
+
+    configurations: dict[str, ConfigSet] = field(default_factory=dict)
+    components: dict[str, ConfigSet] = field(default_factory=dict)
+    # Block name (lower case, as the blockserver compares them) mapped to the sets defining it
+    blocks: dict[str, list[str]] = field(default_factory=lambda: defaultdict(list))
+    # PV mapped to the blocks reading it
+    block_pvs: dict[str, list[str]] = field(default_factory=lambda: defaultdict(list))
+    # IOC name mapped to the sets running it
+    iocs: dict[str, list[str]] = field(default_factory=lambda: defaultdict(list))
+    # Component name mapped to the configurations using it
+    component_references: dict[str, list[str]] = field(default_factory=lambda: defaultdict(list))
+    problems: list[ConfigProblem] = field(default_factory=list)
+
+    def describe_problems(self) -> str:
+        return "\n".join(str(problem) for problem in self.problems)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ElementTree.Element, name: str) -> str | None:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or "").strip()
+    return None
+
+
+def _parse_set(
+    directory: str, name: str, is_component: bool
+) -> tuple[ConfigSet, list[ConfigProblem]]:
+    """
+    Parse the files of one configuration or component.
+
+    Args:
+        directory: directory holding the files
+        name: name of the configuration or component
+        is_component: True if it is a component
+
+    Returns: what the set contains, and any problems found within it alone
+    """
+    config_set = ConfigSet(name, is_component)
+    problems = []
+    roots = {}
+    for filename, root_tag in SET_FILES.items():
+        path = os.path.join(directory, filename)
+        try:
+            root = ElementTree.parse(path).getroot()
+        except FileNotFoundError:
+            problems.append(ConfigProblem(path, "file is missing"))
+            continue
+        except ElementTree.ParseError as e:
+            problems.append(ConfigProblem(path, f"is not valid XML: {e}"))
+            continue
+        expected_tag = root_tag
+        if root_tag != "meta":
+            expected_tag = f"{{{SCHEMA_URL.format(root_tag)}}}{root_tag}"
+        if root.tag != expected_tag:
+            problems.append(ConfigProblem(path, f"root element is {root.tag}, not {expected_tag}"))
+            continue
+        roots[root_tag] = (path, root)
+
+    if "blocks" in roots:
+        path, root = roots["blocks"]
+        seen = set()
+        for block in root:
+            block_name = _child_text(block, "name")
+            read_pv = _child_text(block, "read_pv")
+            if not block_name or not BLOCK_NAME_PATTERN.match(block_name):
+                problems.append(ConfigProblem(path, f"invalid block name {block_name!r}"))
+                continue
+            if not read_pv:
+                problems.append(ConfigProblem(path, f"block {block_name} has no read_pv"))
+            if block_name.lower() in seen:
+                problems.append(ConfigProblem(path, f"block {block_name} is defined twice"))
+            seen.add(block_name.lower())
+            config_set.blocks[block_name] = read_pv or ""
+
+    if "groups" in roots:
+        path, root = roots["groups"]
+        for group in root:
+            group_name = group.get("name", "")
+            if group_name in config_set.groups:
+                problems.append(ConfigProblem(path, f"group {group_name} is defined twice"))
+            config_set.groups[group_name] = [block.get("name", "") for block in group]
+
+    if "iocs" in roots:
+        path, root = roots["iocs"]
+        for ioc in root:
+            ioc_name = ioc.get("name", "")
+            if not ioc_name:
+                problems.append(ConfigProblem(path, "IOC has no name"))
+                continue
+            if ioc_name in config_set.iocs:
+                problems.append(ConfigProblem(path, f"IOC {ioc_name} is defined twice"))
+            if ioc.get("simlevel", "none").lower() not in SIMULATION_LEVELS:
+                problems.append(
+                    ConfigProblem(path, f"IOC {ioc_name} has simlevel {ioc.get('simlevel')}")
+                )
+            config_set.iocs.append(ioc_name)
+
+    if "components" in roots:
+        path, root = roots["components"]
+        config_set.components = [component.get("name", "") for component in root]
+        if is_component and config_set.components:
+            problems.append(ConfigProblem(path, "components can not contain other components"))
+
+    return config_set, problems
+
+
+def _check_references(index: ConfigIndex, config_root: str) -> None:
+    """
+    Check each configuration against the components it uses, adding any problems to the index.
+
+    Args:
+        index: the index of every configuration and component
+        config_root: directory the configurations and components are in
+    """
+    for name, configuration in index.configurations.items():
+        directory = os.path.join(config_root, CONFIGURATIONS_DIRECTORY, name)
+        used = [configuration]
+        for component in configuration.components:
+            if component in index.components:
+                used.append(index.components[component])
+            else:
+                index.problems.append(
+                    ConfigProblem(
+                        os.path.join(directory, "components.xml"),
+                        f"component {component} does not exist",
+                    )
+                )
+
+        block_owners: dict[str, str] = {}
+        ioc_owners: dict[str, str] = {}
+        for config_set in used:
+            for block in config_set.blocks:
+                owner = block_owners.setdefault(block.lower(), config_set.name)
+                if owner != config_set.name:
+                    index.problems.append(
+                        ConfigProblem(
+                            directory, f"block {block} is in {owner} and {config_set.name}"
+                        )
+                    )
+            for ioc in config_set.iocs:
+                owner = ioc_owners.setdefault(ioc, config_set.name)
+                if owner != config_set.name:
+                    index.problems.append(
+                        ConfigProblem(directory, f"IOC {ioc} is in {owner} and {config_set.name}")
+                    )
+
+        for group, blocks in configuration.groups.items():
+            for block in blocks:
+                if block.lower() not in block_owners:
+                    index.problems.append(
+                        ConfigProblem(
+                            os.path.join(directory, "groups.xml"),
+                            f"group {group} contains block {block}, which does not exist",
+                        )
+                    )
+
+
+def validate_configs(config_root: str) -> ConfigIndex:
+    """
+    Parse and cross reference every configuration and component in a config root.
+
+    Args:
+        config_root: directory holding the configurations and components directories, e.g. the
+            configs directory of this repository
+
+    Returns: the index of the configurations and components, with any problems found
+    """
+    index = ConfigIndex()
+    for directory_name, sets, is_component in (
+        (CONFIGURATIONS_DIRECTORY, index.configurations, False),
+        (COMPONENTS_DIRECTORY, index.components, True),
+    ):
+        parent = os.path.join(config_root, directory_name)
+        if not os.path.isdir(parent):
+            continue
+        for name in sorted(os.listdir(parent)):
+            directory = os.path.join(parent, name)
+            if not os.path.isdir(directory):
+                continue
+            config_set, problems = _parse_set(directory, name, is_component)
+            sets[name] = config_set
+            index.problems.extend(problems)
+            for block, read_pv in config_set.blocks.items():
+                index.blocks[block.lower()].append(name)
+                index.block_pvs[read_pv].append(block)
+            for ioc in config_set.iocs:
+                index.iocs[ioc].append(name)
+            for component in config_set.components:
+                index.component_references[component].append(name)
+
+    _check_references(index, config_root)
+    return index
@@ -0,0 +1,118 @@
+"""
+A manifest of the tests which failed in the last run, so that run_tests.py --rerun-failed can run
+just those again.
+
+For each failed test the manifest records its dotted name, how long it took and the config it
+needed, so a rerun can be grouped by config (each config is loaded once rather than once per
+test) and its length estimated up front.
+
+This module deliberately does not import genie_python so that it can be tested without an
+instrument.
+"""
+
+import json
+import os
+import re
+import unittest
+from dataclasses import asdict, dataclass
+from typing import Iterable
+
+from utilities.icp_properties import write_atomically
+
+# Name of the manifest, which is written to the test report directory
+FAILURE_MANIFEST_NAME = "failed_tests.json"
+
+# Kinds of failure
+FAILURE = "failure"
+ERROR = "error"
+
+# Describes a failure of a class or module fixture, e.g. "setUpClass (test_module.TestClass)"
+FIXTURE_DESCRIPTION_PATTERN = re.compile(r"^\w+ \((?P<name>[\w.]+)\)$")
+
+
+@dataclass(frozen=True)
+class FailedTest:
+    """
+    A test which failed.
+    """
+
+    # Dotted name of the test, which can be passed to -t
+    test_id: str
+    kind: str
+    # Seconds the test took to run
+    duration: float
+    # Config the test needed; None if not known
+    config: str | None
+
+
+def failed_to_load(test: unittest.TestCase) -> bool:
+    """
+    Args:
+        test: a test
+
+    Returns: True if the test stands in for a module or name unittest could not load
+    """
+    return type(test).__module__ == unittest.loader.__name__
+
+
+def rerun_id(test: unittest.TestCase) -> str:
+    """
+    Args:
+        test: a test which failed, or the stand in unittest reports a failed fixture or a module
+            which failed to import as
+
+    Returns: the dotted name to run to rerun it; the whole class or module for a failed fixture,
+        and the module for a module which failed to import
+    """
+    if failed_to_load(test):
+        # The stand in's id is the name of the module, prefixed with the stand in's own class
+        return test.id().removeprefix(f"{type(test).__module__}.{type(test).__qualname__}.")
+    match = FIXTURE_DESCRIPTION_PATTERN.match(test.id())
+    if not isinstance(test, unittest.TestCase) and match is not None:
+        return match.group("name")
+    return test.id()
+
+
+def write_failure_manifest(path: str, failed_tests: Iterable[FailedTest]) -> None:
+    """
+    Args:
+        path: path of the manifest
+        failed_tests: the tests which failed; none if the run passed
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    contents = {"failed_tests": [asdict(failed_test) for failed_test in failed_tests]}
+    write_atomically(path, json.dumps(contents, indent=4))
+
+
+def read_failure_manifest(path: str) -> list[FailedTest]:
+    """
+    Args:
+        path: path of the manifest
+
+    Returns: the tests which failed in the last run; none if there is no manifest
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as manifest_file:
+        contents = json.load(manifest_file)
+    return [FailedTest(**failed_test) for failed_test in contents["failed_tests"]]
+
+
+def group_by_config(failed_tests: Iterable[FailedTest]) -> dict[str | None, list[str]]:
+    """
+    Args:
+        failed_tests: tests which failed
+
+    Returns: configs, in the order they are first needed, mapped to the dotted names of the
+        tests which need them; a test is left out if its whole class or module is rerun anyway
+    """
+    failed_tests = list(failed_tests)
+    all_ids = {failed_test.test_id for failed_test in failed_tests}
+    groups: dict[str | None, list[str]] = {}
+    for failed_test in failed_tests:
+        parents = failed_test.test_id.split(".")
+        covered = any(".".join(parents[:end]) in all_ids for end in range(1, len(parents)))
+        test_ids = groups.setdefault(failed_test.config, [])
+        if not covered and failed_test.test_id not in test_ids:
+            test_ids.append(failed_test.test_id)
+    return {config: test_ids for config, test_ids in groups.items() if test_ids}
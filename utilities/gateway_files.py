@@ -0,0 +1,205 @@
+"""
+Streaming comparison of the rule files the blockserver writes for a configuration, i.e. the
+gateway's gwblock.pvlist and run control's rc_settings.cmd.
+
+Files are read a line at a time with comments and whitespace normalised away, and rules are matched
+up by their key, e.g. the PV pattern of a gateway rule. Only rules which have not been matched yet
+are held in memory, so comparing two large files which are the same, or nearly so, takes a roughly
+constant amount of memory however many rules they have.
+
+The order of rules matters, as the gateway uses the last rule which matches a PV, so rules which
+are in a different order relative to each other are reported as moved.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from typing import Iterator
+
+# Number of leading tokens of a rule which identify it, so that a rule whose remaining tokens
+# differ between two files is reported as changed rather than as removed and added
+PVLIST_KEY_TOKENS = 1
+RC_SETTINGS_KEY_TOKENS = 2
+
+# Prefixes of comment lines; "#" comments can also follow a rule on the same line
+COMMENT_PREFIXES = ("#", "REM ")
+
+# Most differences of each kind shown when describing a diff
+MAX_DESCRIBED = 10
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A rule from a gateway pvlist or rc_settings file, with its whitespace normalised.
+    """
+
+    line_number: int
+    key: str
+    text: str
+
+    def __str__(self) -> str:
+        return f"line {self.line_number}: {self.text}"
+
+
+@dataclass
+class RuleDiff:
+    """
+    How the rules of an actual file differ from those of the expected file.
+    """
+
+    added: list[Rule] = field(default_factory=list)
+    removed: list[Rule] = field(default_factory=list)
+    # (expected rule, actual rule) for rules with the same key but different content
+    changed: list[tuple[Rule, Rule]] = field(default_factory=list)
+    # (expected rule, actual rule) for rules out of order with the rules matched before them
+    moved: list[tuple[Rule, Rule]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.moved)
+
+    def describe(self, max_described: int = MAX_DESCRIBED) -> str:
+        """
+        Args:
+            max_described: most differences of each kind to list
+
+        Returns: a summary of the differences, short enough for a test failure message however
+            many there are
+        """
+        if not self:
+            return "No differences"
+        lines = [
+            f"{len(self.added)} rules added, {len(self.removed)} removed, "
+            f"{len(self.changed)} changed, {len(self.moved)} moved"
+        ]
+        for kind, rules in (("Added", self.added), ("Removed", self.removed)):
+            lines.extend(f"{kind} {rule}" for rule in rules[:max_described])
+            if len(rules) > max_described:
+                lines.append(f"... and {len(rules) - max_described} more {kind.lower()}")
+        for kind, pairs in (("Changed", self.changed), ("Moved", self.moved)):
+            lines.extend(
+                f"{kind} {expected} -> {actual}" for expected, actual in pairs[:max_described]
+            )
+            if len(pairs) > max_described:
+                lines.append(f"... and {len(pairs) - max_described} more {kind.lower()}")
+        return "\n".join(lines)
+
+
+def _strip_comment(line: str) -> str:
+    """
+    Args:
+        line: a line of a rule file
+
+    Returns: the line without any comment in it
+    """
+    stripped = line.strip()
+    if stripped.upper().startswith(COMMENT_PREFIXES) or stripped.upper() == "REM":
+        return ""
+    return stripped.split("#", 1)[0]
+
+
+def iter_rules(path: str, key_tokens: int = PVLIST_KEY_TOKENS) -> Iterator[Rule]:
+    """
+    Read the rules of a gateway pvlist or rc_settings file one line at a time, skipping comments
+    and blank lines.
+
+    Args:
+        path: path of the file
+        key_tokens: number of leading tokens of each rule which identify it
+
+    Returns: the rules in the order they appear in the file
+    """
+    with open(path, "r") as rule_file:
+        for line_number, line in enumerate(rule_file, start=1):
+            tokens = _strip_comment(line).split()
+            if tokens:
+                yield Rule(line_number, " ".join(tokens[:key_tokens]), " ".join(tokens))
+
+
+def _take_pending(pending: dict[str, deque[Rule]], key: str) -> Rule | None:
+    """
+    Args:
+        pending: unmatched rules from one file, by key
+        key: key of the rule to take
+
+    Returns: the earliest unmatched rule with the key, removed from pending; None if there is none
+    """
+    rules = pending.get(key)
+    if not rules:
+        return None
+    rule = rules.popleft()
+    if not rules:
+        del pending[key]
+    return rule
+
+
+def compare_rule_files(
+    expected_path: str, actual_path: str, key_tokens: int = PVLIST_KEY_TOKENS
+) -> RuleDiff:
+    """
+    Compare two gateway pvlist or rc_settings files, reading both a line at a time.
+
+    Rules are matched by key, in order for rules which share a key. Rules shifted by one added
+    or removed earlier in the file are still in the same order, so are not reported as moved.
+
+    A pair of rules is matched once the later of the two has been read, so if the rules of both
+    files are in the same order each pair is matched after the rules before it in both files. A
+    pair matched after a pair of later rules in either file has moved.
+
+    Args:
+        expected_path: path of the file with the expected rules
+        actual_path: path of the file to check
+        key_tokens: number of leading tokens of each rule which identify it, e.g.
+            PVLIST_KEY_TOKENS or RC_SETTINGS_KEY_TOKENS
+
+    Returns: the differences between the files
+    """
+    diff = RuleDiff()
+    unmatched_expected: dict[str, deque[Rule]] = {}
+    unmatched_actual: dict[str, deque[Rule]] = {}
+    # The last pair of rules matched which was in order
+    last_in_order: tuple[int, int] = (0, 0)
+
+    def matched(expected: Rule, actual: Rule) -> None:
+        nonlocal last_in_order
+        if expected.text != actual.text:
+            diff.changed.append((expected, actual))
+        if expected.line_number < last_in_order[0] or actual.line_number < last_in_order[1]:
+            diff.moved.append((expected, actual))
+        else:
+            last_in_order = (expected.line_number, actual.line_number)
+
+    def match(
+        rule: Rule, own_pending: dict[str, deque[Rule]], other_pending: dict[str, deque[Rule]]
+    ) -> Rule | None:
+        other = _take_pending(other_pending, rule.key)
+        if other is None:
+            own_pending.setdefault(rule.key, deque()).append(rule)
+        return other
+
+    for expected, actual in zip_longest(
+        iter_rules(expected_path, key_tokens), iter_rules(actual_path, key_tokens)
+    ):
+        if expected is not None and actual is not None and expected.key == actual.key:
+            matched(expected, actual)
+            continue
+        if expected is not None:
+            other = match(expected, unmatched_expected, unmatched_actual)
+            if other is not None:
+                matched(expected, other)
+        if actual is not None:
+            other = match(actual, unmatched_actual, unmatched_expected)
+            if other is not None:
+                matched(other, actual)
+
+    diff.removed = sorted(
+        (rule for rules in unmatched_expected.values() for rule in rules),
+        key=lambda rule: rule.line_number,
+    )
+    diff.added = sorted(
+        (rule for rules in unmatched_actual.values() for rule in rules),
+        key=lambda rule: rule.line_number,
+    )
+    diff.changed.sort(key=lambda rules: rules[0].line_number)
+    diff.moved.sort(key=lambda rules: rules[0].line_number)
+    return diff
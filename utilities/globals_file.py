@@ -0,0 +1,53 @@
+"""
+Temporary edits of the instrument's globals.txt, e.g. to start IOCs in recsim.
+
+IOCs read globals.txt when they start, so macros written to it only need to be there while the IOCs
+are started. The file is written and restored atomically so an IOC starting at the same time never
+reads a partially written file.
+
+This module deliberately does not import genie_python so that it can be tested without an
+instrument.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from utilities.icp_properties import write_atomically
+
+
+def recsim_macros(iocs: Iterable[str]) -> list[str]:
+    """
+    Args:
+        iocs: names of the IOCs
+
+    Returns: the globals.txt lines which start each of the IOCs in recsim
+    """
+    return [f"{ioc}__RECSIM=1" for ioc in iocs]
+
+
+@contextmanager
+def temporary_globals(path: str, lines: Iterable[str]) -> Iterator[None]:
+    """
+    Add lines to globals.txt, restoring its original contents afterwards.
+
+    Args:
+        path: path of globals.txt
+        lines: lines to add after its existing contents
+    """
+    original = None
+    if os.path.exists(path):
+        with open(path, "r", encoding="ascii", newline="") as globals_file:
+            original = globals_file.read()
+
+    contents = original or ""
+    if contents and not contents.endswith("\n"):
+        contents += "\n"
+    write_atomically(path, contents + "".join(f"{line}\n" for line in lines))
+    try:
+        yield
+    finally:
+        if original is None:
+            os.remove(path)
+        else:
+            write_atomically(path, original)
@@ -0,0 +1,200 @@
+"""
+Reading and editing of isisicp.properties files.
+
+The file is parsed once and edits are applied as a diff against what is already there, so
+callers can tell whether anything actually changed (and so whether the ICP needs restarting)
+before touching the file. Writes are atomic so the ICP never sees a half written file.
+
+This module deliberately does not import genie_python so that it can be used by
+test_setup_teardown.py while the server is not running.
+"""
+
+import os
+import tempfile
+from typing import Any
+
+COMMENT_CHARACTERS = ("#", "!")
+KEY_VALUE_SEPARATOR = "="
+
+
+def _format_value(value: Any) -> str:
+    """
+    Format a value as it should appear in the properties file.
+
+    Args:
+        value: the value to format
+
+    Returns: the value as a string
+    """
+    return str(value).strip()
+
+
+def write_atomically(path: str, contents: str, newline: str = "") -> None:
+    """
+    Write contents to a file by writing a temporary file in the same directory and then
+    replacing the original with it, so readers never see a partially written file.
+
+    Args:
+        path: the file to write
+        contents: the new contents of the file
+        newline: passed to open; the default of "" writes line endings exactly as given
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w", newline=newline) as temp_file:
+            temp_file.write(contents)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def copy_if_different(source: str, destination: str) -> bool:
+    """
+    Atomically copy a file, but only if the destination does not already have the same contents.
+
+    Args:
+        source: file to copy from
+        destination: file to copy to
+
+    Returns: True if the destination was written; False if it was already identical
+    """
+    with open(source, newline="") as source_file:
+        contents = source_file.read()
+
+    if os.path.exists(destination):
+        with open(destination, newline="") as destination_file:
+            if destination_file.read() == contents:
+                return False
+
+    write_atomically(destination, contents)
+    return True
+
+
+class IcpProperties:
+    """
+    An isisicp.properties file, parsed once and edited as a diff.
+
+    Lines which are not touched by an edit (including comments and blank lines) are written back
+    exactly as they were read.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: path to the properties file to read
+        """
+        self.path = path
+        with open(path, newline="") as properties_file:
+            self._lines = properties_file.readlines()
+
+        self._newline = "\r\n"
+        for line in self._lines:
+            if line.endswith("\r\n"):
+                break
+            if line.endswith("\n"):
+                self._newline = "\n"
+                break
+
+        self._index: dict[str, int] = {}
+        for line_number, line in enumerate(self._lines):
+            parsed = self._parse_line(line)
+            if parsed is not None and parsed[0] not in self._index:
+                self._index[parsed[0]] = line_number
+
+    @staticmethod
+    def _parse_line(line: str) -> tuple[str, str] | None:
+        """
+        Parse a line of the properties file.
+
+        Args:
+            line: the line to parse
+
+        Returns: tuple of key and value; None if the line is blank, a comment or has no value
+        """
+        stripped = line.strip()
+        if not stripped or stripped.startswith(COMMENT_CHARACTERS):
+            return None
+        key, separator, value = stripped.partition(KEY_VALUE_SEPARATOR)
+        if not separator:
+            return None
+        return key.strip(), value.strip()
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        """
+        Get the value of a property.
+
+        Args:
+            key: the property name
+            default: returned if the property is not in the file
+
+        Returns: the property value as a string
+        """
+        if key not in self._index:
+            return default
+        return self._parse_line(self._lines[self._index[key]])[1]
+
+    def diff(self, changes: dict[str, Any]) -> dict[str, tuple[str | None, str]]:
+        """
+        Work out which of the requested changes differ from what is in the file.
+
+        Args:
+            changes: property names mapped to their requested values
+
+        Returns: the properties that would change, mapped to a tuple of (old value, new value).
+            The old value is None if the property is not currently in the file.
+        """
+        differences = {}
+        for key, value in changes.items():
+            new_value = _format_value(value)
+            old_value = self.get(key)
+            if old_value != new_value:
+                differences[key] = (old_value, new_value)
+        return differences
+
+    def apply(self, changes: dict[str, Any]) -> dict[str, tuple[str | None, str]]:
+        """
+        Apply changes to the in-memory copy of the file. Call write to save them.
+
+        Args:
+            changes: property names mapped to their requested values
+
+        Returns: the properties that changed, as returned by diff
+        """
+        differences = self.diff(changes)
+        for key, (_, new_value) in differences.items():
+            line = f"{key} {KEY_VALUE_SEPARATOR} {new_value}{self._newline}"
+            if key in self._index:
+                self._lines[self._index[key]] = line
+            else:
+                if self._lines and not self._lines[-1].endswith("\n"):
+                    self._lines[-1] += self._newline
+                self._index[key] = len(self._lines)
+                self._lines.append(line)
+        return differences
+
+    def write(self) -> None:
+        """
+        Atomically write the in-memory copy back to the file.
+        """
+        write_atomically(self.path, "".join(self._lines))
+
+    def update(self, changes: dict[str, Any]) -> dict[str, tuple[str | None, str]]:
+        """
+        Apply changes and write the file, only if anything actually changed.
+
+        Args:
+            changes: property names mapped to their requested values
+
+        Returns: the properties that changed, as returned by diff
+        """
+        differences = self.apply(changes)
+        if differences:
+            self.write()
+        return differences
@@ -0,0 +1,301 @@
+"""
+Profiling of module import times, using python's -X importtime in a clean interpreter, and
+importing many modules in parallel batches of fresh interpreters.
+
+When run as a script this module is the worker for sweep_imports: it imports each module named on
+the command line in turn and prints a result line for each.
+"""
+
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+# Matches lines of -X importtime output, e.g. "import time:       123 |       4567 |   json.decoder"
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+# Each level of nesting in -X importtime output is indented by this many spaces
+INDENT_PER_LEVEL = 2
+
+MICROSECONDS_PER_SECOND = 1_000_000
+
+# Prefix of the lines the sweep worker prints, to tell them apart from anything modules print
+RESULT_PREFIX = "IMPORT_RESULT:"
+
+# Seconds a sweep worker may take to import one batch of modules
+SWEEP_BATCH_TIMEOUT = 600
+
+
+@dataclass
+class ImportRecord:
+    """
+    The time taken to import one module, and the modules it imported in turn.
+    """
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: list["ImportRecord"] = field(default_factory=list)
+
+    @property
+    def cumulative_seconds(self) -> float:
+        return self.cumulative_us / MICROSECONDS_PER_SECOND
+
+    def walk(self) -> list["ImportRecord"]:
+        """
+        Returns: this record and all records beneath it
+        """
+        records = [self]
+        for child in self.children:
+            records.extend(child.walk())
+        return records
+
+    def heaviest_chain(self) -> list["ImportRecord"]:
+        """
+        Follow the child with the largest cumulative import time down to a leaf.
+
+        Returns: the chain of records, starting with this one
+        """
+        chain = [self]
+        while chain[-1].children:
+            chain.append(max(chain[-1].children, key=lambda child: child.cumulative_us))
+        return chain
+
+
+def parse_import_times(output: str) -> list[ImportRecord]:
+    """
+    Parse the output of python -X importtime into a tree of import records.
+
+    Python prints a module's line after the lines of the modules it imported, indented one level
+    less than them, so children are collected from a stack as their parent's line is read.
+
+    Args:
+        output: stderr of a python process run with -X importtime
+
+    Returns: the top level imports, in the order they were imported
+    """
+    stack: list[tuple[int, ImportRecord]] = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // INDENT_PER_LEVEL
+        record = ImportRecord(name, int(self_us), int(cumulative_us))
+        while stack and stack[-1][0] > depth:
+            record.children.insert(0, stack.pop()[1])
+        stack.append((depth, record))
+    return [record for _, record in stack]
+
+
+@dataclass
+class ImportProfile:
+    """
+    Import times of everything imported while importing a module in a clean interpreter.
+    """
+
+    module_name: str
+    imports: list[ImportRecord]
+
+    def total_seconds(self) -> float:
+        """
+        Returns: total time taken importing the module, including everything it imported and
+            the imports made while the interpreter started up
+        """
+        return sum(record.cumulative_us for record in self.imports) / MICROSECONDS_PER_SECOND
+
+    def heaviest_self_times(self, count: int = 10) -> list[ImportRecord]:
+        """
+        Args:
+            count: number of records to return
+
+        Returns: the modules which took the longest to import, excluding their own imports
+        """
+        records = [record for top in self.imports for record in top.walk()]
+        return sorted(records, key=lambda record: record.self_us, reverse=True)[:count]
+
+    def heaviest_chains(self, count: int = 5) -> list[list[ImportRecord]]:
+        """
+        Args:
+            count: number of chains to return
+
+        Returns: the chain of heaviest imports under each of the heaviest top level imports
+        """
+        tops = sorted(self.imports, key=lambda record: record.cumulative_us, reverse=True)
+        return [top.heaviest_chain() for top in tops[:count]]
+
+    def report(self, count: int = 5) -> str:
+        """
+        Args:
+            count: number of chains and modules to report
+
+        Returns: a summary of the slowest imports
+        """
+        lines = [
+            f"Starting python and importing {self.module_name} took {self.total_seconds():.3f}s",
+            "Heaviest chains:",
+        ]
+        for chain in self.heaviest_chains(count):
+            lines.append(
+                "  " + " -> ".join(f"{r.name} ({r.cumulative_seconds:.3f}s)" for r in chain)
+            )
+        lines.append("Heaviest self times:")
+        for record in self.heaviest_self_times(count):
+            lines.append(f"  {record.name}: {record.self_us / MICROSECONDS_PER_SECOND:.3f}s")
+        return "\n".join(lines)
+
+
+def profile_import(
+    module_name: str, python: str = sys.executable, timeout: int = 300
+) -> ImportProfile:
+    """
+    Import a module in a new interpreter and record how long each import took.
+
+    Args:
+        module_name: the module to import
+        python: the python executable to use
+        timeout: seconds to wait for the import
+
+    Returns: the import profile
+
+    Raises:
+        ImportError: if the module could not be imported
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise ImportError(f"Could not import {module_name}: {result.stderr[-2000:]}")
+    return ImportProfile(module_name, parse_import_times(result.stderr))
+
+
+@dataclass
+class ModuleImportResult:
+    """
+    The outcome of importing a module during a sweep.
+    """
+
+    module: str
+    error: str | None = None
+    seconds: float | None = None
+    rss_bytes: int | None = None
+    # Peak working set of the interpreter so far; only measured on Windows, and includes the modules
+    # imported before this one in the same batch
+    peak_rss_bytes: int | None = None
+
+
+def _run_sweep_batch(modules: list[str]) -> list[ModuleImportResult]:
+    """
+    Import a batch of modules in a fresh interpreter. If the interpreter crashes or hangs, the
+    module it was importing is reported as the cause and the rest of the batch is imported in
+    another fresh interpreter.
+
+    Args:
+        modules: names of the modules to import
+
+    Returns: the result of importing each module
+    """
+    # The worker is run as a script, so give it this interpreter's path to find the same modules,
+    # including those in the directory the tests are run from
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(os.path.abspath(path or ".") for path in sys.path)
+
+    results = []
+    remaining = list(modules)
+    while remaining:
+        try:
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), *remaining],
+                capture_output=True,
+                text=True,
+                timeout=SWEEP_BATCH_TIMEOUT,
+                env=environment,
+            )
+            output, failure = process.stdout, f"interpreter exited with code {process.returncode}"
+        except subprocess.TimeoutExpired as e:
+            output = e.stdout.decode(errors="replace") if isinstance(e.stdout, bytes) else e.stdout
+            failure = f"interpreter did not finish within {SWEEP_BATCH_TIMEOUT}s"
+
+        for line in (output or "").splitlines():
+            if line.startswith(RESULT_PREFIX):
+                result = ModuleImportResult(**json.loads(line[len(RESULT_PREFIX) :]))
+                results.append(result)
+                remaining.remove(result.module)
+
+        if remaining:
+            # Modules are imported in order, so the first one without a result killed the worker
+            results.append(ModuleImportResult(remaining.pop(0), error=failure))
+    return results
+
+
+def sweep_imports(
+    modules: list[str], batch_size: int = 20, workers: int | None = None
+) -> list[ModuleImportResult]:
+    """
+    Import modules in parallel, each batch in a fresh interpreter so that one module crashing the
+    interpreter or changing global state does not affect modules in other batches.
+
+    Args:
+        modules: names of the modules to import
+        batch_size: number of modules imported by each interpreter
+        workers: number of interpreters to run at once; defaults to the number of CPUs
+
+    Returns: the result of importing each module
+    """
+    batches = [modules[i : i + batch_size] for i in range(0, len(modules), batch_size)]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return [result for batch in executor.map(_run_sweep_batch, batches) for result in batch]
+
+
+def _import_and_report(module_name: str, process: Any) -> None:
+    """
+    Import a module and print a result line describing how it went.
+
+    Args:
+        module_name: the module to import
+        process: psutil.Process of this interpreter, to measure memory with; None to not
+    """
+    result = ModuleImportResult(module_name)
+    start = perf_counter()
+    try:
+        importlib.import_module(module_name)
+    except BaseException as e:
+        result.error = f"{e.__class__.__name__}: {e}"
+    result.seconds = perf_counter() - start
+
+    if process is not None:
+        memory = process.memory_info()
+        result.rss_bytes = memory.rss
+        # peak_wset is only available on Windows; elsewhere there is no peak to report
+        result.peak_rss_bytes = getattr(memory, "peak_wset", None)
+
+    print(f"{RESULT_PREFIX}{json.dumps(result.__dict__)}", flush=True)
+
+
+if __name__ == "__main__":
+    import warnings
+
+    # Lots of modules warn on import, which is too noisy to be useful here
+    warnings.filterwarnings("ignore")
+    # Don't let this directory shadow installed modules
+    script_directory = os.path.dirname(os.path.abspath(__file__))
+    sys.path = [path for path in sys.path if os.path.abspath(path or ".") != script_directory]
+
+    try:
+        import psutil
+
+        this_process = psutil.Process()
+    except ImportError:
+        this_process = None
+
+    for name in sys.argv[1:]:
+        _import_and_report(name, this_process)
@@ -0,0 +1,150 @@
+"""
+A catalogue of the IOCs in the IOC startup config (iocstartup/config.xml), indexed by family and
+instance number, e.g. EUROTHRM_02 is instance 2 of the EUROTHRM family.
+
+The config lists every IOC in the EPICS tree, thousands of them, so it is read with iterparse
+rather than built into a tree, and the catalogue is cached until the file changes.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, field
+from typing import Iterable
+
+IOC_STARTUP_CONFIG = os.path.join("C:\\", "Instrument", "Apps", "EPICS", "iocstartup", "config.xml")
+
+# IOCs are listed in the IOC startup config under two different schemas
+IOC_CONFIG_TAGS = (
+    "{http://epics.isis.rl.ac.uk/schema/ioc_config/1.0}ioc_config",
+    "{http://epics.isis.rl.ac.uk/schema/ioc_configs/1.0}ioc_config",
+)
+
+# Splits an IOC name into its family and instance number
+IOC_NAME_PATTERN = re.compile(r"^(?P<family>.+)_(?P<instance>\d+)$")
+
+
+@dataclass(frozen=True)
+class IocEntry:
+    """
+    An IOC in the catalogue.
+    """
+
+    name: str
+    family: str
+    # None for IOCs with only one instance and no number, e.g. SIMPLE
+    instance: int | None
+
+    @staticmethod
+    def from_name(name: str) -> "IocEntry":
+        match = IOC_NAME_PATTERN.match(name)
+        if match is None:
+            return IocEntry(name, name, None)
+        return IocEntry(name, match.group("family"), int(match.group("instance")))
+
+
+@dataclass
+class IocCatalogue:
+    """
+    The IOCs of an IOC startup config.
+    """
+
+    iocs: dict[str, IocEntry] = field(default_factory=dict)
+    # Family mapped to its IOCs, ordered by instance number
+    families: dict[str, list[IocEntry]] = field(default_factory=dict)
+
+    @staticmethod
+    def from_names(names: Iterable[str]) -> "IocCatalogue":
+        catalogue = IocCatalogue()
+        for name in names:
+            if name not in catalogue.iocs:
+                entry = IocEntry.from_name(name)
+                catalogue.iocs[name] = entry
+                catalogue.families.setdefault(entry.family, []).append(entry)
+        for entries in catalogue.families.values():
+            entries.sort(key=lambda entry: -1 if entry.instance is None else entry.instance)
+        return catalogue
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.iocs
+
+    def __len__(self) -> int:
+        return len(self.iocs)
+
+    def first_instances(
+        self,
+        count: int,
+        exclude_prefixes: Iterable[str] = (),
+        include_unnumbered: bool = False,
+    ) -> list[str]:
+        """
+        Args:
+            count: number of instances to take from each family, lowest numbered first
+            exclude_prefixes: IOCs starting with any of these are left out
+            include_unnumbered: True to include IOCs without an instance number, e.g. SIMPLE
+
+        Returns: names of the IOCs, sorted
+        """
+        excluded = tuple(exclude_prefixes)
+        selected = []
+        for entries in self.families.values():
+            numbered = [entry for entry in entries if entry.instance is not None]
+            chosen = numbered[:count]
+            if include_unnumbered:
+                chosen += [entry for entry in entries if entry.instance is None]
+            selected.extend(entry.name for entry in chosen if not entry.name.startswith(excluded))
+        return sorted(selected)
+
+    def with_instances(
+        self, instances: Iterable[int], exclude_prefixes: Iterable[str] = ()
+    ) -> list[str]:
+        """
+        Args:
+            instances: instance numbers to take from each family, e.g. 1 for EUROTHRM_01
+            exclude_prefixes: IOCs starting with any of these are left out
+
+        Returns: names of the IOCs, sorted
+        """
+        wanted = set(instances)
+        excluded = tuple(exclude_prefixes)
+        return sorted(
+            entry.name
+            for entry in self.iocs.values()
+            if entry.instance in wanted and not entry.name.startswith(excluded)
+        )
+
+
+def _read_ioc_names(path: str) -> list[str]:
+    """
+    Args:
+        path: path of the IOC startup config
+
+    Returns: names of the IOCs in it, in the order they are listed
+    """
+    names = []
+    for _, element in ElementTree.iterparse(path, events=("end",)):
+        if element.tag in IOC_CONFIG_TAGS:
+            names.append(element.attrib["name"])
+            # Nothing else in an IOC's entry is needed, so free it as the file is read
+            element.clear()
+    return names
+
+
+# Path mapped to the modification time of the file and its catalogue
+_catalogues: dict[str, tuple[int, IocCatalogue]] = {}
+
+
+def load_ioc_catalogue(path: str = IOC_STARTUP_CONFIG) -> IocCatalogue:
+    """
+    Args:
+        path: path of the IOC startup config
+
+    Returns: the catalogue of the IOCs in the config; cached until the file is modified
+    """
+    modified = os.stat(path).st_mtime_ns
+    cached = _catalogues.get(path)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+    catalogue = IocCatalogue.from_names(_read_ioc_names(path))
+    _catalogues[path] = (modified, catalogue)
+    return catalogue
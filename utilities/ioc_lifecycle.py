@@ -0,0 +1,241 @@
+"""
+Tracking of IOC starts and stops while a test runs, so that tests can ask whether an IOC restarted
+between two points rather than sleeping and comparing start times.
+
+A background thread polls the devIocStats heartbeat, start time (STARTTOD) and uptime of each IOC
+and records an event whenever one stops or starts. An IOC counts as restarted if its start time
+changes or its uptime goes down, so restarts are seen even if the IOC was down for less than a
+poll interval.
+"""
+
+import threading
+from dataclasses import dataclass
+from time import perf_counter
+
+from genie_python.channel_access_exceptions import UnableToConnectToPVException
+
+from utilities.utilities import as_seconds, g, is_ioc_up
+
+# Seconds between polls of the IOCs
+POLL_INTERVAL = 0.5
+
+# Kinds of event recorded
+STARTED = "started"
+STOPPED = "stopped"
+
+
+@dataclass(frozen=True)
+class IocEvent:
+    """
+    An IOC starting or stopping.
+    """
+
+    ioc: str
+    kind: str
+    # perf_counter when the event was seen, comparable with the marks of the tracker
+    time: float
+    # STARTTOD of the IOC after it started; empty for a stop
+    start_time: str = ""
+
+
+@dataclass
+class _IocState:
+    up: bool | None = None
+    start_time: str | None = None
+    uptime: int | None = None
+
+
+class IocLifecycleTracker:
+    """
+    Records every start and stop of a set of IOCs from when it is started until it is stopped.
+
+    Use marks to refer to points in a test, e.g.
+        with IocLifecycleTracker(["SIMPLE"]) as tracker:
+            before = tracker.mark()
+            ... change config ...
+            restarted = tracker.restarted_between("SIMPLE", before, tracker.mark())
+    """
+
+    def __init__(self, iocs: list[str], poll_interval: float = POLL_INTERVAL) -> None:
+        """
+        Args:
+            iocs: names of the IOCs to track
+            poll_interval: seconds between polls of the IOCs
+        """
+        self.iocs = list(iocs)
+        self.poll_interval = poll_interval
+        self.events: list[IocEvent] = []
+        self._states = {ioc: _IocState() for ioc in self.iocs}
+        self._polls = 0
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._poll_forever, daemon=True)
+
+    def __enter__(self) -> "IocLifecycleTracker":
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread.start()
+        # Wait for the state of each IOC before the tracker started to be known
+        self.mark()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._thread.join()
+
+    def _read_state(self, ioc: str) -> _IocState:
+        """
+        Args:
+            ioc: name of the IOC
+
+        Returns: whether the IOC is up and, if it is, its start time and uptime
+        """
+        try:
+            if not is_ioc_up(ioc):
+                return _IocState(up=False)
+            start_time = g.get_pv(f"CS:IOC:{ioc}:DEVIOS:STARTTOD", is_local=True)
+            uptime = g.get_pv(f"CS:IOC:{ioc}:DEVIOS:UPTIME", is_local=True)
+        except UnableToConnectToPVException:
+            return _IocState(up=False)
+        try:
+            uptime_seconds = as_seconds(uptime)
+        except (AttributeError, ValueError):
+            # Uptimes of over a day are not in HH:MM:SS
+            uptime_seconds = None
+        return _IocState(up=True, start_time=start_time or None, uptime=uptime_seconds)
+
+    def _update(self, ioc: str, state: _IocState) -> None:
+        """
+        Record any event between the last known state of an IOC and its new state.
+
+        Args:
+            ioc: name of the IOC
+            state: its new state
+        """
+        previous = self._states[ioc]
+        now = perf_counter()
+        if not state.up:
+            if previous.up:
+                self.events.append(IocEvent(ioc, STOPPED, now))
+            previous.up = False
+            return
+        if state.start_time is None:
+            # Still booting, the start time is not set yet
+            return
+
+        known = previous.start_time is not None
+        restarted = previous.start_time != state.start_time or (
+            previous.uptime is not None
+            and state.uptime is not None
+            and state.uptime < previous.uptime
+        )
+        if known and restarted:
+            self.events.append(IocEvent(ioc, STARTED, now, state.start_time))
+        self._states[ioc] = state
+
+    def _poll_forever(self) -> None:
+        while not self._stopping.is_set():
+            for ioc in self.iocs:
+                try:
+                    state = self._read_state(ioc)
+                except Exception as e:
+                    # Keep polling; the IOC's state is read again next time
+                    print(f"Could not read the state of IOC {ioc}: {e}")
+                    continue
+                with self._condition:
+                    self._update(ioc, state)
+            with self._condition:
+                self._polls += 1
+                self._condition.notify_all()
+            self._stopping.wait(self.poll_interval)
+
+    def _wait_for_poll(self, timeout: float | None = None) -> bool:
+        """
+        Wait for a poll of every IOC which started after this was called.
+
+        Args:
+            timeout: seconds to wait for; forever if None
+
+        Returns: True if there was a poll in time
+        """
+        with self._condition:
+            target = self._polls + 2
+            return self._condition.wait_for(lambda: self._polls >= target, timeout)
+
+    def mark(self) -> float:
+        """
+        Mark the current point, once every event before it has been recorded.
+
+        Returns: the mark, for use with restarted_between and wait_for_restart
+        """
+        self._wait_for_poll()
+        return perf_counter()
+
+    def events_between(self, ioc: str, start: float, end: float | None = None) -> list[IocEvent]:
+        """
+        Args:
+            ioc: name of the IOC
+            start: mark to look from
+            end: mark to look until; the present if None
+
+        Returns: the events of the IOC between the marks
+        """
+        with self._condition:
+            return [
+                event
+                for event in self.events
+                if event.ioc == ioc and start <= event.time and (end is None or event.time <= end)
+            ]
+
+    def restarted_between(self, ioc: str, start: float, end: float | None = None) -> bool:
+        """
+        Args:
+            ioc: name of the IOC
+            start: mark to look from
+            end: mark to look until; the present if None
+
+        Returns: True if the IOC started between the marks
+        """
+        return any(event.kind == STARTED for event in self.events_between(ioc, start, end))
+
+    def wait_for_restart(self, ioc: str, since: float, timeout: float) -> IocEvent | None:
+        """
+        Args:
+            ioc: name of the IOC
+            since: mark to look from
+            timeout: seconds to wait for
+
+        Returns: the first start of the IOC since the mark; None if it did not start in time
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.restarted_between(ioc, since), timeout)
+        starts = [event for event in self.events_between(ioc, since) if event.kind == STARTED]
+        return starts[0] if starts else None
+
+    def wait_for_iocs_up(self, timeout: float) -> None:
+        """
+        Wait for every tracked IOC to be up with its start time set.
+
+        Args:
+            timeout: seconds to wait for
+
+        Raises:
+            AssertionError: if any of the IOCs are not up in time
+        """
+
+        def all_up() -> bool:
+            return all(state.up and state.start_time for state in self._states.values())
+
+        self._wait_for_poll(timeout)
+        with self._condition:
+            if not self._condition.wait_for(all_up, timeout):
+                down = [
+                    ioc
+                    for ioc, state in self._states.items()
+                    if not (state.up and state.start_time)
+                ]
+                raise AssertionError(f"IOCs {down} were not up within {timeout}s")
@@ -0,0 +1,111 @@
+"""
+Live spectrum plots which update incrementally rather than being redrawn from scratch.
+
+g.plot_spectrum(...).refresh() replaces the data of every line, rescales the axes and then shows,
+and so redraws, every open figure. A LiveSpectrumPlot keeps the Line2D artist of each spectrum,
+only sets new y data when the counts have changed, and only redraws its own figure, which pushes
+the new frame to any connected websocket clients.
+"""
+
+from typing import Any
+
+import numpy as np
+
+from utilities.utilities import g
+
+# Number of figures the IBEX websocket backend keeps open; creating another closes the oldest
+MAX_FIGURES = 3
+
+
+class LiveSpectrumPlot:
+    """
+    A plot of one or more DAE spectra which can be refreshed cheaply during a run.
+    """
+
+    def __init__(self, spectrum: int, period: int = 1, dist: bool = True) -> None:
+        """
+        Create the figure and plot the first spectrum on it.
+
+        Args:
+            spectrum: the spectrum number
+            period: the period number
+            dist: True to plot the spectrum as a distribution, False as a histogram
+        """
+        # Import pyplot here so the backend can be chosen before it is first imported
+        import matplotlib.pyplot as pyplot
+
+        self.figure = pyplot.figure()
+        self.axes = self.figure.add_subplot(111)
+        self.axes.set_xlabel("Time")
+        self.axes.set_ylabel("Counts")
+        self.axes.set_title(f"Spectrum {spectrum}")
+        self.spectra: list[tuple[int, int, bool]] = []
+        self.lines: list[Any] = []
+        self.add_spectrum(spectrum, period, dist)
+        # Showing starts the plot server and opens the plot in the GUI, as g.plot_spectrum does
+        pyplot.show(block=False)
+
+    def add_spectrum(self, spectrum: int, period: int = 1, dist: bool = True) -> "LiveSpectrumPlot":
+        """
+        Add a spectrum to the plot.
+
+        Args:
+            spectrum: the spectrum number
+            period: the period number
+            dist: True to plot the spectrum as a distribution, False as a histogram
+
+        Returns: this plot
+        """
+        data = g.get_spectrum(spectrum, period, dist)
+        (line,) = self.axes.plot(data["time"], data["signal"], label=f"Spect {spectrum}")
+        self.spectra.append((spectrum, period, dist))
+        self.lines.append(line)
+        self.axes.legend()
+        self._draw()
+        return self
+
+    def update(self) -> bool:
+        """
+        Fetch the latest data for each spectrum and redraw the figure if any of it has changed.
+
+        Only the y data of existing lines is replaced, unless the time channels have changed, and
+        the figure is not redrawn at all if no counts have changed since the last update.
+
+        Returns: True if the figure was redrawn; False if nothing had changed
+        """
+        changed = False
+        for (spectrum, period, dist), line in zip(self.spectra, self.lines):
+            data = g.get_spectrum(spectrum, period, dist)
+            signal = np.asarray(data["signal"])
+            if len(data["time"]) != len(line.get_xdata()) or not np.array_equal(
+                data["time"], line.get_xdata()
+            ):
+                line.set_data(data["time"], signal)
+                changed = True
+            elif not np.array_equal(signal, line.get_ydata()):
+                line.set_ydata(signal)
+                changed = True
+
+        if changed:
+            self.axes.relim()
+            self.axes.autoscale_view()
+            self._draw()
+        return changed
+
+    def _draw(self) -> None:
+        """
+        Redraw only this figure. The websocket backend sends the new frame to connected clients
+        when a figure is drawn.
+        """
+        self.figure.canvas.draw()
+
+    def close(self) -> None:
+        """
+        Close the figure.
+        """
+        import matplotlib.pyplot as pyplot
+
+        pyplot.close(self.figure)
+
+    def __repr__(self) -> str:
+        return f"Live spectra plot ({', '.join(str(spectrum) for spectrum, _, _ in self.spectra)})"
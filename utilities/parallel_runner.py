@@ -0,0 +1,260 @@
+"""
+Running of tests, recording which fail, optionally in several worker processes at once against the
+same instrument.
+
+Tests are grouped into units (see utilities.resource_locks) and a unit is only started while no
+running unit holds a conflicting lock, so tests which share nothing overlap their long waits for
+PVs, IOCs and the blockserver while tests which share state still run one at a time. Each worker
+writes its own XML reports, and the output of a unit is printed in one piece when it finishes.
+"""
+
+import io
+import threading
+import time
+import unittest
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, TextIO
+
+import xmlrunner
+from genie_python.genie_toggle_settings import exceptions_raised
+from xmlrunner.result import _XMLTestResult
+
+from utilities import utilities
+from utilities.failure_manifest import ERROR, FAILURE, FailedTest, failed_to_load, rerun_id
+from utilities.payloads import decode_json_payload
+from utilities.resource_locks import ScheduledUnit, iter_tests, locks_of, next_unit, plan_units
+
+# Seconds to wait for the name of the current config when recording a failed test
+CURRENT_CONFIG_TIMEOUT = 5
+
+
+def _current_config() -> str | None:
+    """
+    Returns: name of the config currently loaded; None if it can not be read within
+        CURRENT_CONFIG_TIMEOUT, e.g. because the blockserver is down
+    """
+    config: list[str] = []
+
+    def read_config() -> None:
+        try:
+            details = utilities.g.get_pv("CS:BLOCKSERVER:GET_CURR_CONFIG_DETAILS", is_local=True)
+            config.append(decode_json_payload(details)["name"])
+        except Exception:
+            pass
+
+    # Read in a daemon thread so that a read which hangs is abandoned rather than waited for
+    reader = threading.Thread(target=read_config, daemon=True)
+    reader.start()
+    reader.join(CURRENT_CONFIG_TIMEOUT)
+    return config[0] if config else None
+
+
+class RecordingTestResult(_XMLTestResult):
+    """
+    An XML test result which also records the tests which fail, for the failure manifest.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.failed_tests: list[FailedTest] = []
+        self._test_started = time.perf_counter()
+
+    def startTest(self, test: unittest.TestCase) -> None:
+        self._test_started = time.perf_counter()
+        super().startTest(test)
+
+    def _record(self, test: unittest.TestCase, kind: str) -> None:
+        duration = time.perf_counter() - self._test_started
+        declared = locks_of(test).config if isinstance(test, unittest.TestCase) else None
+        if failed_to_load(test):
+            # Nothing of the test ran, so the config loaded says nothing about what it needs
+            config = None
+        elif declared is not None:
+            config = declared
+        else:
+            config = _current_config()
+        self.failed_tests.append(FailedTest(rerun_id(test), kind, duration, config))
+
+    def addFailure(self, test: unittest.TestCase, err: Any) -> None:
+        super().addFailure(test, err)
+        self._record(test, FAILURE)
+
+    def addError(self, test: unittest.TestCase, err: Any) -> None:
+        super().addError(test, err)
+        self._record(test, ERROR)
+
+
+@dataclass
+class UnitResult:
+    """
+    The outcome of running a unit in a worker.
+    """
+
+    name: str
+    successful: bool
+    tests_run: int
+    output: str
+    # Seconds the unit took to run
+    duration: float
+    failed_tests: list[FailedTest]
+
+
+def _initialise_worker() -> None:
+    """
+    Set up genie_python in a worker process as run_tests does for the main process.
+    """
+    utilities.ensure_instrument_set()
+    exceptions_raised(True)
+
+
+def _run_unit(unit: ScheduledUnit, output_dir: str, outsuffix: str, failfast: bool) -> UnitResult:
+    """
+    Run a unit in a worker process.
+
+    Args:
+        unit: the unit to run
+        output_dir: directory to write the XML reports to
+        outsuffix: suffix of the XML reports, unique to the unit so that units of the same class
+            do not overwrite each other's reports
+        failfast: True to stop the unit at its first failure
+
+    Returns: the outcome of the unit
+    """
+    stream = io.StringIO()
+    start = time.perf_counter()
+    suite = unittest.TestLoader().loadTestsFromNames(unit.test_ids)
+    result = xmlrunner.XMLTestRunner(
+        output=output_dir,
+        outsuffix=outsuffix,
+        stream=stream,
+        failfast=failfast,
+        verbosity=3,
+        resultclass=RecordingTestResult,
+    ).run(suite)
+    return UnitResult(
+        unit.name,
+        result.wasSuccessful(),
+        result.testsRun,
+        stream.getvalue(),
+        time.perf_counter() - start,
+        result.failed_tests,
+    )
+
+
+def _errored_unit(unit: ScheduledUnit, error: BaseException, duration: float) -> UnitResult:
+    """
+    Args:
+        unit: a unit whose worker did not return a result, e.g. because the worker process died
+        error: the exception raised instead of the result
+        duration: seconds since the unit was started
+
+    Returns: the outcome of the unit, with each of its tests recorded as an error
+    """
+    return UnitResult(
+        unit.name,
+        False,
+        0,
+        f"{unit.name} did not finish: {error!r}\n",
+        duration,
+        [FailedTest(test_id, ERROR, duration, unit.locks.config) for test_id in unit.test_ids],
+    )
+
+
+def run_in_parallel(
+    suite: unittest.TestSuite, jobs: int, output_dir: str, stream: TextIO, failfast: bool = False
+) -> tuple[bool, list[FailedTest]]:
+    """
+    Run a suite with up to a number of units at once.
+
+    Args:
+        suite: the tests to run
+        jobs: the maximum number of units to run at once, each in its own worker process
+        output_dir: directory to write the XML reports to
+        stream: stream to print the output of each unit to as it finishes
+        failfast: True to start no more units after the first failure
+
+    Returns: True if every test was successful, and the tests which failed
+    """
+    tests = list(iter_tests(suite))
+    successful = True
+    failed_tests = []
+
+    # Tests standing in for modules which failed to import can not be loaded again by name
+    not_loadable = unittest.TestSuite(test for test in tests if failed_to_load(test))
+    if not_loadable.countTestCases():
+        result = xmlrunner.XMLTestRunner(
+            output=output_dir, stream=stream, verbosity=3, resultclass=RecordingTestResult
+        ).run(not_loadable)
+        successful = result.wasSuccessful()
+        failed_tests.extend(result.failed_tests)
+
+    pending = plan_units(test for test in tests if not failed_to_load(test))
+    running: dict[Future, ScheduledUnit] = {}
+    # The pool each running unit was submitted to, and when
+    submitted: dict[Future, tuple[ProcessPoolExecutor, float]] = {}
+    run_id = time.strftime("%Y%m%d%H%M%S")
+    started = 0
+    start = time.perf_counter()
+
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=jobs, initializer=_initialise_worker)
+
+    executor = new_pool()
+    try:
+        while pending or running:
+            while len(running) < jobs and not (failfast and not successful):
+                # Only read the config when it matters, as reading it may wait for a timeout
+                needs_config = any(unit.locks.config is not None for unit in pending)
+                loaded_config = _current_config() if needs_config else None
+                unit = next_unit(pending, running.values(), loaded_config)
+                if unit is None:
+                    break
+                pending.remove(unit)
+                started += 1
+                outsuffix = f"{run_id}-{started}"
+                try:
+                    future = executor.submit(_run_unit, unit, output_dir, outsuffix, failfast)
+                except BrokenProcessPool:
+                    # A worker died since the last units finished; carry on with a new pool
+                    executor.shutdown(wait=False)
+                    executor = new_pool()
+                    future = executor.submit(_run_unit, unit, output_dir, outsuffix, failfast)
+                running[future] = unit
+                submitted[future] = (executor, time.perf_counter())
+
+            if not running:
+                # Stopped early by failfast
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            pool_broken = False
+            for future in done:
+                unit = running.pop(future)
+                pool, submitted_time = submitted.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The rest of the run's results are kept, with this unit recorded as errored
+                    result = _errored_unit(unit, e, time.perf_counter() - submitted_time)
+                    pool_broken = pool_broken or (
+                        isinstance(e, BrokenProcessPool) and pool is executor
+                    )
+                successful = successful and result.successful
+                failed_tests.extend(result.failed_tests)
+                stream.write(result.output)
+                print(
+                    f"{result.name}: {result.tests_run} tests in {result.duration:.1f}s, "
+                    f"{'passed' if result.successful else 'FAILED'}",
+                    file=stream,
+                )
+            if pool_broken:
+                # Units still running in the broken pool fail with it, and are recorded as errored
+                # when they are waited for; later units are run in a new pool
+                executor.shutdown(wait=False)
+                executor = new_pool()
+    finally:
+        executor.shutdown()
+
+    print(f"Ran tests in {jobs} workers in {time.perf_counter() - start:.1f}s", file=stream)
+    return successful, failed_tests
@@ -0,0 +1,46 @@
+"""
+Encoding and decoding of the JSON payloads of blockserver PVs, e.g. GET_CURR_CONFIG_DETAILS and
+SET_CURR_CONFIG_DETAILS, which are zlib compressed and then hexed.
+
+These produce and accept the same payloads as genie_python's compress_and_hex and
+dehex_and_decompress, but go straight between JSON and the payload, so callers do not have to
+encode and parse the JSON themselves. Decoding takes the payload as str, bytes or a memoryview.
+"""
+
+import binascii
+import json
+import zlib
+from typing import Any
+
+Payload = str | bytes | bytearray | memoryview
+
+
+def decode_payload(payload: Payload) -> bytes:
+    """
+    Args:
+        payload: a compressed and hexed payload; a str must only contain hex digits
+
+    Returns: the decompressed payload, as UTF-8 bytes
+    """
+    return zlib.decompress(binascii.unhexlify(payload))
+
+
+def decode_json_payload(payload: Payload) -> Any:
+    """
+    Args:
+        payload: a compressed and hexed JSON payload, e.g. the value of GET_CURR_CONFIG_DETAILS
+
+    Returns: the decoded JSON
+    """
+    return json.loads(decode_payload(payload))
+
+
+def encode_json_payload(value: Any, level: int = zlib.Z_DEFAULT_COMPRESSION) -> bytes:
+    """
+    Args:
+        value: the value to encode as JSON, e.g. config details to set
+        level: zlib compression level; lower levels are quicker but produce larger payloads
+
+    Returns: the JSON compressed and hexed, ready to write to a blockserver PV
+    """
+    return binascii.hexlify(zlib.compress(json.dumps(value).encode("utf-8"), level))
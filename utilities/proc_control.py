@@ -0,0 +1,132 @@
+"""
+Measurement of how quickly procServ control (the CS:PS:<ioc>:START/STOP PVs) acts on IOCs.
+
+Commands are sent to a number of IOCs at once, one thread per IOC, and for each command the time
+for the write to be accepted, for procServ to report the new status and for the IOC's heartbeat to
+appear or disappear are recorded.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter, sleep
+from typing import Callable
+
+from utilities.benchmarking import summarise
+from utilities.utilities import g, is_ioc_up
+
+# Status procServ reports for an IOC after each command
+EXPECTED_STATUS = {"START": "running", "STOP": "shutdown"}
+
+# Seconds between checks of the status and heartbeat of an IOC
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class ProcServCommandSample:
+    """
+    Timings of one command to one IOC, in seconds from just before the command was written. A
+    timing is None if that stage was not reached in time.
+    """
+
+    ioc: str
+    command: str
+    # perf_counter when the command was written
+    sent_at: float = 0.0
+    accepted: float | None = None
+    status: float | None = None
+    heartbeat: float | None = None
+
+    @property
+    def completed(self) -> bool:
+        return self.heartbeat is not None
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float, start: float) -> float | None:
+    """
+    Args:
+        condition: function returning True once the stage has been reached
+        timeout: seconds from the start to wait for
+        start: perf_counter the timing is from
+
+    Returns: seconds from the start until the condition was True; None if it was not in time
+    """
+    while perf_counter() - start < timeout:
+        if condition():
+            return perf_counter() - start
+        sleep(POLL_INTERVAL)
+    return None
+
+
+def send_command(ioc: str, command: str, timeout: float) -> ProcServCommandSample:
+    """
+    Send a command to an IOC's procServ and time its effect.
+
+    Args:
+        ioc: name of the IOC
+        command: START or STOP
+        timeout: seconds to wait for each stage
+
+    Returns: the timings of the command
+    """
+    start = perf_counter()
+    sample = ProcServCommandSample(ioc, command, start)
+    g.set_pv(f"CS:PS:{ioc}:{command}", 1, is_local=True, wait=True)
+    sample.accepted = perf_counter() - start
+
+    expected_status = EXPECTED_STATUS[command]
+    sample.status = _wait_for(
+        lambda: str(g.get_pv(f"CS:PS:{ioc}:STATUS", is_local=True)).lower() == expected_status,
+        timeout,
+        start,
+    )
+    sample.heartbeat = _wait_for(lambda: is_ioc_up(ioc) == (command == "START"), timeout, start)
+    return sample
+
+
+def send_concurrent_commands(
+    iocs: list[str], command: str, timeout: float
+) -> tuple[list[ProcServCommandSample], float]:
+    """
+    Send a command to the procServ of several IOCs at once.
+
+    Args:
+        iocs: names of the IOCs
+        command: START or STOP
+        timeout: seconds to wait for each stage of each command
+
+    Returns: the timings of each command, and the number of commands accepted per second
+    """
+    with ThreadPoolExecutor(max_workers=len(iocs)) as executor:
+        start = perf_counter()
+        samples = list(executor.map(lambda ioc: send_command(ioc, command, timeout), iocs))
+    accepted_at = [
+        sample.sent_at + sample.accepted for sample in samples if sample.accepted is not None
+    ]
+    return samples, len(accepted_at) / (max(accepted_at) - start)
+
+
+def summarise_commands(
+    samples: list[ProcServCommandSample], commands_per_second: float
+) -> dict[str, float]:
+    """
+    Args:
+        samples: timings of commands sent together
+        commands_per_second: number of those commands accepted per second
+
+    Returns: flat results suitable for a baseline, of the median and 95th percentile of each
+        stage, the commands accepted per second (as seconds per command, so that lower is
+        better) and the number of commands which did not complete
+    """
+    command = samples[0].command.lower()
+    results = {
+        f"{command}_seconds_per_command": 1 / commands_per_second,
+        f"{command}_incomplete": float(sum(not sample.completed for sample in samples)),
+    }
+    for stage in ("accepted", "status", "heartbeat"):
+        timings = [getattr(sample, stage) for sample in samples]
+        timings = [timing for timing in timings if timing is not None]
+        if timings:
+            summary = summarise(timings)
+            results[f"{command}_{stage}_median"] = summary["median"]
+            results[f"{command}_{stage}_p95"] = summary["p95"]
+    return results
@@ -0,0 +1,237 @@
+"""
+Declarations of the shared instrument state a test uses, so that tests which do not conflict can
+be run at the same time against one instrument.
+
+Test classes, or individual test methods, are decorated with resource_locks, e.g.
+    @resource_locks(config="rcptt_simple", blocks=["MBBI_BLOCK"])
+A test without any declaration may touch anything, so it is never run alongside another test.
+
+Two tests conflict if they both need a config loaded and the configs differ, if either changes
+configs, or if they both lock the DAE or the same IOC, block or PV. A test needing a config which
+is not loaded yet will load it, so until it is loaded the test is treated as changing configs.
+
+This module deliberately does not import genie_python so that tests which do not need an
+instrument can declare their locks.
+"""
+
+import unittest
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Attribute the locks are stored in on a test class or method
+RESOURCE_LOCKS_ATTRIBUTE = "resource_locks"
+
+# Resources which may only be used by one test at a time
+DAE = "dae"
+CONFIG = "config"
+
+
+@dataclass(frozen=True)
+class ResourceLocks:
+    """
+    The shared state a test uses.
+    """
+
+    # Config the test needs loaded; tests needing the same config may run together
+    config: str | None = None
+    # Resources the test needs to itself, e.g. "dae", "ioc:SIMPLE" or "block:MBBI_BLOCK"
+    exclusive: frozenset[str] = frozenset()
+    # True if the test may touch anything, and so conflicts with every other test
+    everything: bool = False
+
+    def conflicts_with(self, other: "ResourceLocks") -> bool:
+        """
+        Args:
+            other: locks of another test
+
+        Returns: True if the tests must not run at the same time
+        """
+        if self.everything or other.everything:
+            return True
+        if self.exclusive & other.exclusive:
+            return True
+        if (CONFIG in self.exclusive and other.config is not None) or (
+            CONFIG in other.exclusive and self.config is not None
+        ):
+            return True
+        return self.config is not None and other.config is not None and self.config != other.config
+
+    def union(self, other: "ResourceLocks") -> "ResourceLocks":
+        """
+        Args:
+            other: locks of another test
+
+        Returns: locks covering both tests
+        """
+        if self.everything or other.everything:
+            return EVERYTHING
+        if self.config is not None and other.config is not None and self.config != other.config:
+            # A test can not have two configs loaded at once, so it must be changing config
+            return ResourceLocks(exclusive=self.exclusive | other.exclusive | {CONFIG})
+        return ResourceLocks(
+            config=self.config if self.config is not None else other.config,
+            exclusive=self.exclusive | other.exclusive,
+        )
+
+    def given_loaded(self, loaded_config: str | None) -> "ResourceLocks":
+        """
+        Args:
+            loaded_config: name of the config currently loaded; None if not known
+
+        Returns: these locks, also locking config changes if the test needs a config other than
+            the one loaded, as it will load that config
+        """
+        if self.config is None or self.config == loaded_config:
+            return self
+        return ResourceLocks(config=self.config, exclusive=self.exclusive | {CONFIG})
+
+
+# Locks of a test which has not declared any
+EVERYTHING = ResourceLocks(everything=True)
+
+
+def resource_locks(
+    config: str | None = None,
+    dae: bool = False,
+    changes_config: bool = False,
+    iocs: Iterable[str] = (),
+    blocks: Iterable[str] = (),
+    pvs: Iterable[str] = (),
+) -> Callable[[T], T]:
+    """
+    Decorator declaring the shared state a test class or test method uses. Locks on a method are
+    added to the locks of its class.
+
+    Args:
+        config: name of the config the test needs loaded
+        dae: True if the test uses the DAE
+        changes_config: True if the test loads configs or changes the current config
+        iocs: names of IOCs the test starts, stops or writes to
+        blocks: names of blocks the test writes to
+        pvs: PVs, without the instrument prefix, the test writes to
+
+    Returns: the decorator
+    """
+    exclusive = {f"ioc:{ioc}" for ioc in iocs}
+    exclusive |= {f"block:{block}" for block in blocks}
+    exclusive |= {f"pv:{pv}" for pv in pvs}
+    if dae:
+        exclusive.add(DAE)
+    if changes_config:
+        exclusive.add(CONFIG)
+    locks = ResourceLocks(config=config, exclusive=frozenset(exclusive))
+
+    def decorator(test: T) -> T:
+        setattr(test, RESOURCE_LOCKS_ATTRIBUTE, locks)
+        return test
+
+    return decorator
+
+
+def locks_of(test: unittest.TestCase) -> ResourceLocks:
+    """
+    Args:
+        test: the test
+
+    Returns: the locks declared by the test's class and method; EVERYTHING if neither declared any
+    """
+    class_locks = getattr(type(test), RESOURCE_LOCKS_ATTRIBUTE, None)
+    method = getattr(test, test._testMethodName, None)
+    method_locks = getattr(method, RESOURCE_LOCKS_ATTRIBUTE, None)
+    if class_locks is None and method_locks is None:
+        return EVERYTHING
+    if class_locks is None or method_locks is None:
+        return class_locks or method_locks
+    return class_locks.union(method_locks)
+
+
+@dataclass(frozen=True)
+class ScheduledUnit:
+    """
+    Tests which are run together, in one worker, e.g. a test class with a setUpClass.
+    """
+
+    name: str
+    test_ids: tuple[str, ...]
+    locks: ResourceLocks
+
+
+def _has_class_fixtures(test_class: type) -> bool:
+    return (
+        test_class.setUpClass.__func__ is not unittest.TestCase.setUpClass.__func__
+        or test_class.tearDownClass.__func__ is not unittest.TestCase.tearDownClass.__func__
+    )
+
+
+def iter_tests(suite: unittest.TestSuite) -> Iterator[unittest.TestCase]:
+    """
+    Args:
+        suite: a suite, which may contain other suites
+
+    Returns: the tests in the suite, in order
+    """
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+def plan_units(tests: Iterable[unittest.TestCase]) -> list[ScheduledUnit]:
+    """
+    Group tests into the units which are scheduled. The tests of a class are one unit, except that
+    methods declaring their own locks are units of their own, so they can run alongside the rest
+    of their class. Classes with class fixtures are always kept together.
+
+    Args:
+        tests: the tests to run, in order
+
+    Returns: the units, in order of their first test
+    """
+    units: dict[str, list[unittest.TestCase]] = {}
+    for test in tests:
+        test_class = type(test)
+        class_name = f"{test_class.__module__}.{test_class.__qualname__}"
+        method = getattr(test, test._testMethodName, None)
+        if hasattr(method, RESOURCE_LOCKS_ATTRIBUTE) and not _has_class_fixtures(test_class):
+            units[test.id()] = [test]
+        else:
+            units.setdefault(class_name, []).append(test)
+
+    planned = []
+    for name, unit_tests in units.items():
+        locks = locks_of(unit_tests[0])
+        for test in unit_tests[1:]:
+            locks = locks.union(locks_of(test))
+        planned.append(ScheduledUnit(name, tuple(test.id() for test in unit_tests), locks))
+    return planned
+
+
+def next_unit(
+    pending: list[ScheduledUnit],
+    running: Iterable[ScheduledUnit],
+    loaded_config: str | None = None,
+) -> ScheduledUnit | None:
+    """
+    Choose the next unit to start. Units are started in order, but a unit may start ahead of
+    earlier units it does not conflict with. A unit waiting for a lock is never overtaken by a
+    unit it conflicts with, so it is not starved. Units needing a config which is not loaded
+    yet run alone until it is, so units sharing a config do not each load it.
+
+    Args:
+        pending: units not yet started, in order
+        running: units currently running
+        loaded_config: name of the config currently loaded; None if not known, in which case
+            every unit needing a config is assumed to load it
+
+    Returns: the unit to start; None if every pending unit has to wait
+    """
+    blocking = [unit.locks.given_loaded(loaded_config) for unit in running]
+    for unit in pending:
+        locks = unit.locks.given_loaded(loaded_config)
+        if not any(locks.conflicts_with(other) for other in blocking):
+            return unit
+        blocking.append(locks)
+    return None
@@ -0,0 +1,238 @@
+"""
+A structured log of every attempt made by retry_on_failure and retry_assert, so that tests which
+only pass on retry are visible rather than hidden by the retries.
+
+Each attempt is appended to a JSON lines file with its outcome, exception type and duration. Each
+process writes its own file beside the log's path, named after its process ID, so that processes
+running tests at once never append to the same file; reading the log merges them. The summary
+ranks what was retried by the time spent on retries and by how often it passed only after failing.
+Run this module to summarise the whole log:
+    python -m utilities.retry_log [path]
+
+This module deliberately does not import genie_python so that it can be tested without an
+instrument.
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Iterable
+
+# The environment variable used to override where the log is written
+RETRY_LOG_ENV = "SYSTEM_TESTS_RETRY_LOG"
+
+# Name of the log, which run_tests.py writes to the test report directory
+RETRY_LOG_NAME = "retries.jsonl"
+
+DEFAULT_RETRY_LOG = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test-reports", RETRY_LOG_NAME
+)
+
+
+@dataclass(frozen=True)
+class RetryAttempt:
+    """
+    One attempt of a retried test or assertion.
+    """
+
+    # Dotted name of the test, or qualified name of the function, which was retried
+    name: str
+    # Identifies the attempts made by one call of the retrying decorator or function
+    call_id: str
+    attempt: int
+    max_attempts: int
+    passed: bool
+    # Name of the type of exception raised; empty if the attempt passed
+    exception_type: str
+    # Seconds the attempt took, and seconds waited after it before the next attempt
+    duration: float
+    delay: float = 0.0
+    # Seconds since the epoch at which the attempt finished
+    finished_at: float = 0.0
+
+
+@dataclass(frozen=True)
+class RetrySummary:
+    """
+    The retries of one test or function.
+    """
+
+    name: str
+    calls: int
+    # Calls which passed, but only after failing at least once
+    flaky_calls: int
+    # Calls which failed every attempt
+    failed_calls: int
+    # Seconds spent on every attempt which was not the last of its call
+    retry_overhead: float
+
+    @property
+    def flake_rate(self) -> float:
+        return self.flaky_calls / self.calls
+
+
+def retry_log_path() -> str:
+    """
+    Returns: path of the log
+    """
+    return os.environ.get(RETRY_LOG_ENV, DEFAULT_RETRY_LOG)
+
+
+def _process_log_path(path: str, pid: int) -> str:
+    """
+    Args:
+        path: path of the log
+        pid: ID of the process writing to the log
+
+    Returns: path of the file the process writes its part of the log to, e.g. retries.1234.jsonl
+    """
+    root, extension = os.path.splitext(path)
+    return f"{root}.{pid}{extension}"
+
+
+def _log_files(path: str) -> list[str]:
+    """
+    Args:
+        path: path of the log
+
+    Returns: paths of the files each process wrote its part of the log to
+    """
+    root, extension = os.path.splitext(path)
+    candidates = glob.glob(f"{glob.escape(root)}.*{glob.escape(extension)}")
+    return sorted(
+        candidate
+        for candidate in candidates
+        if candidate[len(root) + 1 : len(candidate) - len(extension)].isdigit()
+    )
+
+
+def new_call_id() -> str:
+    return uuid.uuid4().hex
+
+
+def record_attempt(
+    name: str,
+    call_id: str,
+    attempt: int,
+    max_attempts: int,
+    exception: BaseException | None,
+    duration: float,
+    delay: float = 0.0,
+) -> None:
+    """
+    Append an attempt to the log. A failure to write the log is printed rather than raised, so
+    that it never fails the test being retried.
+
+    Args:
+        name: dotted name of the test, or qualified name of the function, being retried
+        call_id: identifies the call making the attempts, from new_call_id
+        attempt: number of the attempt, from 1
+        max_attempts: the most attempts the call will make
+        exception: the exception the attempt raised; None if it passed
+        duration: seconds the attempt took
+        delay: seconds waited after the attempt before the next one
+    """
+    entry = RetryAttempt(
+        name,
+        call_id,
+        attempt,
+        max_attempts,
+        exception is None,
+        "" if exception is None else type(exception).__name__,
+        duration,
+        delay,
+        time.time(),
+    )
+    path = _process_log_path(retry_log_path(), os.getpid())
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a") as log_file:
+            log_file.write(json.dumps(asdict(entry)) + "\n")
+    except OSError as e:
+        print(f"Could not record retry attempt in {path}: {e}")
+
+
+def read_retry_log(path: str, since: float = 0.0) -> list[RetryAttempt]:
+    """
+    Args:
+        path: path of the log
+        since: seconds since the epoch; attempts before this are left out
+
+    Returns: the attempts logged by every process, in the order they finished
+    """
+    attempts = []
+    for log_path in _log_files(path):
+        with open(log_path) as log_file:
+            for line in log_file:
+                if line.strip():
+                    attempt = RetryAttempt(**json.loads(line))
+                    if attempt.finished_at >= since:
+                        attempts.append(attempt)
+    attempts.sort(key=lambda attempt: attempt.finished_at)
+    return attempts
+
+
+def summarise_retries(attempts: Iterable[RetryAttempt]) -> list[RetrySummary]:
+    """
+    Args:
+        attempts: attempts from the log
+
+    Returns: a summary of each retried test or function, with the most time spent on retries first
+        and then the most often flaky
+    """
+    calls: dict[str, list[RetryAttempt]] = {}
+    for attempt in attempts:
+        calls.setdefault(attempt.call_id, []).append(attempt)
+
+    totals: dict[str, dict[str, float]] = {}
+    for call in calls.values():
+        call.sort(key=lambda attempt: attempt.attempt)
+        total = totals.setdefault(
+            call[0].name, {"calls": 0, "flaky": 0, "failed": 0, "overhead": 0.0}
+        )
+        passed = call[-1].passed
+        total["calls"] += 1
+        total["flaky"] += passed and len(call) > 1
+        total["failed"] += not passed
+        total["overhead"] += sum(attempt.duration + attempt.delay for attempt in call[:-1])
+
+    summaries = [
+        RetrySummary(
+            name, int(total["calls"]), int(total["flaky"]), int(total["failed"]), total["overhead"]
+        )
+        for name, total in totals.items()
+    ]
+    summaries.sort(key=lambda summary: (-summary.retry_overhead, -summary.flake_rate))
+    return summaries
+
+
+def format_retry_summary(summaries: list[RetrySummary], limit: int = 20) -> str:
+    """
+    Args:
+        summaries: summaries of retried tests and functions, in order
+        limit: the most to include
+
+    Returns: a table of the summaries which needed retries
+    """
+    retried = [summary for summary in summaries if summary.flaky_calls or summary.failed_calls]
+    if not retried:
+        return "No retries needed"
+    lines = [f"{'overhead':>9}  {'flaky':>9}  {'failed':>6}  name"]
+    for summary in retried[:limit]:
+        lines.append(
+            f"{summary.retry_overhead:>8.1f}s  "
+            f"{f'{summary.flaky_calls}/{summary.calls}':>9}  "
+            f"{summary.failed_calls:>6}  {summary.name}"
+        )
+    if len(retried) > limit:
+        lines.append(f"... and {len(retried) - limit} more")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    log = sys.argv[1] if len(sys.argv) > 1 else retry_log_path()
+    print(format_retry_summary(summarise_retries(read_retry_log(log))))
@@ -0,0 +1,221 @@
+"""
+Stress testing of run control while a begin is in progress.
+
+Each trial begins a run with a run control block out of range, then moves the block in and out of
+range a random number of times with random gaps while the begin completes, and measures how long
+the DAE takes to settle into the state the final value of the block calls for. A trial whose run
+was already in that state when the final value was set measures nothing, so its settle time is
+left out of the statistics.
+"""
+
+import random
+from dataclasses import dataclass, field
+from time import perf_counter, sleep
+
+from utilities.benchmarking import format_histogram, summarise
+from utilities.utilities import g
+
+# Seconds between checks of the run state while waiting for it to settle
+POLL_INTERVAL = 0.05
+
+# Seconds for run control to see the block go out of range before each begin
+PRE_BEGIN_DELAY = 1.0
+
+# Run state expected once the run control block has settled in or out of range
+STATE_IN_RANGE = "RUNNING"
+STATE_OUT_OF_RANGE = "WAITING"
+
+
+@dataclass
+class RunControlTrial:
+    """
+    What happened in one trial of a run control stress test.
+    """
+
+    number: int
+    # (seconds after the begin was requested, value the block was set to)
+    changes: list[tuple[float, float]] = field(default_factory=list)
+    expected_state: str = ""
+    final_state: str = ""
+    # Seconds from the last change until the expected state was reached; None if it never was
+    settle_time: float | None = None
+    # True if the run was already in the expected state just before the last change, so the
+    # settle time does not measure run control responding to it
+    already_settled: bool = False
+    # True if the run left the expected state again while it was being held
+    unstable: bool = False
+
+    @property
+    def passed(self) -> bool:
+        return self.settle_time is not None and not self.unstable
+
+    def describe(self) -> str:
+        """
+        Returns: a description of the trial, detailed enough to reproduce it by hand
+        """
+        changes = ", ".join(f"{value} at {time:.2f}s" for time, value in self.changes)
+        settled = "never" if self.settle_time is None else f"after {self.settle_time:.3f}s"
+        if self.already_settled:
+            settled += " (already in state before the last change)"
+        return (
+            f"Trial {self.number}: set {changes}; expected {self.expected_state}, settled "
+            f"{settled}, finished {self.final_state}{', unstable' if self.unstable else ''}"
+        )
+
+
+class RunControlStress:
+    """
+    Fires randomised sequences of block changes in and out of run control range at a begin which
+    is in progress, and records how long run control takes to settle after each sequence.
+    """
+
+    def __init__(
+        self,
+        block: str,
+        in_range: float,
+        out_of_range: float,
+        seed: int | None = None,
+        max_changes: int = 6,
+        max_gap: float = 2.0,
+        settle_timeout: float = 30.0,
+        hold_time: float = 5.0,
+    ) -> None:
+        """
+        Args:
+            block: name of the block, which must already have run control set up
+            in_range: a value of the block within its run control limits
+            out_of_range: a value of the block outside its run control limits
+            seed: seed for the random sequences, so that a failing run can be repeated; a random
+                seed is used if None
+            max_changes: largest number of changes made to the block in one trial
+            max_gap: longest time in seconds between changes
+            settle_timeout: seconds to wait for the run state to settle after the last change
+            hold_time: seconds the run state must then stay settled for
+        """
+        self.block = block
+        self.in_range = in_range
+        self.out_of_range = out_of_range
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.max_changes = max_changes
+        self.max_gap = max_gap
+        self.settle_timeout = settle_timeout
+        self.hold_time = hold_time
+        self._random = random.Random(self.seed)
+
+    def _sequence(self) -> list[tuple[float, float]]:
+        """
+        Returns: (gap before the change in seconds, value) for each change in a random sequence,
+            which alternates between in and out of range starting in range
+        """
+        values = [self.in_range, self.out_of_range]
+        return [
+            (self._random.uniform(0, self.max_gap), values[i % 2])
+            for i in range(self._random.randint(1, self.max_changes))
+        ]
+
+    def _wait_for_state(self, state: str, timeout: float) -> float | None:
+        """
+        Args:
+            state: the run state to wait for
+            timeout: seconds to wait for
+
+        Returns: seconds taken to reach the state; None if it was not reached in time
+        """
+        start = perf_counter()
+        while perf_counter() - start < timeout:
+            if g.get_runstate() == state:
+                return perf_counter() - start
+            sleep(POLL_INTERVAL)
+        return None
+
+    def _stays_in_state(self, state: str) -> bool:
+        """
+        Args:
+            state: the run state which should be held
+
+        Returns: True if the run stayed in the state for the hold time
+        """
+        end = perf_counter() + self.hold_time
+        while perf_counter() < end:
+            if g.get_runstate() != state:
+                return False
+            sleep(POLL_INTERVAL)
+        return True
+
+    def run_trial(self, number: int) -> RunControlTrial:
+        """
+        Run a single trial, leaving the DAE in SETUP afterwards.
+
+        Args:
+            number: number of the trial, used when reporting it
+
+        Returns: the result of the trial
+        """
+        trial = RunControlTrial(number)
+        sequence = self._sequence()
+
+        # Start out of range, so the run begins in a waiting state
+        g.cset(self.block, self.out_of_range, wait=True)
+        sleep(PRE_BEGIN_DELAY)
+        # A low level begin, as g.begin() would wait for the begin to complete
+        g.set_pv("DAE:BEGINRUNEX", 0, wait=False, is_local=True)
+        begin_time = perf_counter()
+
+        ends_in_range = sequence[-1][1] == self.in_range
+        trial.expected_state = STATE_IN_RANGE if ends_in_range else STATE_OUT_OF_RANGE
+        for index, (gap, value) in enumerate(sequence):
+            sleep(gap)
+            if index == len(sequence) - 1:
+                trial.already_settled = g.get_runstate() == trial.expected_state
+            g.cset(self.block, value, wait=False)
+            trial.changes.append((perf_counter() - begin_time, value))
+
+        trial.settle_time = self._wait_for_state(trial.expected_state, self.settle_timeout)
+        if trial.settle_time is not None:
+            trial.unstable = not self._stays_in_state(trial.expected_state)
+        trial.final_state = g.get_runstate()
+
+        g.abort()
+        g.waitfor_runstate("SETUP")
+        return trial
+
+    def run(self, trials: int) -> list[RunControlTrial]:
+        """
+        Args:
+            trials: number of trials to run
+
+        Returns: the result of each trial
+        """
+        print(f"Run control stress test with seed {self.seed}")
+        results = []
+        for number in range(1, trials + 1):
+            trial = self.run_trial(number)
+            print(trial.describe())
+            results.append(trial)
+        return results
+
+    @staticmethod
+    def report(trials: list[RunControlTrial]) -> str:
+        """
+        Args:
+            trials: results of the trials to report on
+
+        Returns: a summary of the settle times of the trials, with a histogram of them, leaving
+            out trials which were already in their expected state before their last change
+        """
+        settle_times = [
+            trial.settle_time
+            for trial in trials
+            if trial.settle_time is not None and not trial.already_settled
+        ]
+        failures = [trial for trial in trials if not trial.passed]
+        already_settled = sum(trial.already_settled for trial in trials)
+        lines = [
+            f"{len(trials) - len(failures)} of {len(trials)} trials settled correctly, "
+            f"{already_settled} were already settled before their last change"
+        ]
+        if settle_times:
+            lines.append(f"Settle times (s): {summarise(settle_times)}")
+            lines.append(format_histogram(settle_times))
+        lines.extend(trial.describe() for trial in failures)
+        return "\n".join(lines)
@@ -0,0 +1,162 @@
+"""
+Timing of DAE run transitions (begin, pause, resume and end), and the window get_time_since_begin
+must fall in given those timings.
+
+For each transition both the time for the genie_python command to return and the time for the DAE
+to report the new run state are measured, so that checks of run times can allow for exactly the
+latency seen rather than a fixed tolerance.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from time import perf_counter, sleep
+
+from utilities.benchmarking import summarise
+from utilities.utilities import g
+
+# Run state the DAE reports once each transition is complete
+TRANSITION_RUN_STATES = {"begin": "RUNNING", "pause": "PAUSED", "resume": "RUNNING", "end": "SETUP"}
+
+# Transitions of one run, in order
+RUN_CYCLE = ["begin", "pause", "resume", "end"]
+
+# Seconds between checks of the run state
+RUN_STATE_POLL_INTERVAL = 0.05
+
+# Seconds to wait for the DAE to reach the run state of a transition
+TRANSITION_TIMEOUT = 120
+
+# The DAE records run times to the whole second, so the time since begin can read up to this many
+# seconds either side of the time actually elapsed
+RUN_TIME_RESOLUTION = 1.0
+
+
+@dataclass(frozen=True)
+class TransitionTiming:
+    """
+    Timings of one run transition, as perf_counter values.
+    """
+
+    command: str
+    # Just before the command was called
+    started: float
+    # When the command returned
+    returned: float
+    # When the DAE was first seen in the run state of the transition
+    reached: float
+
+    @property
+    def call_latency(self) -> float:
+        return self.returned - self.started
+
+    @property
+    def state_latency(self) -> float:
+        return self.reached - self.started
+
+
+@dataclass(frozen=True)
+class TimeSinceBeginReading:
+    """
+    A reading of get_time_since_begin, in seconds and as a timedelta, with when it was read.
+    """
+
+    seconds: float
+    as_timedelta: timedelta
+    # perf_counter just before the first read and just after the second
+    started: float
+    finished: float
+
+
+def run_transition(command: str, timeout: float = TRANSITION_TIMEOUT) -> TransitionTiming:
+    """
+    Make a run transition and time it.
+
+    Args:
+        command: begin, pause, resume or end
+        timeout: seconds to wait for the DAE to reach the run state of the transition
+
+    Returns: the timings of the transition
+
+    Raises:
+        AssertionError: if the DAE does not reach the run state in time
+    """
+    expected_state = TRANSITION_RUN_STATES[command]
+    started = perf_counter()
+    getattr(g, command)()
+    returned = perf_counter()
+    while g.get_runstate() != expected_state:
+        if perf_counter() - started > timeout:
+            raise AssertionError(
+                f"DAE did not reach {expected_state} within {timeout}s of {command}"
+            )
+        sleep(RUN_STATE_POLL_INTERVAL)
+    return TransitionTiming(command, started, returned, perf_counter())
+
+
+def measure_run_cycles(cycles: int, dwell: float = 0.0) -> list[TransitionTiming]:
+    """
+    Begin, pause, resume and end a number of runs, timing each transition.
+
+    Args:
+        cycles: number of runs
+        dwell: seconds to wait in each run state before the next transition
+
+    Returns: the timings of every transition, in the order they were made
+    """
+    timings = []
+    for _ in range(cycles):
+        for command in RUN_CYCLE:
+            timings.append(run_transition(command))
+            sleep(dwell)
+    return timings
+
+
+def summarise_transitions(timings: list[TransitionTiming]) -> dict[str, float]:
+    """
+    Args:
+        timings: timings of transitions
+
+    Returns: flat results suitable for a baseline, of the median, 95th percentile and maximum
+        call and state latency of each transition
+    """
+    results = {}
+    for command in RUN_CYCLE:
+        of_command = [timing for timing in timings if timing.command == command]
+        if not of_command:
+            continue
+        for latency in ("call_latency", "state_latency"):
+            summary = summarise(getattr(timing, latency) for timing in of_command)
+            for statistic in ("median", "p95", "max"):
+                results[f"{command}_{latency}_{statistic}"] = summary[statistic]
+    return results
+
+
+def read_time_since_begin() -> TimeSinceBeginReading:
+    """
+    Returns: the time since the current run began, in seconds and as a timedelta
+    """
+    started = perf_counter()
+    seconds = g.get_time_since_begin()
+    as_timedelta = g.get_time_since_begin(True)
+    return TimeSinceBeginReading(seconds, as_timedelta, started, perf_counter())
+
+
+def time_since_begin_window(
+    begin: TransitionTiming, reading: TimeSinceBeginReading
+) -> tuple[float, float]:
+    """
+    The DAE starts timing a run at some point between begin being called and the run being seen as
+    RUNNING, and get_time_since_begin is evaluated at some point during the reading, so the time
+    since begin must fall between the shortest and longest gap those allow, to the resolution the
+    DAE records run times to.
+
+    Args:
+        begin: timings of the begin of the run
+        reading: the reading of get_time_since_begin
+
+    Returns: the smallest and largest number of seconds the reading may correctly be
+    """
+    return (
+        reading.started - begin.reached - RUN_TIME_RESOLUTION,
+        reading.finished - begin.started + RUN_TIME_RESOLUTION,
+    )
@@ -0,0 +1,71 @@
+"""
+Reading many DAE spectra at once.
+
+g.get_spectrum reads one spectrum at a time, making several channel access round trips for each,
+so reading hundreds of spectra (e.g. to normalise a scan point) is dominated by waiting on those
+round trips. get_spectra makes the reads for all the requested spectra concurrently instead.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import Iterable
+
+import numpy as np
+
+from utilities.utilities import g
+
+# PVs holding a spectrum as a distribution, and as counts
+SPECTRUM_Y_PV = "DAE:SPEC:{period}:{spectrum}:Y"
+SPECTRUM_YC_PV = "DAE:SPEC:{period}:{spectrum}:YC"
+
+# Number of spectra read at the same time
+READ_WORKERS = 16
+
+# genie python caches channels per thread, so the same threads are kept for every read to avoid
+# reconnecting to the spectrum PVs each time
+_executor: ThreadPoolExecutor | None = None
+
+
+def _read_spectrum(period: int, spectrum: int, dist: bool) -> np.ndarray:
+    """
+    Read the signal of one spectrum, as g.get_spectrum does.
+
+    Args:
+        period: the period number
+        spectrum: the spectrum number
+        dist: True to read the spectrum as a distribution, False as counts
+
+    Returns: the signal of the spectrum
+    """
+    pv = (SPECTRUM_Y_PV if dist else SPECTRUM_YC_PV).format(period=period, spectrum=spectrum)
+    size = g.get_pv(f"{pv}.NORD", is_local=True)
+    return np.asarray(g.get_pv(pv, is_local=True, use_numpy=True))[:size]
+
+
+def get_spectra(
+    spectra: Iterable[int], periods: Iterable[int] = (1,), dist: bool = True
+) -> np.ndarray:
+    """
+    Read the signal of many spectra in many periods concurrently.
+
+    Args:
+        spectra: the spectrum numbers
+        periods: the period numbers
+        dist: True to read the spectra as distributions (as g.get_spectrum does by default),
+            False as counts
+
+    Returns: 2-D array of the signals, with a row for each spectrum in each period, in the order
+        (period 1, spectrum 1), (period 1, spectrum 2), ..., (period 2, spectrum 1), ...
+        Spectra with fewer time channels than the longest one are padded with NaN.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="get_spectra")
+
+    to_read = list(product(periods, spectra))
+    signals = list(_executor.map(lambda pair: _read_spectrum(*pair, dist), to_read))
+
+    result = np.full((len(signals), max((len(s) for s in signals), default=0)), np.nan)
+    for row, signal in zip(result, signals):
+        row[: len(signal)] = signal
+    return result
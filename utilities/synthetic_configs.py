@@ -0,0 +1,254 @@
+"""
+Generation of synthetic configurations, far larger than any in configs/, for finding how the
+blockserver scales with the number of blocks, groups and components in a configuration.
+
+The files written follow the layout of those in configs/configurations and configs/components: a
+configuration directory holding blocks.xml, components.xml, groups.xml, iocs.xml and meta.xml,
+and a directory of the same files for each component it uses.
+"""
+
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+from utilities.config_validation import COMPONENTS_DIRECTORY, CONFIGURATIONS_DIRECTORY, SCHEMA_URL
+from utilities.ioc_catalogue import IocCatalogue
+
+# Namespace prefix of each schema, as in the files the blockserver writes
+SCHEMA_PREFIXES = {"blocks": "blk", "groups": "grp", "iocs": "ioc", "components": "comp"}
+
+# A PV which exists on every instrument, so that synthetic blocks connect
+DEFAULT_READ_PV = "TG:TS1:INST"
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """
+    The shape of a synthetic configuration.
+    """
+
+    name: str
+    # Total number of blocks, including those in components
+    blocks: int
+    groups: int = 20
+    components: int = 20
+    blocks_per_component: int = 10
+    # IOC of which each component has its own numbered instance, e.g. GALIL_01 in the first; they
+    # are not autostarted
+    ioc: str = "GALIL"
+    macros_per_ioc: int = 20
+    read_pv: str = DEFAULT_READ_PV
+
+    @property
+    def component_names(self) -> list[str]:
+        return [f"{self.name}_comp_{number}" for number in range(self.components)]
+
+    def component_block_names(self, component: int) -> list[str]:
+        """
+        Args:
+            component: index of the component
+
+        Returns: names of the blocks in the component
+        """
+        first = component * self.blocks_per_component
+        last = min(self.blocks, first + self.blocks_per_component)
+        return [f"SYN_C{component}_B{number}" for number in range(first, last)]
+
+    def component_ioc(self, component: int) -> str:
+        """
+        Args:
+            component: index of the component
+
+        Returns: name of the IOC in the component, which is in no other component
+        """
+        return f"{self.ioc}_{component + 1:02d}"
+
+    @property
+    def config_block_names(self) -> list[str]:
+        in_components = min(self.blocks, self.components * self.blocks_per_component)
+        return [f"SYN_B{number}" for number in range(in_components, self.blocks)]
+
+
+def _root_element(tag: str, children: Iterable[str]) -> str:
+    """
+    Args:
+        tag: tag of the root element, which is also the name of its schema
+        children: the child elements, already formatted
+
+    Returns: the document, with the namespaces the blockserver writes
+    """
+    namespace = quoteattr(SCHEMA_URL.format(tag))
+    opening = (
+        f"<{tag} xmlns={namespace} xmlns:{SCHEMA_PREFIXES[tag]}={namespace} "
+        f'xmlns:xi="http://www.w3.org/2001/XInclude"'
+    )
+    body = "".join(children)
+    if not body:
+        return f'<?xml version="1.0" ?>\n{opening}/>\n'
+    return f'<?xml version="1.0" ?>\n{opening}>\n{body}</{tag}>\n'
+
+
+def _block(name: str, read_pv: str) -> str:
+    return (
+        f"\t<block>\n"
+        f"\t\t<name>{escape(name)}</name>\n"
+        f"\t\t<read_pv>{escape(read_pv)}</read_pv>\n"
+        f"\t\t<local>False</local>\n"
+        f"\t\t<visible>True</visible>\n"
+        f"\t\t<rc_enabled>False</rc_enabled>\n"
+        f"\t\t<rc_lowlimit>0.0</rc_lowlimit>\n"
+        f"\t\t<rc_highlimit>0.0</rc_highlimit>\n"
+        f"\t\t<log_periodic>True</log_periodic>\n"
+        f"\t\t<log_rate>30</log_rate>\n"
+        f"\t\t<log_deadband>0.0</log_deadband>\n"
+        f"\t</block>\n"
+    )
+
+
+def _group(name: str, block_names: Iterable[str]) -> str:
+    blocks = "".join(f"\t\t<block name={quoteattr(block)}/>\n" for block in block_names)
+    return f"\t<group name={quoteattr(name)}>\n{blocks}\t</group>\n"
+
+
+def _ioc(name: str, macros: int) -> str:
+    macro_elements = "".join(
+        f'\t\t\t<macro name="MACRO{number}" value="{number}" description="{number}" '
+        f'pattern=".*$" hasDefault="no"/>\n'
+        for number in range(1, macros + 1)
+    )
+    return (
+        f'\t<ioc name={quoteattr(name)} autostart="false" restart="false" '
+        f'remotePvPrefix="" simlevel="recsim">\n'
+        f"\t\t<macros>\n{macro_elements}\t\t</macros>\n"
+        f"\t\t<pvs/>\n"
+        f"\t\t<pvsets/>\n"
+        f"\t</ioc>\n"
+    )
+
+
+def _meta(description: str) -> str:
+    return (
+        f'<?xml version="1.0" ?>\n'
+        f"<meta>\n"
+        f"\t<description>{escape(description)}</description>\n"
+        f"\t<synoptic>-- NONE --</synoptic>\n"
+        f"\t<edits/>\n"
+        f"\t<isProtected>false</isProtected>\n"
+        f"\t<isDynamic>false</isDynamic>\n"
+        f"\t<configuresBlockGWAndArchiver>false</configuresBlockGWAndArchiver>\n"
+        f"</meta>\n"
+    )
+
+
+def _write_set(
+    directory: str,
+    description: str,
+    block_names: Sequence[str],
+    read_pv: str,
+    groups: Iterable[str] = (),
+    iocs: Iterable[str] = (),
+    components: Iterable[str] = (),
+) -> None:
+    """
+    Write the files of one configuration or component.
+
+    Args:
+        directory: directory to write the files to, which is replaced if it exists
+        description: description of the configuration or component
+        block_names: names of its blocks
+        read_pv: PV each block reads
+        groups: its groups, already formatted
+        iocs: its IOCs, already formatted
+        components: names of the components it uses
+    """
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    contents = {
+        "blocks.xml": _root_element("blocks", (_block(name, read_pv) for name in block_names)),
+        "groups.xml": _root_element("groups", groups),
+        "iocs.xml": _root_element("iocs", iocs),
+        "components.xml": _root_element(
+            "components", (f"\t<component name={quoteattr(name)}/>\n" for name in components)
+        ),
+        "meta.xml": _meta(description),
+    }
+    for filename, content in contents.items():
+        with open(os.path.join(directory, filename), "w") as xml_file:
+            xml_file.write(content)
+
+
+def write_synthetic_config(
+    config_root: str, config: SyntheticConfig, catalogue: IocCatalogue | None = None
+) -> str:
+    """
+    Write a synthetic configuration and its components.
+
+    Args:
+        config_root: directory holding the configurations and components directories, e.g. the
+            instrument's config root or the configs directory of this repository
+        config: the shape of the configuration to write
+        catalogue: IOCs which exist, which the IOC of each component is checked against before
+            anything is written; None to not check
+
+    Returns: the directory of the configuration
+
+    Raises:
+        ValueError: if the IOC of any component is not in the catalogue
+    """
+    if catalogue is not None:
+        missing = [
+            ioc
+            for ioc in (config.component_ioc(number) for number in range(config.components))
+            if ioc not in catalogue
+        ]
+        if missing:
+            raise ValueError(
+                f"{config.name} needs IOCs which do not exist, use fewer components or another "
+                f"IOC: {', '.join(missing)}"
+            )
+
+    for number, component in enumerate(config.component_names):
+        _write_set(
+            os.path.join(config_root, COMPONENTS_DIRECTORY, component),
+            f"Synthetic component {number} of {config.name}",
+            config.component_block_names(number),
+            config.read_pv,
+            iocs=[_ioc(config.component_ioc(number), config.macros_per_ioc)],
+        )
+
+    block_names = config.config_block_names
+    groups = []
+    if config.groups > 0:
+        per_group = -(-len(block_names) // config.groups)
+        groups = [
+            _group(f"SYN_GROUP_{number}", block_names[start : start + per_group])
+            for number, start in enumerate(range(0, len(block_names), per_group or 1))
+        ]
+    directory = os.path.join(config_root, CONFIGURATIONS_DIRECTORY, config.name)
+    _write_set(
+        directory,
+        f"Synthetic configuration with {config.blocks} blocks",
+        block_names,
+        config.read_pv,
+        groups=groups,
+        components=config.component_names,
+    )
+    return directory
+
+
+def remove_synthetic_config(config_root: str, config: SyntheticConfig) -> None:
+    """
+    Remove a synthetic configuration and its components.
+
+    Args:
+        config_root: directory the configuration was written to
+        config: the configuration to remove
+    """
+    directories = [os.path.join(config_root, CONFIGURATIONS_DIRECTORY, config.name)] + [
+        os.path.join(config_root, COMPONENTS_DIRECTORY, component)
+        for component in config.component_names
+    ]
+    for directory in directories:
+        shutil.rmtree(directory, ignore_errors=True)
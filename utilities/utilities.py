@@ -2,7 +2,6 @@
 Utilities for genie python system tests.
 """
 
-import json
 import os
 import timeit
 import unittest
@@ -14,6 +13,11 @@ import six
 # import genie either from the local project in pycharm or from virtual env
 from genie_python.channel_access_exceptions import UnableToConnectToPVException
 
+from utilities.globals_file import recsim_macros, temporary_globals
+from utilities.icp_properties import IcpProperties
+from utilities.payloads import decode_json_payload
+from utilities.retry_log import new_call_id, record_attempt
+
 try:
     from source import genie as g
     from source import genie_api_setup
@@ -23,9 +27,9 @@ except ImportError:
 
 # import genie utilities either from the local project in pycharm or from virtual env
 try:
-    from source.utilities import compress_and_hex, dehex_and_decompress
+    from source.utilities import compress_and_hex
 except ImportError:
-    from genie_python.utilities import compress_and_hex, dehex_and_decompress
+    from genie_python.utilities import compress_and_hex
 
 P = ParamSpec("P")
 T = TypeVar("T")
@@ -43,6 +47,27 @@ IOCS_START_STOP_TIMEOUT = 60
 # The environment variable used to store the baseline memory usage
 BASE_MEMORY_USAGE = "BASE_MEMORY_USAGE"
 
+# Locations isisicp reads its properties from, all of which that exist are kept in step
+ICP_PROPERTIES_FILES = [
+    r"C:\Labview modules\dae\isisicp.properties",
+    r"C:\Instrument\Apps\EPICS\ICP_Binaries\isisicp.properties",
+]
+
+# Number of seconds to give the ICP to restart after its properties have changed
+ICP_RESTART_TIME = 15
+
+# default icp config path
+default_configs_path = os.path.join(
+    "C:\\",
+    "Instrument",
+    "Settings",
+    "config",
+    os.environ.get("COMPUTERNAME", "NAME"),
+    "configurations",
+)
+# path to ICP CONFIG ROOT
+PATH_TO_ICPCONFIGROOT = os.environ.get("ICPCONFIGROOT", default_configs_path)
+
 
 def parameterized_list(cases: list[Any]) -> list[tuple[str, Any]]:
     """
@@ -133,8 +158,7 @@ def get_config_details() -> dict:
             current_config_pv = g.get_pv("CS:BLOCKSERVER:GET_CURR_CONFIG_DETAILS", is_local=True)
             if current_config_pv is None:
                 raise AssertionError("Current config is none, is the server running?")
-            current_config = json.loads(dehex_and_decompress(current_config_pv))
-            return current_config
+            return decode_json_payload(current_config_pv)
         except Exception as ex:
             sleep(1)
             print(f"Waiting for config pv: count {i}")
@@ -155,7 +179,7 @@ def get_server_status() -> str | None:
         return None
 
     try:
-        as_json = json.loads(dehex_and_decompress(status_as_pv))
+        as_json = decode_json_payload(status_as_pv)
         return as_json["status"]
 
     except Exception:
@@ -174,6 +198,44 @@ def set_genie_python_raises_exceptions(does_throw: bool) -> None:
     genie_api_setup._exceptions_raised = does_throw
 
 
+# The arguments ensure_instrument_set last set the instrument with, and the PV prefix that gave
+_instrument_set_with: tuple[str | None, bool, str] | None = None
+
+
+def ensure_instrument_set(
+    pv_prefix: str | None = None, import_instrument_init: bool = True
+) -> None:
+    """
+    Set the instrument genie python talks to, unless it was already set up in exactly the same way.
+
+    g.set_instrument looks up the PV prefix over channel access, connects to the experiment
+    database and, optionally, imports and runs the instrument init; none of which change between
+    tests. If anything differs from the last time the instrument was set here, including the
+    instrument having been set some other way since, it is set again with g.set_instrument.
+
+    Args:
+        pv_prefix: the PV prefix to set; None for the local instrument
+        import_instrument_init: if True import the instrument init from the config area
+    """
+    global _instrument_set_with
+    api = genie_api_setup.__api
+    if _instrument_set_with == (pv_prefix, import_instrument_init, api.inst_prefix):
+        return
+
+    g.set_instrument(pv_prefix, import_instrument_init=import_instrument_init)
+    _instrument_set_with = (pv_prefix, import_instrument_init, api.inst_prefix)
+
+
+def forget_instrument_set() -> None:
+    """
+    Forget how ensure_instrument_set last set the instrument, so that its next call sets it again.
+    Call this after calling g.set_instrument directly, which ensure_instrument_set can not always
+    detect, e.g. when only the instrument init differs.
+    """
+    global _instrument_set_with
+    _instrument_set_with = None
+
+
 def setup_simulated_wiring_tables(event_data: bool = False) -> None:
     """
     Configures the DAE's wiring tables and sets the DAE to simulation mode
@@ -254,6 +316,44 @@ def temporarily_kill_icp() -> ContextManager[None]:
     return genie_api_setup.__api.dae.temporarily_kill_icp()
 
 
+def set_icp_properties(changes: dict[str, Any]) -> bool:
+    """
+    Set properties in the isisicp.properties files, restarting the ICP only if
+    a property actually changed. isisicp only reads its properties when it starts, so any
+    change needs a restart, but a restart costs at least ICP_RESTART_TIME seconds so it
+    is skipped when the files already have the requested values.
+
+    Args:
+        changes: property names mapped to their requested values
+
+    Returns: True if the ICP was restarted; False if nothing needed to change
+
+    Raises:
+        IOError: if none of the ICP_PROPERTIES_FILES exist
+    """
+    properties_files = [
+        IcpProperties(filepath) for filepath in ICP_PROPERTIES_FILES if os.path.exists(filepath)
+    ]
+    if not properties_files:
+        raise IOError(
+            f"Could not find at least one icp config file (looked in {ICP_PROPERTIES_FILES})"
+        )
+
+    files_to_change = [properties for properties in properties_files if properties.diff(changes)]
+    if not files_to_change:
+        return False
+
+    with temporarily_kill_icp():
+        for properties in files_to_change:
+            differences = properties.update(changes)
+            print(f"Changed {differences} in {properties.path}")
+
+    # Give time for ICP to restart
+    sleep(ICP_RESTART_TIME)
+    g.waitfor_runstate("SETUP")
+    return True
+
+
 def as_seconds(time: str) -> int:
     """
     Convert a up time to seconds
@@ -343,6 +443,28 @@ def bulk_stop_ioc(ioc_list: list[str]) -> list[str]:
     return failed_to_stop
 
 
+def bulk_retry_in_recsim(ioc_list: list[str], globals_filename: str) -> tuple[list[str], list[str]]:
+    """
+    Retry starting and stopping a list of IOCs in recsim, all at once. The RECSIM macros for every
+    IOC are written to globals.txt together and its original contents restored once the IOCs have
+    stopped, so a batch of failures costs one round of starts and stops rather than one each.
+    :param ioc_list: a list of the names of the IOCs to retry
+    :param globals_filename: path of globals.txt
+    :return: a list of IOCs that only started and stopped in recsim and a list of IOCs that
+            still failed to start or stop
+    """
+    if not ioc_list:
+        return [], []
+    with temporary_globals(globals_filename, recsim_macros(ioc_list)):
+        failed_to_start, not_in_proc_serv = bulk_start_ioc(ioc_list)
+        # Stop any that failed to start too, so none is left starting in recsim once the
+        # globals are restored
+        failed_to_stop = bulk_stop_ioc([ioc for ioc in ioc_list if ioc not in not_in_proc_serv])
+    failed = set(failed_to_start + not_in_proc_serv + failed_to_stop)
+    passed_in_recsim = [ioc for ioc in ioc_list if ioc not in failed]
+    return passed_in_recsim, [ioc for ioc in ioc_list if ioc in failed]
+
+
 def start_ioc(ioc_name: str) -> None:
     """
     Start the ioc
@@ -492,14 +614,30 @@ def retry_on_failure(max_times: int) -> Callable[[Callable[P, T]], Callable[P, N
     def decorator(func: Callable[P, T]) -> Callable[P, None]:
         @six.wraps(func)
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> None:
+            # Tests are logged by their dotted name, other functions by their qualified name
+            test = args[0] if args and isinstance(args[0], unittest.TestCase) else None
+            name = test.id() if test is not None else f"{func.__module__}.{func.__qualname__}"
+            call_id = new_call_id()
             err = None
             for attempt in range(max_times):
+                start = timeit.default_timer()
                 try:
                     func(*args, **kwargs)
+                    record_attempt(
+                        name, call_id, attempt + 1, max_times, None, timeit.default_timer() - start
+                    )
                     return
                 except unittest.SkipTest:
                     raise
                 except Exception as exception:
+                    record_attempt(
+                        name,
+                        call_id,
+                        attempt + 1,
+                        max_times,
+                        exception,
+                        timeit.default_timer() - start,
+                    )
                     print(f"\nTest failed (attempt {attempt + 1} of {max_times}). Retrying...")
                     err = exception
             if err is not None:
@@ -540,12 +678,29 @@ def retry_assert(retry_limit: int, func: Callable[[], None], retry_time: float =
     Raises:
         AssertionError: If the function fails in every retry.
     """
+    # Assertions are usually lambdas, whose qualified name includes the test they are in
+    qualified_name = getattr(func, "__qualname__", None)
+    name = f"{func.__module__}.{qualified_name}" if qualified_name else repr(func)
+    call_id = new_call_id()
     error = None
-    for _ in range(retry_limit):
+    for attempt in range(retry_limit):
+        start = timeit.default_timer()
         try:
             func()
+            record_attempt(
+                name, call_id, attempt + 1, retry_limit, None, timeit.default_timer() - start
+            )
             break
         except AssertionError as new_error:
+            record_attempt(
+                name,
+                call_id,
+                attempt + 1,
+                retry_limit,
+                new_error,
+                timeit.default_timer() - start,
+                retry_time,
+            )
             error = new_error
         sleep(retry_time)
     else: